@@ -1,11 +1,33 @@
 # founder_mapper_app.py
-import os, re, json, requests, streamlit as st
+import io, os, re, json, time, streamlit as st
 from urllib.parse import urlparse
 from typing import List, Dict, Any, Tuple, Set
-from collections import defaultdict
-
-import networkx as nx
-from pyvis.network import Network
+from collections import deque
+from functools import partial
+from importlib.util import find_spec
+from itertools import islice
+
+import numpy as np
+
+from graph_core import GraphView
+from paths import ROUTE_BUDGET, PathEngine, WeightedRouter
+from render import NODE_BUDGET, render_pyvis
+from store import USV_ID, Delta, GraphStore, Snapshot, label_key
+from focus import MAX_DEPTH, FocusEngine
+from ingest import load_portfolio
+from snapshot import from_payload, open_snapshot
+from engine import AVOID_PENALTY, TYPES, build_demo_graph, shared_signals, subgraph_by_filters
+from exports import FORMATS, export_bytes, gzipped, iter_paths
+from perf import HISTORY, Profiler, Trace, by_stage
+
+# ---------------- Instrumentation (spans per stage; see the Performance expander) ----------------
+TRACE = Trace()
+if st.session_state.get("PROFILER_ACTIVE") is not None:  # previous rerun stopped early; discard it
+    st.session_state.pop("PROFILER_ACTIVE").stop()
+PROFILER = Profiler() if st.session_state.pop("PROFILE_NEXT", False) else None
+if PROFILER is not None:
+    st.session_state.PROFILER_ACTIVE = PROFILER; PROFILER.start()
+TRACE.mark("setup")
 
 # ---------------- App config ----------------
 st.set_page_config(page_title="Founder Network Mapper", layout="wide")
@@ -13,369 +35,439 @@ st.title("Founder Network Mapper")
 st.caption("USV demo network • vivid Warm Intro paths • Focus by hops • Node Inspector • Overlap Scout")
 
 # =================================================
-# DEMO DATA (USV + partners + representative portfolio)
-# =================================================
-DEMO_GRAPH = {
-    "nodes": [
-        {"id":"investor::usv","label":"Union Square Ventures","type":"investor","url":"https://www.usv.com/"},
-        {"id":"partner::fred_wilson","label":"Fred Wilson","type":"partner","url":"https://www.usv.com/team/fred-wilson/"},
-        {"id":"partner::albert_wenger","label":"Albert Wenger","type":"partner","url":"https://www.usv.com/team/albert-wenger/"},
-        {"id":"partner::rebecca_kaden","label":"Rebecca Kaden","type":"partner","url":"https://www.usv.com/team/rebecca-kaden/"},
-        {"id":"partner::nick_grossman","label":"Nick Grossman","type":"partner","url":"https://www.usv.com/team/nick-grossman/"},
-        {"id":"partner::andy_weissman","label":"Andy Weissman","type":"partner","url":"https://www.usv.com/team/andy-weissman/"},
-        # Portfolio + founders
-        {"id":"company::etsy","label":"Etsy","type":"company","url":"https://www.etsy.com/"},
-        {"id":"founder::rob_kalin","label":"Rob Kalin","type":"founder","url":"https://en.wikipedia.org/wiki/Etsy"},
-        {"id":"founder::chris_maguire","label":"Chris Maguire","type":"founder","url":"https://en.wikipedia.org/wiki/Etsy"},
-        {"id":"founder::haim_schoppik","label":"Haim Schoppik","type":"founder","url":"https://en.wikipedia.org/wiki/Etsy"},
-
-        {"id":"company::twitter","label":"Twitter (X)","type":"company","url":"https://x.com/"},
-        {"id":"founder::jack_dorsey","label":"Jack Dorsey","type":"founder","url":"https://en.wikipedia.org/wiki/Jack_Dorsey"},
-        {"id":"founder::biz_stone","label":"Biz Stone","type":"founder","url":"https://en.wikipedia.org/wiki/Biz_Stone"},
-        {"id":"founder::ev_williams","label":"Evan Williams","type":"founder","url":"https://en.wikipedia.org/wiki/Evan_Williams_(Internet_entrepreneur)"},
-        {"id":"founder::noah_glass","label":"Noah Glass","type":"founder","url":"https://en.wikipedia.org/wiki/Noah_Glass"},
-
-        {"id":"company::coinbase","label":"Coinbase","type":"company","url":"https://www.coinbase.com/"},
-        {"id":"founder::brian_armstrong","label":"Brian Armstrong","type":"founder","url":"https://en.wikipedia.org/wiki/Brian_Armstrong"},
-        {"id":"founder::fred_ehrsam","label":"Fred Ehrsam","type":"founder","url":"https://en.wikipedia.org/wiki/Fred_Ehrsam"},
-
-        {"id":"company::duolingo","label":"Duolingo","type":"company","url":"https://www.duolingo.com/"},
-        {"id":"founder::luis_von_ahn","label":"Luis von Ahn","type":"founder","url":"https://en.wikipedia.org/wiki/Luis_von_Ahn"},
-        {"id":"founder::severin_hacker","label":"Severin Hacker","type":"founder","url":"https://en.wikipedia.org/wiki/Severin_Hacker"},
-
-        {"id":"company::kickstarter","label":"Kickstarter","type":"company","url":"https://www.kickstarter.com/"},
-        {"id":"founder::perry_chen","label":"Perry Chen","type":"founder","url":"https://en.wikipedia.org/wiki/Kickstarter"},
-        {"id":"founder::yancey_strickler","label":"Yancey Strickler","type":"founder","url":"https://en.wikipedia.org/wiki/Yancey_Strickler"},
-        {"id":"founder::charles_adler","label":"Charles Adler","type":"founder","url":"https://en.wikipedia.org/wiki/Charles_Adler_(entrepreneur)"},
-
-        {"id":"company::tumblr","label":"Tumblr","type":"company","url":"https://www.tumblr.com/"},
-        {"id":"founder::david_karp","label":"David Karp","type":"founder","url":"https://en.wikipedia.org/wiki/David_Karp"},
-
-        {"id":"company::foursquare","label":"Foursquare","type":"company","url":"https://foursquare.com/"},
-        {"id":"founder::dennis_crowley","label":"Dennis Crowley","type":"founder","url":"https://en.wikipedia.org/wiki/Dennis_Crowley"},
-        {"id":"founder::naveen_selvadurai","label":"Naveen Selvadurai","type":"founder","url":"https://en.wikipedia.org/wiki/Naveen_Selvadurai"},
-
-        {"id":"company::soundcloud","label":"SoundCloud","type":"company","url":"https://soundcloud.com/"},
-        {"id":"founder::alexander_ljung","label":"Alexander Ljung","type":"founder","url":"https://en.wikipedia.org/wiki/SoundCloud"},
-        {"id":"founder::eric_wahlforss","label":"Eric Wahlforss","type":"founder","url":"https://en.wikipedia.org/wiki/SoundCloud"},
-
-        # Extra investors for density
-        {"id":"investor::sequoia","label":"Sequoia Capital","type":"investor","url":"https://www.sequoiacap.com/"},
-        {"id":"investor::a16z","label":"Andreessen Horowitz","type":"investor","url":"https://a16z.com/"},
-        {"id":"investor::iconiq","label":"ICONIQ Capital","type":"investor","url":"https://www.iconiqcapital.com/"},
-    ],
-    "edges": [
-        {"u":"partner::fred_wilson","v":"investor::usv","relation":"Partner"},
-        {"u":"partner::albert_wenger","v":"investor::usv","relation":"Partner"},
-        {"u":"partner::rebecca_kaden","v":"investor::usv","relation":"Partner"},
-        {"u":"partner::nick_grossman","v":"investor::usv","relation":"Partner"},
-        {"u":"partner::andy_weissman","v":"investor::usv","relation":"Partner"},
-
-        {"u":"investor::usv","v":"company::etsy","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::twitter","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::coinbase","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::duolingo","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::kickstarter","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::tumblr","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::foursquare","relation":"Invested in"},
-        {"u":"investor::usv","v":"company::soundcloud","relation":"Invested in"},
-
-        {"u":"company::etsy","v":"founder::rob_kalin","relation":"Founded by"},
-        {"u":"company::etsy","v":"founder::chris_maguire","relation":"Founded by"},
-        {"u":"company::etsy","v":"founder::haim_schoppik","relation":"Founded by"},
-
-        {"u":"company::twitter","v":"founder::jack_dorsey","relation":"Founded by"},
-        {"u":"company::twitter","v":"founder::biz_stone","relation":"Founded by"},
-        {"u":"company::twitter","v":"founder::ev_williams","relation":"Founded by"},
-        {"u":"company::twitter","v":"founder::noah_glass","relation":"Founded by"},
-
-        {"u":"company::coinbase","v":"founder::brian_armstrong","relation":"Founded by"},
-        {"u":"company::coinbase","v":"founder::fred_ehrsam","relation":"Founded by"},
-
-        {"u":"company::duolingo","v":"founder::luis_von_ahn","relation":"Founded by"},
-        {"u":"company::duolingo","v":"founder::severin_hacker","relation":"Founded by"},
-
-        {"u":"company::kickstarter","v":"founder::perry_chen","relation":"Founded by"},
-        {"u":"company::kickstarter","v":"founder::yancey_strickler","relation":"Founded by"},
-        {"u":"company::kickstarter","v":"founder::charles_adler","relation":"Founded by"},
-
-        {"u":"company::tumblr","v":"founder::david_karp","relation":"Founded by"},
-
-        {"u":"company::foursquare","v":"founder::dennis_crowley","relation":"Founded by"},
-        {"u":"company::foursquare","v":"founder::naveen_selvadurai","relation":"Founded by"},
-
-        {"u":"company::soundcloud","v":"founder::alexander_ljung","relation":"Founded by"},
-        {"u":"company::soundcloud","v":"founder::eric_wahlforss","relation":"Founded by"},
-
-        {"u":"investor::sequoia","v":"company::twitter","relation":"Investor"},
-        {"u":"investor::a16z","v":"company::coinbase","relation":"Investor"},
-        {"u":"investor::iconiq","v":"company::duolingo","relation":"Investor"},
-    ],
-    "sources": {
-        "investor::usv": ["https://www.usv.com/team/"],
-        "company::etsy": ["https://www.usv.com/portfolio/etsy/","https://en.wikipedia.org/wiki/Etsy"],
-        "company::twitter": ["https://www.usv.com/portfolio/twitter/","https://en.wikipedia.org/wiki/Twitter"],
-        "company::coinbase": ["https://www.usv.com/portfolio/coinbase/","https://en.wikipedia.org/wiki/Coinbase"],
-        "company::duolingo": ["https://www.usv.com/portfolio/duolingo/","https://en.wikipedia.org/wiki/Duolingo"],
-        "company::kickstarter": ["https://www.usv.com/portfolio/kickstarter/","https://en.wikipedia.org/wiki/Kickstarter"],
-        "company::tumblr": ["https://www.usv.com/portfolio/tumblr/","https://en.wikipedia.org/wiki/Tumblr"],
-        "company::foursquare": ["https://www.usv.com/portfolio/foursquare/","https://en.wikipedia.org/wiki/Foursquare"],
-        "company::soundcloud": ["https://www.usv.com/portfolio/soundcloud/","https://en.wikipedia.org/wiki/SoundCloud"]
-    }
-}
-
-# =================================================
-# (Optional) Google CSE helper — not used by demo, but kept for later
+# Google CSE helper (single query; bulk lookups go through enrich.Enricher)
 # =================================================
+@st.cache_resource
+def result_cache():
+    from enrich import ResultCache  # the enrichment stack (asyncio, sqlite3) loads on the first lookup
+    return ResultCache()  # SQLite, shared with the enrichment pipeline and across restarts
+
 @st.cache_data(show_spinner=False, ttl=86400)
 def serp(q: str, num: int = 5):
     cx, key = os.getenv("GOOGLE_CSE_ID"), os.getenv("GOOGLE_API_KEY")
     if not cx or not key: return []
     num = max(1, min(num, 10))
-    r = requests.get("https://www.googleapis.com/customsearch/v1",
-                     params={"q": q, "cx": cx, "key": key, "num": num}, timeout=15)
+    hit = result_cache().get(q, num)
+    if hit is not None: return hit
+    import requests  # only when a lookup actually goes out; keeps it off the startup path
+    from enrich import SEARCH_URL, parse_items, search_params
+    r = requests.get(SEARCH_URL, params=search_params(q, num, cx, key), timeout=15)
     if r.status_code != 200:
         return [{"title": f"Search error {r.status_code}", "snippet": r.text[:160], "link": ""}]
-    items = r.json().get("items") or []
-    return [{"title": it.get("title",""), "snippet": it.get("snippet",""), "link": it.get("link","")} for it in items[:num]]
+    items = parse_items(r.json(), num)
+    result_cache().put(q, num, items)
+    return items
 
 # =================================================
 # Graph build & session helpers
 # =================================================
-def build_demo_graph():
-    G = nx.Graph(); meta = {}; sources = defaultdict(set)
-    for n in DEMO_GRAPH["nodes"]:
-        meta[n["id"]] = {"type": n["type"], "label": n["label"], "url": n.get("url","")}
-        G.add_node(n["id"])
-    for e in DEMO_GRAPH["edges"]:
-        G.add_edge(e["u"], e["v"], relation=e.get("relation",""))
-    for nid, urls in (DEMO_GRAPH.get("sources") or {}).items():
-        for u in urls: sources[nid].add(u)
-    return G, meta, sources
-
-def save_graph(G, meta, sources):
-    st.session_state.G = G
-    st.session_state.META = meta
-    st.session_state.SOURCES = sources
-    st.session_state.LABEL2ID = {f"{meta[n]['label']} ({meta[n]['type']})": n for n in G.nodes()}
+SNAPSHOT_PATH = os.environ.get("GRAPH_SNAPSHOT", "")  # .vcg file to serve at startup (memory-mapped)
+
+@st.cache_resource
+def graph_store() -> GraphStore:
+    store = GraphStore()  # one per process, shared by every session
+    if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+        CG, meta, sources = open_snapshot(SNAPSHOT_PATH)
+        store.publish(CG, meta, sources)
+    return store
+
+STORE = graph_store()
+
+@st.cache_resource
+def demo_graph():
+    return build_demo_graph()  # (CG, meta, sources), built once per process; snapshots copy on write
+
+def save_graph(CG, meta, sources):
+    snap = STORE.publish(CG, meta, sources)
+    st.session_state.SNAPSHOT_VERSION = snap.version  # sessions pin a version, not a copy
     if "PATH" not in st.session_state:
         st.session_state.PATH = []  # last computed path (list of node ids)
 
-def load_graph():
-    return (st.session_state.get("G"), st.session_state.get("META"),
-            st.session_state.get("SOURCES"), st.session_state.get("LABEL2ID"))
+def load_graph() -> Snapshot | None:
+    snap = STORE.get(st.session_state.get("SNAPSHOT_VERSION")) or STORE.current()
+    if snap is not None and st.session_state.get("SNAPSHOT_VERSION") != snap.version:
+        st.session_state.SNAPSHOT_VERSION = snap.version
+        if any(n not in snap.CG.index for n in st.session_state.get("PATH", [])):
+            set_path([])
+    return snap
 
-def set_path(nodes: List[str]):
+def set_path(nodes: List[str], routes: List[Tuple[float, List[str]]] = None):
     st.session_state.PATH = list(nodes or [])
+    # alternative routes as (cost, path); a plain path counts as one route
+    st.session_state.ROUTES = list(routes or ([(float(len(nodes) - 1), list(nodes))] if nodes else []))
+    st.session_state.pop("route_pick", None)
 
 # =================================================
-# Visualization (vivid path highlighting + dim non-path)
-# =================================================
-def render_pyvis(
-    G,
-    meta,
-    height="700px",
-    highlight_nodes=None,
-    highlight_edges=None,
-    path_start=None,
-    path_end=None,
-    path_nodes=None,
-):
-    hn = set(highlight_nodes or [])
-    he = set(highlight_edges or [])
-    pnodes = list(path_nodes or [])
-    pset = set(pnodes)
-
-    net = Network(height=height, width="100%", bgcolor="#ffffff", font_color="#222")
-    net.barnes_hut(spring_length=150, damping=0.85)
-
-    BASE = {"company":"#16a34a","founder":"#2563eb","investor":"#f97316","partner":"#7c3aed"}
-    GREY = "#CBD5E1"   # dimmed nodes/edges
-    PATH_EDGE = "#ef4444"
-
-    for nid in G.nodes():
-        a = meta[nid]
-        url = a.get("url","")
-        base_color = BASE.get(a["type"], "#64748b")
-
-        if nid == path_start:
-            color, border, size = "#22c55e", 4, 34  # start: green
-            role = "START"
-        elif nid == path_end:
-            color, border, size = "#ef4444", 4, 34  # end: red
-            role = "TARGET"
-        elif nid in pset:
-            color, border, size = "#f59e0b", 3, 26  # on-path: amber
-            role = "ON PATH"
-        else:
-            color, border, size = (GREY if pnodes else base_color), (1 if not pnodes else 0), (12 if pnodes else 18)
-            role = a["type"].upper()
-
-        legend = "Legend: 🟩 Start · 🟥 Target · 🟧 Path · ◻︎ Dimmed"
-        title = f"{role}: {a['label']}<br><em>{legend}</em>" + (f"<br><a href='{url}' target='_blank'>{url}</a>" if url else "")
-        net.add_node(nid, label=a["label"], color=color, title=title, borderWidth=border, size=size)
-
-    for u, v, d in G.edges(data=True):
-        on_path = ((u, v) in he) or ((v, u) in he)
-        if pnodes:
-            width = 4 if on_path else 1
-            color = PATH_EDGE if on_path else GREY
-        else:
-            width = 1
-            color = None
-        net.add_edge(u, v, title=d.get("relation",""), width=width, color=color)
-
-    net.toggle_physics(True)
-    return net.generate_html("graph.html")
-
-# =================================================
-# Build (demo-only for now)
+# Build (demo, or streaming bulk load of a portfolio export)
 # =================================================
+UPLOAD_TYPES = ["csv", "jsonl", "ndjson", "parquet", "gz"]
 with st.form("builder"):
     demo_mode = st.checkbox("Use Demo Mode", value=True, help="Curated USV network; great for demos.")
+    st.caption("Or untick Demo Mode and load a portfolio export (CSV, JSONL or Parquet, optionally .gz). "
+               "Nodes: `id,label,type,url[,sources]` · Edges: `u,v,relation` · Sources: `id,url`. Ids are `type::slug`.")
+    nodes_up = st.file_uploader("Nodes file", type=UPLOAD_TYPES)
+    edges_up = st.file_uploader("Edges file", type=UPLOAD_TYPES)
+    sources_up = st.file_uploader("Sources file (optional)", type=UPLOAD_TYPES)
+    snapshot_up = st.file_uploader("Or a graph snapshot (.vcg) / graph JSON export", type=["vcg", "json"])
     submitted = st.form_submit_button("Build / Rebuild")
 if submitted:
-    if not demo_mode:
-        st.warning("For now, enable Demo Mode (no paid APIs)."); st.stop()
-    G, META, SOURCES = build_demo_graph()
-    save_graph(G, META, SOURCES)
-
-G, META, SOURCES, LABEL2ID = load_graph()
-if G is None:
+    if demo_mode:
+        CG, META, SOURCES = demo_graph()
+        save_graph(CG, META, SOURCES)
+    elif snapshot_up is not None:
+        try:
+            if snapshot_up.name.lower().endswith(".json"):
+                CG, META, SOURCES = from_payload(json.load(snapshot_up))
+            else:
+                CG, META, SOURCES = open_snapshot(snapshot_up)
+        except (ValueError, KeyError, TypeError) as e:
+            st.error(f"Could not open snapshot: {e}"); st.stop()
+        save_graph(CG, META, SOURCES)
+        st.success(f"Opened {CG.n:,} nodes / {CG.indices.size // 2:,} edges from {snapshot_up.name}")
+    elif nodes_up is None or edges_up is None:
+        st.warning("Upload a nodes file and an edges file, or enable Demo Mode."); st.stop()
+    else:
+        bar = st.progress(0.0, text="Loading portfolio…")
+        stage_pos = {"nodes": 0.1, "edges": 0.5, "sources": 0.9, "done": 1.0}
+        def on_progress(stage, rows, rate):
+            bar.progress(stage_pos[stage], text=f"{stage}: {rows:,} rows · {rate:,.0f} rows/s")
+        try:
+            res = load_portfolio(nodes_up, edges_up, sources_up, progress=on_progress)
+        except (ValueError, RuntimeError, KeyError) as e:
+            st.error(f"Could not load portfolio: {e}"); st.stop()
+        save_graph(res.CG, res.meta, res.sources)
+        s = res.stats
+        st.success(f"Loaded {res.CG.n:,} nodes / {res.CG.indices.size // 2:,} edges in {s.seconds:.1f}s "
+                   f"({s.rows_per_sec:,.0f} rows/s) · {s.invalid_ids:,} invalid ids · "
+                   f"{s.dangling_edges:,} dangling edges · {s.duplicate_edges:,} duplicate edges")
+        if s.examples:
+            with st.expander("Rejected rows (first 10)"):
+                st.write("\n".join(f"- {x}" for x in s.examples))
+
+TRACE.mark("load")
+SNAP = load_graph()
+if SNAP is None:
     st.info("Click **Build / Rebuild** to load the USV demo network.")
     st.stop()
+CG, META, SOURCES = SNAP.CG, SNAP.META, SNAP.SOURCES   # SNAP.SEARCH builds on first use
+latest = STORE.current()
+if latest is not None and latest.version != SNAP.version:
+    st.sidebar.caption(f"Graph v{SNAP.version} · newer v{latest.version} available")
+    if st.sidebar.button("Switch to latest graph"):
+        st.session_state.SNAPSHOT_VERSION = None
+        st.rerun()
+
+# Node pickers return ids. Up to PICK_ALL candidates they list everything; above that they
+# show a name search first, so no label list (or search index) is built until someone types.
+PICK_ALL = 5000
+PICK_MATCHES = 200
+
+def _fmt(nid):
+    return label_key(META[nid]) if nid in META else str(nid)
+
+def _candidates(label, key, box, pool: GraphView | None, types) -> List[str]:
+    by_label = lambda x: META[x]["label"].lower()
+    n = pool.number_of_nodes() if pool is not None else CG.n
+    if n <= PICK_ALL:
+        return sorted((x for x in (pool.nodes() if pool is not None else CG.ids)
+                       if types is None or META[x]["type"] in types), key=by_label)
+    q = box.text_input(f"{label} · search", key=f"{key}_q", placeholder=f"name, among {n:,} nodes")
+    if not q.strip(): return []
+    return sorted((x for x in SNAP.SEARCH.search(types or TYPES, q) if pool is None or x in pool), key=by_label)[:PICK_MATCHES]
+
+def pick_node(label, key, box=st.sidebar, pool=None, types=None, none="(pick)", default=None) -> str | None:
+    opts = _candidates(label, key, box, pool, types)
+    if default is not None and default not in opts: opts = [default] + opts
+    opts = ([none] if none else []) + opts
+    index = opts.index(default) if default in opts else 0
+    choice = box.selectbox(label, opts, index=index, key=key, format_func=lambda x: x if x == none else _fmt(x))
+    return None if choice == none else choice
+
+def pick_nodes(label, key, box=st.sidebar, pool=None, types=None, disabled=False) -> List[str]:
+    opts = _candidates(label, key, box, pool, types)
+    kept = [x for x in st.session_state.get(key, []) if x in CG.index and x not in opts]  # picks from earlier searches
+    return box.multiselect(label, kept + opts, key=key, format_func=_fmt, disabled=disabled)
+
+TRACE.mark("panels")
+# =================================================
+# Web enrichment (batched search lookups -> SOURCES / node URLs)
+# =================================================
+with st.expander("Web enrichment"):
+    has_keys = bool(os.getenv("GOOGLE_CSE_ID") and os.getenv("GOOGLE_API_KEY")) or "SEARCH_URL" in os.environ
+    if not has_keys:
+        st.caption("Set GOOGLE_CSE_ID and GOOGLE_API_KEY (or SEARCH_URL for a local stub) to enable.")
+    ec1, ec2, ec3 = st.columns(3)
+    enrich_types = ec1.multiselect("Types", ["founder","company","investor","partner"], default=["founder","company"])
+    only_missing = ec1.checkbox("Only nodes without sources", value=True)
+    enrich_max = int(ec2.number_input("Max lookups", 1, 100_000, 200, step=50))
+    enrich_conc = int(ec2.number_input("Concurrency", 1, 64, 8))
+    enrich_rate = float(ec3.number_input("Requests / sec", 0.5, 1000.0, 10.0))
+    enrich_batch = int(ec3.number_input("Merge every N results", 10, 5000, 100, step=10))
+    if st.button("Enrich", disabled=not has_keys):
+        from enrich import Enricher, node_query, results_delta
+        todo = [n for n in (CG.ids[i] for i in np.flatnonzero(CG.type_mask(enrich_types)).tolist())
+                if not (only_missing and SOURCES.get(n))][:enrich_max]
+        bar = st.progress(0.0, text=f"0 / {len(todo):,}")
+        state = {"done": 0, "changed": 0}
+        def on_batch(results):
+            cur = STORE.current()
+            delta, changed = results_delta(cur.META, cur.SOURCES, results)
+            state["done"] += len(results); state["changed"] += changed
+            if delta:  # one incremental snapshot per batch: only the touched nodes are re-indexed
+                st.session_state.SNAPSHOT_VERSION = STORE.apply(delta).version
+            bar.progress(state["done"] / max(len(todo), 1), text=f"{state['done']:,} / {len(todo):,}")
+        en = Enricher(concurrency=enrich_conc, rate=enrich_rate, cache=result_cache())
+        try:
+            en.enrich({n: node_query(META, n) for n in todo}, batch=enrich_batch, on_batch=on_batch)
+        finally:
+            en.close()
+        s = en.stats
+        st.success(f"{s.queries:,} lookups in {s.seconds:.1f}s ({s.qps:,.1f}/s) · {state['changed']:,} nodes updated · "
+                   f"cache {s.cache_hits:,} · deduped {s.deduped:,} · retries {s.retries:,} · errors {s.errors:,}")
+        if state["changed"]:
+            st.button("Show enriched graph")  # rerun picks up the published snapshot
+
+# =================================================
+# Edit graph (incremental: only the changed nodes/edges are re-indexed)
+# =================================================
+with st.expander("Edit graph"):
+    op = st.radio("Change", ["Add node", "Add edge", "Remove edge", "Remove node", "Add source"], horizontal=True)
+    delta = Delta()
+    if op == "Add node":
+        c1, c2, c3 = st.columns(3)
+        new_type = c1.selectbox("Type", ["founder","company","investor","partner"])
+        new_label = c2.text_input("Label").strip()
+        new_url = c3.text_input("URL").strip()
+        if new_label:
+            delta.add_node(f"{new_type}::{re.sub(r'[^a-z0-9]+', '_', new_label.lower()).strip('_')}", new_label, new_type, new_url)
+    elif op in ("Add edge", "Remove edge"):
+        c1, c2, c3 = st.columns(3)
+        eu = pick_node("From", "edit_u", c1); ev = pick_node("To", "edit_v", c2)
+        rel = c3.text_input("Relation", "Invested in") if op == "Add edge" else None
+        if eu and ev:
+            if op == "Add edge":
+                delta.add_edge(eu, ev, rel)
+            else:
+                delta.remove_edge(eu, ev)
+    elif op == "Remove node":
+        rn = pick_node("Node", "edit_node", st)
+        if rn: delta.remove_node(rn)
+    else:
+        c1, c2 = st.columns(2)
+        sn = pick_node("Node", "edit_src_node", c1); su = c2.text_input("Source URL").strip()
+        if sn and su: delta.add_source(sn, su)
+    if st.button("Apply change", disabled=not delta):
+        try:
+            STORE.apply(delta)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.session_state.SNAPSHOT_VERSION = None  # follow the new snapshot (drops a path through removed nodes)
+            st.rerun()
 
+TRACE.mark("sidebar")
 # =================================================
 # Sidebar controls
 # =================================================
 st.sidebar.header("Filters")
+from projections import KINDS
+network = st.sidebar.selectbox("Network", ["(full graph)"] + list(KINDS),
+                               format_func=lambda k: KINDS[k].label if k in KINDS else "Full graph",
+                               help="Projections link founders (or investors) directly, weighted by what they share.")
+PROJ = None
+GCG = CG  # graph every view below is built on: the snapshot graph or a projection of it (same node ints)
+if network in KINDS:
+    pc1, pc2, pc3 = st.sidebar.columns(3)
+    proj_min = int(pc1.number_input("Min shared", min_value=1, value=1))
+    proj_k = int(pc2.number_input("Top‑k / node", min_value=0, value=0, help="0 = keep all"))
+    proj_hub = int(pc3.number_input("Skip hubs >", min_value=0, value=0, help="Ignore via-nodes shared by more than this many (0 = none)."))
+    TRACE.mark("projection")
+    PROJ = SNAP.PROJECTIONS.project(CG.view(), network, proj_min, proj_k or None, proj_hub or None)
+    GCG = PROJ.CG
+    TRACE.note(view=GCG.view(PROJ.nodes)); TRACE.mark("sidebar")
+    hide_isolated = st.sidebar.checkbox("Hide unconnected", value=True)
+    st.sidebar.caption(f"{PROJ.edges:,} links · {PROJ.pruned:,} pruned · {PROJ.seconds * 1000:.0f} ms")
 typ_filter = st.sidebar.multiselect("Node types", ["founder","company","investor","partner"],
                                     default=["founder","company","investor","partner"])
 query = st.sidebar.text_input("Search name contains", "")
 
 st.sidebar.header("Focus")
 usv_focus = st.sidebar.checkbox("USV‑centric view", value=True, help="Keep nodes within N hops of USV.")
-depth = int(st.sidebar.slider("Depth (hops)", 1, 3, 2))
-focus_display = st.sidebar.selectbox("Or pick a node to focus", ["(none)"] + sorted(LABEL2ID.keys()), index=0, key="focus_pick")
+depth = int(st.sidebar.slider("Depth (hops)", 1, MAX_DEPTH, 2))
+focus_pick = pick_node("Or pick a node to focus", "focus_pick", none="(none)")
 apply_focus = st.sidebar.checkbox("Apply focus", value=True)
 
 st.sidebar.header("Warm Intro Path")
-start_display = st.sidebar.selectbox("From", ["(pick)"] + sorted(LABEL2ID.keys()), index=0, key="path_from")
-end_display   = st.sidebar.selectbox("To",   ["(pick)"] + sorted(LABEL2ID.keys()), index=0, key="path_to")
+start_id = pick_node("From", "path_from")
+end_id   = pick_node("To", "path_to")
 find_path = st.sidebar.button("Find shortest path")
 warm_to_usv = st.sidebar.button("Find warm intro path → USV")
 clear_path = st.sidebar.button("Clear path")
 path_only = st.sidebar.checkbox("Show path only (if exists)", value=False)
+weighted = st.sidebar.checkbox("Relation‑aware routing", value=True,
+                               help="Rank routes by relation cost: Partner/Founded by < Invested in < Investor.")
+k_routes = int(st.sidebar.number_input("Alternative routes (k)", min_value=1, max_value=10, value=3))
+avoid_ids = pick_nodes("Avoid routing through", "avoid")
+
+st.sidebar.header("Rendering")
+node_budget = int(st.sidebar.number_input("Node budget", min_value=50, max_value=20000, value=NODE_BUDGET, step=250,
+                                          help="Above this, leaf founders/companies are folded into aggregate nodes."))
+
+st.sidebar.header("Clusters")
+clusters = None  # community label per node int, computed on the whole (active) graph so ids are stable across filters
+cluster_pick: List[int] = []
+color_by_cluster = False
+if st.sidebar.checkbox("Detect communities", value=False, help="Portfolio clusters by modularity (cached per graph version)."):
+    from communities import METHODS
+    comm_method = st.sidebar.selectbox("Method", list(METHODS), format_func=METHODS.get,
+                                       help="Auto = Louvain for smaller graphs, label propagation (approximate, near-linear) above.")
+    comm_res = float(st.sidebar.slider("Resolution", 0.2, 3.0, 1.0, 0.1, help="Higher = more, smaller clusters."))
+    comm_workers = int(st.sidebar.number_input("Parallel runs (Louvain)", min_value=1, max_value=max(1, os.cpu_count() or 1), value=1,
+                                               help="Seeded runs on a process pool; the partition with the best modularity wins."))
+    TRACE.mark("communities")
+    COMM = SNAP.COMMUNITIES.communities(GCG.view(None if PROJ is None else PROJ.nodes), comm_method, comm_res, workers=comm_workers if comm_workers > 1 else 0)
+    clusters = COMM.labels
+    TRACE.note(communities=COMM.count); TRACE.mark("sidebar")
+    st.sidebar.caption(f"{COMM.count} communities · {COMM.method} · modularity {COMM.modularity:.3f} · {COMM.seconds * 1000:.0f} ms")
+    color_by_cluster = st.sidebar.radio("Colour nodes by", ["Type", "Cluster"], index=1, horizontal=True) == "Cluster"
+    cluster_pick = st.sidebar.multiselect(
+        "Show clusters", list(range(min(COMM.count, 50))),
+        format_func=lambda c: f"#{c + 1} · {META[CG.ids[COMM.hubs[c]]]['label']} ({COMM.sizes[c]})")
 
 if clear_path:
     set_path([])
 
+TRACE.mark("filter")
 # =================================================
 # Build base filtered view (before focus) — path uses this!
+# Views are boolean masks over the compact graph; nothing is copied.
 # =================================================
-def subgraph_by_filters(G, META, typ_filter, query):
-    q = (query or "").lower().strip()
-    keep = []
-    for nid, a in META.items():
-        if nid not in G: continue
-        if a["type"] not in typ_filter: continue
-        if q and q not in a["label"].lower(): continue
-        keep.append(nid)
-    return G.subgraph(keep).copy()
-
-H_base = subgraph_by_filters(G, META, typ_filter, query)
+H_base = subgraph_by_filters(GCG, SNAP, typ_filter, query)
+if PROJ is not None:
+    H_base = GCG.view(H_base.mask & PROJ.nodes & ((np.diff(GCG.indptr) > 0) if hide_isolated else True))
+if cluster_pick:
+    H_base = GCG.view(H_base.mask & np.isin(clusters, cluster_pick))
 if H_base.number_of_nodes() == 0:
     st.info("No nodes match current filters."); st.stop()
 
+TRACE.note(view=H_base); TRACE.mark("paths")
 # =================================================
 # Compute shortest path on base view and persist it
 # =================================================
-def shortest_path_safe(Gsub, src, dst) -> List[str]:
+PATHS: PathEngine = SNAP.PATHS
+
+ROUTER: WeightedRouter = SNAP.ROUTER if PROJ is None else PROJ.router  # projections rank by tie strength
+
+def shortest_path_safe(Gsub: GraphView, src, dst) -> List[str]:
     if not src or not dst: return []
-    if src not in Gsub or dst not in Gsub: return []
-    try:
-        return nx.shortest_path(Gsub, source=src, target=dst)
-    except nx.NetworkXNoPath:
-        return []
-
-if find_path and start_display != "(pick)" and end_display != "(pick)":
-    sid, tid = LABEL2ID.get(start_display), LABEL2ID.get(end_display)
-    path_nodes = shortest_path_safe(H_base, sid, tid)
-    if path_nodes:
-        set_path(path_nodes)
+    return PATHS.path(Gsub, src, dst)
+
+def warm_routes(Gsub: GraphView, src, dst) -> List[Tuple[float, List[str]]]:
+    if not weighted:
+        p = shortest_path_safe(Gsub, src, dst)
+        return [(float(len(p) - 1), p)] if p else []
+    if not src or not dst: return []
+    penalties = {n: AVOID_PENALTY for n in avoid_ids}
+    t0 = time.perf_counter()
+    routes = list(islice(ROUTER.k_shortest(Gsub, src, dst, penalties, budget=ROUTE_BUDGET), k_routes))
+    if routes and len(routes) < k_routes and time.perf_counter() - t0 >= ROUTE_BUDGET:
+        st.sidebar.caption(f"{len(routes)} of {k_routes} routes found within the {ROUTE_BUDGET:g} s routing budget.")
+    return routes
+
+if find_path and start_id and end_id:
+    routes = warm_routes(H_base, start_id, end_id)
+    if routes:
+        set_path(routes[0][1], routes)
     else:
         set_path([])
         st.warning("No connection found in the current filtered view. Try widening filters or turning off focus.")
-elif warm_to_usv and start_display != "(pick)":
-    sid = LABEL2ID.get(start_display)
-    usv_id = "investor::usv"
-    path_nodes = shortest_path_safe(H_base, sid, usv_id)
-    if path_nodes:
-        set_path(path_nodes)
+elif warm_to_usv and start_id:
+    routes = warm_routes(H_base, start_id, USV_ID)
+    if routes:
+        set_path(routes[0][1], routes)
     else:
         set_path([])
         st.warning("No warm intro path to USV in the current filtered view.")
 
+ROUTES = st.session_state.get("ROUTES", [])
+if len(ROUTES) > 1:
+    route_ix = st.sidebar.radio("Route", list(range(len(ROUTES))), key="route_pick",
+                                format_func=lambda i: f"#{i+1} · cost {ROUTES[i][0]:.1f} · {len(ROUTES[i][1]) - 1} hops")
+    st.session_state.PATH = ROUTES[route_ix][1]
+
+TRACE.note(path_len=len(st.session_state.get("PATH", [])), routes=len(ROUTES)); TRACE.mark("focus")
 # =================================================
 # Apply focus to the base view (don’t affect computed path)
 # =================================================
-def ego_focus(Gsub, center_id, radius):
-    if center_id not in Gsub: return Gsub.copy()
-    return nx.ego_graph(Gsub, center_id, radius=radius, undirected=True).copy()
+FOCUS: FocusEngine = SNAP.FOCUS
+FOCUS.warm_async(H_base)  # hop distances for the biggest partner/investor hubs, off the script thread
 
 H = H_base
+focus_dist = None  # hop distances from the focus center (one BFS to depth 3; depth is a threshold)
 if apply_focus:
     center = None
-    if usv_focus and "investor::usv" in H:
-        center = "investor::usv"
-    elif focus_display != "(none)":
-        cand = LABEL2ID.get(focus_display)
-        center = cand if cand in H else None
+    if usv_focus and USV_ID in H:
+        center = USV_ID
+    elif focus_pick:
+        center = focus_pick if focus_pick in H else None
     if center:
-        H = ego_focus(H, center, depth)
+        focus_dist = FOCUS.distances(H_base, center)
+        H = FOCUS.focus(H_base, center, depth)
 
 # Path-only toggle
 stored_path = st.session_state.get("PATH", [])
 if path_only and stored_path:
-    keep = set(stored_path)
-    H = H.subgraph(list(keep)).copy()
+    H = H.only(stored_path)
 
+TRACE.note(view=H); TRACE.mark("highlight")
 # =================================================
 # Highlight path (if any), intersected with what’s visible after focus
 # =================================================
 highlight_nodes: Set[str] = set()
 highlight_edges: Set[Tuple[str, str]] = set()
 if stored_path:
-    visible_nodes = set(H.nodes())
-    any_hidden = False
-    for n in stored_path:
-        if n in visible_nodes:
-            highlight_nodes.add(n)
-        else:
-            any_hidden = True
-    for u, v in zip(stored_path, stored_path[1:]):
-        if H.has_edge(u, v):
-            highlight_edges.add((u, v))
-        else:
-            any_hidden = True
+    path_ints = np.array([CG.index.get(n, -1) for n in stored_path])
+    shown = (path_ints >= 0) & H.mask[path_ints]
+    highlight_nodes = {n for n, s in zip(stored_path, shown) if s}
+    highlight_edges = {(u, v) for (u, v), a, b in zip(zip(stored_path, stored_path[1:]), shown, shown[1:])
+                       if a and b and H.has_edge(u, v)}
+    any_hidden = not shown.all() or len(highlight_edges) < len(stored_path) - 1
     if any_hidden and not path_only:
-        st.info("A saved path exists, but some nodes are hidden by current focus/filters. Clear focus or widen filters to see the full path.")
+        msg = "A saved path exists, but some nodes are hidden by current focus/filters. Clear focus or widen filters to see the full path."
+        if focus_dist is not None and (path_ints >= 0).all() and H_base.mask[path_ints].all():
+            hops = focus_dist[path_ints]  # same distance array as the focus mask
+            msg += (f" (Depth {int(hops.max())} shows all of it.)" if (hops >= 0).all()
+                    else f" (Part of it is more than {MAX_DEPTH} hops from the focus center.)")
+        st.info(msg)
 
+TRACE.mark("render")
 # =================================================
 # Render graph (with start/end emphasis if we have a stored path)
 # =================================================
 path_start_id = stored_path[0] if stored_path else None
 path_end_id   = stored_path[-1] if stored_path else None
 
-html = render_pyvis(
+html, render_stats = render_pyvis(
     H, META,
     highlight_nodes=highlight_nodes,
     highlight_edges=highlight_edges,
     path_start=path_start_id,
     path_end=path_end_id,
     path_nodes=stored_path,
+    budget=node_budget,
+    layouts=SNAP.LAYOUTS,
+    cache=SNAP.HTML_CACHE,
+    types=typ_filter,
+    clusters=clusters if color_by_cluster else None,
 )
+TRACE.note(view=H, drawn_nodes=render_stats["nodes"], drawn_edges=render_stats["edges"],
+           html_bytes=render_stats["html_bytes"], cached=render_stats["cached"]); TRACE.mark("render (send)")
 st.components.v1.html(html, height=720, scrolling=True)
+st.caption(f"Drawn {render_stats['nodes']} nodes / {render_stats['edges']} edges"
+           + (f" ({render_stats['folded']} folded into {render_stats['aggregates']} aggregates)" if render_stats['folded'] else "")
+           + (f" · {render_stats['dropped']} lowest-degree cut to fit the budget" if render_stats.get("dropped") else "")
+           + f" · HTML {render_stats['html_bytes'] / 1024:.0f} KB · layout {render_stats['layout_ms']:.0f} ms"
+           + f" · render {render_stats['render_ms']:.0f} ms" + (" (cached)" if render_stats["cached"] else ""))
 
 # Visual legend / callouts
 st.markdown(
@@ -385,13 +477,14 @@ Use **Warm Intro Path** or **Find shortest path** in the sidebar, then follow th
 """
 )
 
+TRACE.mark("inspector")
 # =================================================
 # Node Inspector (useful details)
 # =================================================
 st.markdown("### Node Inspector")
-labels_sorted = sorted([f"{META[n]['label']} ({META[n]['type']})" for n in H.nodes()], key=str.lower)
-pick = st.selectbox("Select a node to inspect", labels_sorted, index=0)
-nid = st.session_state.LABEL2ID[pick]
+first = H.node_ints()[:1]
+nid = pick_node("Select a node to inspect", "inspect", st, pool=H, none=None,
+                default=USV_ID if USV_ID in H else (CG.ids[int(first[0])] if first.size else None))
 
 def _neighbors_by_type(nid, t):
     return sorted([nb for nb in H.neighbors(nid) if META[nb]["type"] == t], key=lambda x: META[x]["label"].lower())
@@ -411,39 +504,52 @@ with cols[2]:
     for nb in _neighbors_by_type(nid, "investor"):
         st.write(f"- {META[nb]['label']}")
 
-urls = sorted(list(st.session_state.SOURCES.get(nid, [])))
+urls = sorted(list(SOURCES.get(nid, [])))
 if urls:
     st.write("**Sources:**")
     for u in urls:
         st.write(f"- [{urlparse(u).netloc}]({u})")
 
+TRACE.mark("insights")
 # =================================================
 # Insights
 # =================================================
 st.markdown("### Insights")
-deg = {n: H.degree(n) for n in H.nodes()}
-bet = nx.betweenness_centrality(H) if H.number_of_nodes() < 150 else {n: 0 for n in H.nodes()}
-top = sorted(H.nodes(), key=lambda n: (deg[n], bet[n]), reverse=True)[:5]
-if top:
-    st.write("Most connected in this view (degree | betweenness):")
-    for n in top:
-        st.write(f"- {META[n]['label']} ({META[n]['type']}) — {deg[n]} | {bet[n]:.3f}")
-
-# Shared investors between companies (fast signal)
-companies = [n for n in H.nodes() if META[n]["type"] == "company"]
-inv_by_company = {c: {nb for nb in H.neighbors(c) if META[nb]["type"] == "investor"} for c in companies}
-pairs = []
-for i in range(len(companies)):
-    for j in range(i+1, len(companies)):
-        a, b = companies[i], companies[j]
-        shared = inv_by_company[a].intersection(inv_by_company[b])
-        if shared:
-            pairs.append((META[a]["label"], META[b]["label"], sorted(META[s]["label"] for s in shared)))
-if pairs:
-    st.write("Shared investors between companies:")
-    for a, b, lst in pairs[:8]:
-        st.write(f"- {a} ↔ {b}: " + ", ".join(lst))
-
+from centrality import MAX_PIVOTS, MODES, TIME_BUDGET, top_k
+with st.expander("Centrality settings"):
+    bet_mode = st.radio("Betweenness", list(MODES), horizontal=True,
+                        help="auto = exact for small views, sampled pivots for large ones.")
+    bet_samples = int(st.number_input("Pivot samples (0 = derive from error bound)", min_value=0, value=0, step=50,
+                                      help=f"Derived counts are capped at {MAX_PIVOTS} pivots / {TIME_BUDGET:.0f} s; "
+                                           "an explicit count always runs in full."))
+    bet_eps = float(st.slider("Error bound ε", 0.01, 0.2, 0.05))
+    bet_workers = int(st.number_input("Workers (parallel exact)", min_value=2, max_value=max(2, os.cpu_count() or 2),
+                                      value=max(2, min(4, os.cpu_count() or 2))))
+CENTRALITY = SNAP.CENTRALITY
+deg = CENTRALITY.degree(H)
+bet, bet_desc = CENTRALITY.betweenness(H, mode=bet_mode, samples=bet_samples or None, eps=bet_eps, workers=bet_workers)
+top = top_k(H, deg, bet, 5)
+if top.size:
+    st.write(f"Most connected in this view (degree | betweenness, {bet_desc}):")
+    for i in top:
+        n = CG.ids[i]
+        st.write(f"- {META[n]['label']} ({META[n]['type']}) — {deg[i]} | {bet[i]:.3f}")
+
+# Shared investors / co-founders between companies (sparse A·Aᵀ, top pairs only)
+from overlap import shared_columns
+OVERLAP = SNAP.OVERLAP
+companies = [CG.ids[i] for i in OVERLAP.incidence(H, "company", "investor").rows]
+for col_type, heading in (("investor", "Shared investors between companies:"),
+                          ("founder", "Companies sharing co-founders:")):
+    inc = OVERLAP.incidence(H, "company", col_type)
+    pairs = OVERLAP.top_pairs(H, "company", col_type, 8)
+    if pairs:
+        st.write(heading)
+        for a, b, _ in pairs:
+            lst = sorted(META[CG.ids[s]]["label"] for s in shared_columns(inc, [a, b]))
+            st.write(f"- {META[CG.ids[a]]['label']} ↔ {META[CG.ids[b]]['label']}: " + ", ".join(lst))
+
+TRACE.note(view=H); TRACE.mark("intro steps")
 # =================================================
 # Warm Intro Action panel (turn path into steps)
 # =================================================
@@ -452,11 +558,16 @@ if stored_path:
     st.markdown("### Warm Intro Plan")
     steps = [f"{i+1}. {META[n]['label']}  ·  `{META[n]['type']}`" for i, n in enumerate(stored_path)]
     st.write("\n".join(steps))
+    if len(ROUTES) > 1:
+        st.write("**Alternative routes** (lower cost = warmer ties):")
+        st.dataframe([{"Route": i + 1, "Cost": round(c, 2), "Hops": len(p) - 1,
+                       "Path": " → ".join(META[n]["label"] for n in p)} for i, (c, p) in enumerate(ROUTES)],
+                     use_container_width=True, hide_index=True)
 
     if len(stored_path) >= 3:
         intermediaries = stored_path[1:-1]
-        local_deg = {n: H.degree(n) for n in H.nodes()}
-        next_up_id = max(intermediaries, key=lambda n: local_deg.get(n,0), default=None)
+        local_deg = H.degrees()
+        next_up_id = max(intermediaries, key=lambda n: int(local_deg[CG.index[n]]) if n in H else 0, default=None)
         if next_up_id:
             st.write(f"**Next step:** Ask **{META[next_up_id]['label']}** for an intro to **{META[stored_path[-1]]['label']}**.")
 
@@ -470,50 +581,73 @@ if stored_path:
         email = f"Quick favor: could you intro me to {dst}? I’m exploring a conversation and you seem well‑connected to their network."
     st.code(email, language="text")
 
-    # Path CSV download
-    import csv, io
-    buf = io.StringIO()
-    w = csv.writer(buf)
-    w.writerow(["step", "node_id", "label", "type"])
-    for i, n in enumerate(stored_path, start=1):
-        w.writerow([i, n, META[n]["label"], META[n]["type"]])
-    st.download_button("Download path (CSV)", data=buf.getvalue(), file_name="warm_intro_path.csv", mime="text/csv", use_container_width=True)
-
+    # Path CSV download (built on click)
+    def path_csv(routes) -> str:
+        import csv
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(["route", "cost", "step", "node_id", "label", "type"])
+        for r, (cost, route) in enumerate(routes, start=1):
+            for i, n in enumerate(route, start=1):
+                w.writerow([r, f"{cost:.2f}", i, n, META[n]["label"], META[n]["type"]])
+        return buf.getvalue()
+    st.download_button("Download path (CSV)", partial(path_csv, ROUTES or [(float(len(stored_path) - 1), stored_path)]),
+                       file_name="warm_intro_path.csv", mime="text/csv", use_container_width=True)
+
+TRACE.mark("cohort")
+# =================================================
+# Cohort warm intros (many sources -> one target from a single BFS tree)
+# =================================================
+COHORT_ROWS = 1000  # rows in the table; the downloads stream every source
+with st.expander("Cohort warm intros"):
+    all_founders = st.checkbox("All founders in the filtered view", value=False)
+    cohort = pick_nodes("Founders", "cohort", st, pool=H_base, types=["founder"], disabled=all_founders)
+    target_id = pick_node("Target", "cohort_target", st, pool=H_base, none=None,
+                          default=USV_ID if USV_ID in H_base else None)
+    src_ids = ([CG.ids[i] for i in np.flatnonzero(CG.type_mask(["founder"]) & H_base.mask).tolist()] if all_founders
+               else cohort)
+    if src_ids and target_id:
+        shown = sorted(src_ids, key=lambda s: META[s]["label"].lower())[:COHORT_ROWS]
+        cohort_paths = PATHS.batch(H_base, shown, target_id)
+        rows = [{"From": META[s]["label"], "Hops": len(p) - 1 if p else None,
+                 "Path": " → ".join(META[n]["label"] for n in p) if p else "(no path in view)"}
+                for s, p in cohort_paths.items()]
+        st.dataframe(rows, use_container_width=True)
+        if len(src_ids) > len(shown):
+            st.caption(f"First {len(shown):,} of {len(src_ids):,} founders; the downloads include all of them.")
+        def cohort_export(fmt: str, view: GraphView, sources: List[str], target: str) -> bytes:
+            return b"".join(gzipped(iter_paths(view, PATHS, sources, target, META, fmt)))
+        dc1, dc2 = st.columns(2)
+        dc1.download_button("Download paths (CSV, gzip)", partial(cohort_export, "csv", H_base, src_ids, target_id),
+                            file_name="warm_intro_paths.csv.gz", mime="application/gzip", use_container_width=True)
+        dc2.download_button("Download paths (NDJSON, gzip)", partial(cohort_export, "ndjson", H_base, src_ids, target_id),
+                            file_name="warm_intro_paths.ndjson.gz", mime="application/gzip", use_container_width=True)
+
+TRACE.mark("overlap scout")
 # =================================================
 # NEW: Overlap Scout panel (pick 2–4 companies; see shared investors/founders)
 # =================================================
 st.markdown("### Overlap Scout")
-company_labels = sorted([META[n]["label"] for n in companies], key=str.lower)
-chosen = st.multiselect("Pick 2–4 companies to compare", company_labels, max_selections=4)
-
-def id_by_label(label: str) -> str | None:
-    for nid, a in META.items():
-        if a["label"] == label and a["type"] == "company":
-            return nid
-    return None
+company_opts = sorted(companies, key=lambda n: META[n]["label"].lower())  # ids, so equal labels stay distinct
+chosen = st.multiselect("Pick 2–4 companies to compare", company_opts, max_selections=4,
+                        format_func=lambda n: META[n]["label"])
 
 if len(chosen) >= 2:
-    chosen_ids = [id_by_label(lbl) for lbl in chosen]
-    chosen_ids = [cid for cid in chosen_ids if cid in H_base]  # use base view for signal
+    chosen_ids = [cid for cid in chosen if cid in H_base]  # use base view for signal
     if len(chosen_ids) >= 2:
-        # Shared investors
-        inv_sets = [{nb for nb in H_base.neighbors(c) if META[nb]["type"] == "investor"} for c in chosen_ids]
-        shared_inv = set.intersection(*inv_sets) if inv_sets else set()
-
-        # Shared founders (rare but interesting across pivots/acqui-hires)
-        f_sets = [{nb for nb in H_base.neighbors(c) if META[nb]["type"] == "founder"} for c in chosen_ids]
-        shared_founders = set.intersection(*f_sets) if f_sets else set()
+        # Shared investors, and shared founders (rare but interesting across pivots/acqui-hires)
+        shared_inv, shared_founders = shared_signals(SNAP, H_base, chosen_ids)
 
         if shared_inv or shared_founders:
             st.write("**Shared signals across selected companies:**")
             if shared_inv:
                 rows = []
-                for inv in sorted(shared_inv, key=lambda x: META[x]["label"].lower()):
+                for inv in shared_inv:
                     deg = H_base.degree(inv)
                     rows.append({"Investor": META[inv]["label"], "Connections (deg)": deg})
                 st.table(rows)
             if shared_founders:
-                rows = [{"Founder": META[f]["label"]} for f in sorted(shared_founders, key=lambda x: META[x]["label"].lower())]
+                rows = [{"Founder": META[f]["label"]} for f in shared_founders]
                 st.table(rows)
 
             # Best intro candidate among shared investors = highest degree
@@ -527,14 +661,55 @@ if len(chosen) >= 2:
 else:
     st.caption("Tip: pick 2–4 companies to see shared investors/founders and the best intro candidate.")
 
+TRACE.mark("export")
 # =================================================
 # Export (current view)
 # =================================================
-payload = {
-    "nodes": {n: {"label": META[n]["label"], "type": META[n]["type"], "url": META[n].get("url","")} for n in H.nodes()},
-    "edges": [{"u": u, "v": v, "relation": G.get_edge_data(u,v).get("relation","")} for u,v in H.edges() if u in H and v in H],
-    "sources": {n: sorted(list(st.session_state.SOURCES.get(n, []))) for n in H.nodes()},
-}
-st.download_button("Download graph JSON", json.dumps(payload, indent=2), file_name="founder_network.json", use_container_width=True)
+# Every export is a deferred download: nothing is generated until a button is clicked,
+# and the writers stream the view in chunks instead of building a payload dict.
+st.download_button("Download graph JSON", partial(export_bytes, "json", H, META, SOURCES), file_name="founder_network.json",
+                   mime="application/json", use_container_width=True)
+st.download_button("Download graph snapshot (.vcg)", partial(export_bytes, "vcg", H, META, SOURCES), file_name="founder_network.vcg",
+                   mime="application/octet-stream", use_container_width=True,
+                   help="Binary, memory-mappable snapshot. Serve it at startup with GRAPH_SNAPSHOT=path/to/file.vcg.")
+xc1, xc2 = st.columns([2, 1])
+export_fmt = xc1.selectbox("More formats", [k for k in FORMATS if k not in ("json", "vcg") and (find_spec("pyarrow") or "parquet" not in k)],
+                           format_func=lambda k: FORMATS[k][0],
+                           help="Node/edge files use the bulk-load schema, so they can be loaded back with Demo Mode off.")
+xc2.download_button("Download", partial(export_bytes, export_fmt, H, META, SOURCES), file_name=FORMATS[export_fmt][1],
+                    mime=FORMATS[export_fmt][2], use_container_width=True)
 
 st.caption("Note: Demo data is curated for presentation. Public web augmentation can be added later; verify before use.")
+
+# =================================================
+# Performance (spans of this rerun, rolling session history, opt-in profiling)
+# =================================================
+PERF_RUN = TRACE.finish(graph_version=SNAP.version)
+if PROFILER is not None:
+    st.session_state.pop("PROFILER_ACTIVE", None)
+    st.session_state.PERF_PROFILE = PROFILER.stop()
+PERF_HISTORY = st.session_state.setdefault("PERF_HISTORY", deque(maxlen=HISTORY))
+PERF_HISTORY.append(PERF_RUN)
+with st.expander("Performance"):
+    slowest = max(PERF_RUN["spans"], key=lambda s: s["ms"])
+    st.caption(f"This rerun: {PERF_RUN['total_ms']:.0f} ms · slowest stage {slowest['name']} ({slowest['ms']:.0f} ms) · "
+               f"HTML payload {render_stats['html_bytes'] / 1024:.0f} KB")
+    st.dataframe([{"stage": s["name"], "ms": round(s["ms"], 1), "nodes": s.get("nodes"), "edges": s.get("edges"),
+                   "html KB": round(s["html_bytes"] / 1024, 1) if "html_bytes" in s else None} for s in PERF_RUN["spans"]],
+                 use_container_width=True, hide_index=True)
+    if len(PERF_HISTORY) > 1:
+        st.caption(f"Last {len(PERF_HISTORY)} reruns (ms per stage)")
+        st.bar_chart(by_stage(list(PERF_HISTORY)))
+    pc1, pc2 = st.columns(2)
+    if pc1.button("Profile next rerun", help="cProfile + tracemalloc for one rerun (slower while active)."):
+        st.session_state.PROFILE_NEXT = True
+        st.rerun()
+    pc2.download_button("Export spans (JSON)", json.dumps(list(PERF_HISTORY), indent=2), file_name="perf_spans.json",
+                        mime="application/json")
+    prof = st.session_state.get("PERF_PROFILE")
+    if prof:
+        st.markdown("**Profile of the last profiled rerun**")
+        st.code(prof["cprofile"], language="text")
+        st.code(prof["tracemalloc"], language="text")
+        st.download_button("Download cProfile stats (.prof)", prof["prof"], file_name="rerun.prof",
+                           help="Open with pstats or snakeviz.")
@@ -0,0 +1,424 @@
+# bench.py
+# Headless benchmark of the app's pipeline stages on synthetic graphs (no Streamlit).
+#
+#   python bench.py                              # 1k,10k,100k,1M; compare with bench_baseline.json
+#                                                # (committed; recorded at --seed 0, which a comparison must match)
+#   python bench.py --sizes 1k,10k --update      # record/refresh the baseline for those sizes
+#   python bench.py --stages filter,path,render --repeats 5 --out run.json
+#
+# Each stage runs with fresh engines (no cache hits) on the same views the app
+# uses: filter -> H_base (all types, plus a name query), ego -> H (2 hops around
+# USV), and betweenness/overlap/communities/render on H. Latency is the median of
+# --repeats runs; peak memory comes from one extra run under tracemalloc (numpy
+# and scipy buffers included). A stage regresses when it is more than --tolerance
+# slower / bigger than the baseline (and above a small absolute noise floor);
+# a changed output size is reported too, since generation is seeded.
+# A stage that runs past --budget seconds (or fails, e.g. MemoryError under
+# --mem-limit) is recorded as such and skipped at the larger sizes, along with
+# the stages that depend on it. Exit status is 1 when anything regressed.
+# The export_* stages write H_base (the whole filtered graph) to a byte-counting
+# sink: export_payload is the old dict + json.dumps(indent=2) route, the others
+# are the streaming writers (out = bytes written). Parquet buffers live in the
+# Arrow memory pool, which tracemalloc does not see.
+#
+#   python bench.py --startup [--update]         # app cold start instead (Streamlit AppTest);
+#                                                # kept in the same baseline under "startup"
+#
+# --startup runs app.py in a fresh interpreter per sample: "streamlit" is the
+# framework import alone, "first_paint" the first script run (the app's imports
+# and the page up to the Build prompt), "build_demo" the Build click (demo graph
+# plus the first render), "rerun" a warm rerun. peak_mb is the process max RSS at
+# that point and out is the number of loaded modules, so a heavy import creeping
+# back onto the startup path shows up as a regression.
+import argparse
+import io
+import json
+import os
+import platform
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from centrality import MAX_PIVOTS, CentralityCache
+from communities import CommunityCache
+from engine import export_payload
+from exports import iter_paths, stream, write_parquet
+from focus import FocusEngine
+from graph_core import GraphView
+from overlap import OverlapCache
+from paths import PathEngine, WeightedRouter
+from projections import ProjectionCache
+from render import NODE_BUDGET, LayoutCache, render_pyvis
+from search_index import SearchIndex
+from store import USV_ID
+from synth import TYPES, generate, parse_size
+
+BASELINE = "bench_baseline.json"
+SIZES = "1k,10k,100k,1M"
+MIN_MS = 5.0     # absolute noise floors for regression flags
+MIN_MB = 1.0
+BUDGET_S = 120.0
+SLOW_MS = 10_000  # stages slower than this are timed once
+# not imported before the first paint: the renderer and lookups (pyvis brings networkx), and the
+# analysis engines, which load with the first graph (communities and enrich only when used)
+DEFERRED = ("pyvis", "networkx", "requests", "centrality", "communities", "overlap", "projections", "enrich")
+
+
+class StageTimeout(Exception):
+    pass
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]):
+    """Raise StageTimeout after `seconds` (SIGALRM; a no-op where that's unavailable)."""
+    if not seconds or not hasattr(signal, "SIGALRM"):
+        yield; return
+    def fire(*_): raise StageTimeout()
+    prev = signal.signal(signal.SIGALRM, fire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0); signal.signal(signal.SIGALRM, prev)
+
+
+# ---------------- stages ----------------
+# Each takes the context dict and returns (output size, context updates).
+def st_build(ctx):
+    CG, meta, _ = generate(ctx["size"], seed=ctx["seed"])
+    CG.src; CG.index                                      # lazy arrays the other stages need
+    return CG.indices.size // 2, {"CG": CG, "META": meta}
+
+
+def st_index(ctx):
+    search = SearchIndex(ctx["META"])
+    return len(search.grams), {"SEARCH": search}
+
+
+def st_filter(ctx):
+    CG = ctx["CG"]
+    base = CG.view(CG.type_mask(TYPES))
+    hits = CG.view(ctx["SEARCH"].mask(CG.index, CG.n, TYPES, "capital"))
+    base.fingerprint(); hits.fingerprint()
+    return hits.number_of_nodes(), {"H_base": base}
+
+
+def _pair(ctx) -> Tuple[str, str]:
+    CG = ctx["CG"]; rng = np.random.default_rng(ctx["seed"])
+    founders = np.flatnonzero(CG.ntype == CG.type_code("founder"))
+    return CG.ids[int(rng.choice(founders))], CG.ids[int(rng.choice(founders))]
+
+
+def st_path(ctx):
+    src, dst = _pair(ctx)
+    paths = PathEngine(hubs=[USV_ID])
+    p = paths.path(ctx["H_base"], src, USV_ID) + paths.path(ctx["H_base"], src, dst)
+    return len(p), {}
+
+
+def st_routes(ctx):
+    src, dst = _pair(ctx)
+    routes = list(islice(WeightedRouter().k_shortest(ctx["H_base"], src, dst, {}, budget=None), 3))
+    return sum(len(r[1]) for r in routes), {}
+
+
+def st_ego(ctx):
+    H = FocusEngine().focus(ctx["H_base"], USV_ID, 2)
+    H = GraphView(H.g, H.mask)                            # fresh fingerprint for the stages below
+    return H.number_of_nodes(), {"H": H}
+
+
+def st_betweenness(ctx):
+    H = GraphView(ctx["H"].g, ctx["H"].mask)
+    bet, _ = CentralityCache().betweenness(H, mode="auto", samples=MAX_PIVOTS)   # the app's cap, minus its clock
+    return int(np.count_nonzero(bet)), {}
+
+
+def st_overlap(ctx):
+    H = GraphView(ctx["H"].g, ctx["H"].mask); cache = OverlapCache(); pairs = 0
+    for t in ("investor", "founder"):
+        pairs += sum(n for _, _, n in cache.top_pairs(H, "company", t, 8))
+    return pairs, {}
+
+
+def st_communities(ctx):
+    H = GraphView(ctx["H"].g, ctx["H"].mask)
+    return CommunityCache().communities(H).count, {}
+
+
+def st_projection(ctx):
+    return ProjectionCache().project(ctx["H_base"], "coinvest").edges, {}
+
+
+def st_render(ctx):
+    H = GraphView(ctx["H"].g, ctx["H"].mask)
+    html, _ = render_pyvis(H, ctx["META"], budget=NODE_BUDGET, layouts=LayoutCache(max_entries=1))
+    return len(html.encode()), {}
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that only counts bytes."""
+
+    def __init__(self):
+        self.n = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.n += len(b); return len(b)
+
+    def tell(self) -> int:
+        return self.n
+
+
+def st_export_payload(ctx):
+    return len(json.dumps(export_payload(ctx["H_base"], ctx["META"], {}), indent=2).encode()), {}
+
+
+def _stream_stage(*fmts):
+    def run(ctx):
+        return sum(len(c) for f in fmts for c in stream(f, ctx["H_base"], ctx["META"], {})), {}
+    return run
+
+
+def st_export_parquet(ctx):
+    sink = _Sink()
+    for part in ("nodes", "edges"):
+        write_parquet(sink, ctx["H_base"], ctx["META"], {}, part)
+    return sink.n, {}
+
+
+def st_export_paths(ctx):
+    H, CG = ctx["H_base"], ctx["CG"]
+    founders = (CG.ids[i] for i in np.flatnonzero(H.mask & (CG.ntype == CG.type_code("founder"))).tolist())
+    return sum(len(c) for c in iter_paths(H, PathEngine(), founders, USV_ID, ctx["META"])), {}
+
+
+STAGES: Dict[str, Callable] = {
+    "build": st_build, "index": st_index, "filter": st_filter, "path": st_path, "routes": st_routes,
+    "ego": st_ego, "betweenness": st_betweenness, "overlap": st_overlap, "communities": st_communities,
+    "projection": st_projection, "render": st_render,
+    "export_payload": st_export_payload, "export_json": _stream_stage("json"),
+    "export_ndjson": _stream_stage("nodes.ndjson.gz", "edges.ndjson.gz"), "export_graphml": _stream_stage("graphml"),
+    "export_parquet": st_export_parquet, "export_paths": st_export_paths,
+}
+REQUIRES = {"filter": ["build", "index"], "path": ["filter"], "routes": ["filter"], "ego": ["filter"],
+            "betweenness": ["ego"], "overlap": ["ego"], "communities": ["ego"], "projection": ["filter"],
+            "render": ["ego"], "index": ["build"],
+            **{s: ["filter"] for s in ("export_payload", "export_json", "export_ndjson", "export_graphml",
+                                       "export_parquet", "export_paths")}}
+
+
+def _closure(stages: List[str]) -> List[str]:
+    need = set()
+    def add(s):
+        if s in need: return
+        for r in REQUIRES.get(s, []): add(r)
+        need.add(s)
+    for s in stages: add(s)
+    return [s for s in STAGES if s in need]
+
+
+# ---------------- harness ----------------
+def measure(fn, ctx, repeats: int, budget: Optional[float] = BUDGET_S) -> Dict:
+    """{"ms", "peak_mb", "out"}; or {"timeout": budget} / {"error": ...} if the timed run fails."""
+    times = []
+    try:
+        for _ in range(repeats):
+            with time_limit(budget):
+                t0 = time.perf_counter(); out, upd = fn(ctx); times.append((time.perf_counter() - t0) * 1000)
+            if times[-1] > SLOW_MS: break
+    except StageTimeout:
+        return {"timeout": budget}
+    except Exception as e:   # MemoryError under --mem-limit, or a bug at this size
+        return {"error": f"{type(e).__name__}: {e}"[:200]}
+    ctx.update(upd)
+    peak = None
+    tracemalloc.start()
+    try:
+        with time_limit(budget):
+            fn(ctx); peak = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+    except (StageTimeout, MemoryError):
+        pass                 # tracing made it too slow / too big; keep the timing
+    finally:
+        tracemalloc.stop()
+    return {"ms": round(statistics.median(times), 3), "peak_mb": peak, "out": int(out)}
+
+
+def _row(r: Dict) -> str:
+    if "ms" not in r:
+        status = "timeout" if "timeout" in r else "skipped" if "skipped" in r else "failed"
+        return f"{status:>13}  {r.get('error') or r.get('skipped') or ''}"
+    mb = f"{r['peak_mb']:>9.1f} MB" if r["peak_mb"] is not None else f"{'?':>9} MB"
+    return f"{r['ms']:>10.1f} ms {mb}  out={r['out']:,}"
+
+
+def bench(sizes: List[str], stages: List[str], repeats: int = 3, seed: int = 0,
+          budget: Optional[float] = BUDGET_S, log=print) -> Dict:
+    results = {}
+    dropped: Dict[str, str] = {}   # stage -> why it is no longer run at larger sizes
+    for label in sorted(sizes, key=parse_size):
+        ctx = {"size": parse_size(label), "seed": seed}
+        rows = {}
+        for name in _closure(stages):
+            why = dropped.get(name) or next((dropped[r] for r in REQUIRES.get(name, []) if r in dropped), None)
+            if why:
+                rows[name] = {"skipped": why}; dropped.setdefault(name, why)
+                continue
+            rows[name] = measure(STAGES[name], ctx, 1 if name == "build" else repeats, budget)
+            if "ms" not in rows[name]:
+                dropped[name] = f"{'timed out' if 'timeout' in rows[name] else 'failed'} at {label}"
+            if "skipped" not in rows[name]:
+                log(f"{label:>6} {name:<12} {_row(rows[name])}")
+        CG = ctx.get("CG")
+        results[label] = {"nodes": CG.n if CG is not None else None,
+                          "edges": int(CG.indices.size // 2) if CG is not None else None,
+                          "stages": {k: v for k, v in rows.items() if k in stages}}
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = 0.25) -> List[str]:
+    """Regression messages for every (size, stage) present in both."""
+    flags = []
+    for label, res in results.items():
+        base = baseline.get(label, {}).get("stages", {})
+        for name, cur in res["stages"].items():
+            old = base.get(name)
+            if old is None or "ms" not in old: continue
+            if "ms" not in cur:
+                flags.append(f"{label} {name}: was {old['ms']:.1f} ms, now " + _row(cur).strip())
+                continue
+            for metric, floor, unit in (("ms", MIN_MS, "ms"), ("peak_mb", MIN_MB, "MB")):
+                if cur[metric] is None or old[metric] is None: continue
+                if cur[metric] > old[metric] * (1 + tolerance) and cur[metric] - old[metric] > floor:
+                    flags.append(f"{label} {name}: {metric} {old[metric]:.1f} -> {cur[metric]:.1f} {unit} "
+                                 f"(+{(cur[metric] / max(old[metric], 1e-9) - 1) * 100:.0f}%)")
+            if cur["out"] != old["out"]:
+                flags.append(f"{label} {name}: output size {old['out']:,} -> {cur['out']:,}")
+            early = sorted(set(cur.get("loaded", ())) - set(old.get("loaded", ())))
+            if early:
+                flags.append(f"{label} {name}: now imports {', '.join(early)}")
+    return flags
+
+
+# ---------------- app startup ----------------
+STARTUP_PROBE = r"""
+import json, resource, sys, time
+def rss():   # VmHWM starts afresh at exec; ru_maxrss would include the forking parent's peak
+    try:
+        return round(int(next(l for l in open("/proc/self/status") if l.startswith("VmHWM")).split()[1]) / 1024, 1)
+    except (OSError, StopIteration):
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter(); r1 = rss(); m1 = len(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.run(); t2 = time.perf_counter(); r2 = rss(); m2 = len(sys.modules)
+assert not at.exception and at.info, at.exception
+loaded = [m for m in sys.argv[2].split(",") if m in sys.modules]
+at.button[0].click(); at.run(); t3 = time.perf_counter(); r3 = rss(); m3 = len(sys.modules)
+assert not at.exception, at.exception
+at.run(); t4 = time.perf_counter()
+ms = lambda a, b: round((b - a) * 1000, 3)
+print(json.dumps({"streamlit": {"ms": ms(t0, t1), "peak_mb": r1, "out": m1},
+                  "first_paint": {"ms": ms(t1, t2), "peak_mb": r2, "out": m2, "loaded": loaded},
+                  "build_demo": {"ms": ms(t2, t3), "peak_mb": r3, "out": m3},
+                  "rerun": {"ms": ms(t3, t4), "peak_mb": None, "out": 0}}))
+"""
+
+
+def startup(repeats: int = 3, app: str = "app.py", log=print) -> Dict:
+    """Cold start of the Streamlit app, one fresh interpreter per sample (median of `repeats`)."""
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    env.pop("GRAPH_SNAPSHOT", None)
+    runs = []
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-c", STARTUP_PROBE, os.path.join(here, app), ",".join(DEFERRED)],
+                              cwd=here, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"startup probe failed:\n{proc.stderr[-2000:]}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    rows = {}
+    for name in runs[0]:
+        peaks = [r[name]["peak_mb"] for r in runs if r[name]["peak_mb"] is not None]
+        rows[name] = {"ms": round(statistics.median(r[name]["ms"] for r in runs), 3),
+                      "peak_mb": statistics.median(peaks) if peaks else None, "out": runs[-1][name]["out"]}
+        log(f"{'startup':>7} {name:<12} {_row(rows[name])}")
+    loaded = runs[-1]["first_paint"]["loaded"]
+    rows["first_paint"]["loaded"] = loaded
+    log(f"        imported before first paint: {', '.join(loaded) if loaded else 'none of ' + ', '.join(DEFERRED)}")
+    return {"startup": {"nodes": None, "edges": None, "stages": rows}}
+
+
+def _env() -> Dict:
+    import scipy
+    return {"python": platform.python_version(), "numpy": np.__version__, "scipy": scipy.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(), "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1] if __doc__ else None)
+    ap.add_argument("--sizes", default=SIZES, help=f"comma-separated node counts (default {SIZES})")
+    ap.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of: " + ", ".join(STAGES))
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--update", action="store_true", help="write results into the baseline instead of comparing")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / growth before flagging")
+    ap.add_argument("--budget", type=float, default=BUDGET_S, help="seconds per stage run before it is abandoned (0 = none)")
+    ap.add_argument("--mem-limit", type=float, help="address-space limit in GB, so oversized stages fail with MemoryError")
+    ap.add_argument("--out", help="also write this run's results here")
+    ap.add_argument("--startup", action="store_true", help="benchmark the app's cold start instead of the stages")
+    a = ap.parse_args(argv)
+    if a.mem_limit:
+        import resource
+        lim = int(a.mem_limit * 2 ** 30)
+        resource.setrlimit(resource.RLIMIT_AS, (lim, lim))
+    stages = [s for s in a.stages.split(",") if s]
+    bad = [s for s in stages if s not in STAGES]
+    if bad:
+        ap.error(f"unknown stages: {', '.join(bad)}")
+    results = (startup(a.repeats) if a.startup else
+               bench([s.strip() for s in a.sizes.split(",") if s.strip()], stages, a.repeats, a.seed, a.budget or None))
+    run = {"env": _env(), "seed": a.seed, "results": results}
+    if a.out:
+        with open(a.out, "w") as f: json.dump(run, f, indent=2)
+    baseline = {"env": {}, "results": {}}
+    if os.path.exists(a.baseline):
+        with open(a.baseline) as f: baseline = json.load(f)
+    if a.update:
+        for label, res in results.items():   # merge, so sizes/stages not run this time are kept
+            old = baseline["results"].setdefault(label, {"stages": {}})
+            old.update(nodes=res["nodes"], edges=res["edges"]); old["stages"].update(res["stages"])
+        baseline["env"], baseline["seed"] = run["env"], a.seed
+        with open(a.baseline, "w") as f: json.dump(baseline, f, indent=2)
+        print(f"baseline written to {a.baseline}")
+        return 0
+    if not baseline["results"]:
+        print(f"no baseline at {a.baseline}; run with --update to record one")
+        return 0
+    if baseline.get("seed", a.seed) != a.seed:
+        print(f"{a.baseline} was recorded with --seed {baseline['seed']}; output sizes are not comparable")
+        return 1
+    missing = [label for label in results if label not in baseline["results"]]
+    if missing:
+        print(f"not in {a.baseline} (not compared): {', '.join(missing)}")
+    flags = compare(results, baseline["results"], a.tolerance)
+    for msg in flags:
+        print("REGRESSION", msg)
+    print(f"{len(flags)} regression(s) against {a.baseline}" if flags else f"no regressions against {a.baseline}")
+    return 1 if flags else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
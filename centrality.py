@@ -0,0 +1,142 @@
+# centrality.py
+# Degree + betweenness for the Insights panel, over compact graph views.
+#
+# - exact Brandes with level-synchronous (vectorised) BFS per source
+# - sampled/pivot approximation: k random sources, scaled by n/k; k can be
+#   derived from an (eps, delta) error bound, capped at MAX_PIVOTS and cut short
+#   by a time budget (it runs on the script thread), scaled by the pivots done
+# - optional process-pool parallel exact mode
+# Results are numpy arrays aligned with the compact node index and cached by
+# the view fingerprint, so focus/filter toggles back to a seen view are free.
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from graph_core import GraphView, Remap, ViewCache, ViewMove, csr_expand
+
+EXACT_MAX_NODES = 500  # "auto" mode switches to sampling above this
+MODES = ("auto", "exact", "approx", "parallel")
+MAX_PIVOTS = 256       # cap on pivots derived from (eps, delta)
+TIME_BUDGET = 2.0      # seconds for a derived-pivot run; explicit samples are always run in full
+
+
+def samples_for_error(n: int, eps: float = 0.05, delta: float = 0.1) -> int:
+    """Pivots so every normalised score is within eps w.p. 1-delta (Hoeffding + union bound)."""
+    if n <= 2: return n
+    return min(n, math.ceil(math.log(2 * n / delta) / (2 * eps * eps)))
+
+
+def _accumulate(indptr: np.ndarray, indices: np.ndarray, mask: np.ndarray, sources: Iterable[int]) -> np.ndarray:
+    """Sum of Brandes dependencies from each source (unnormalised, both directions)."""
+    n = len(indptr) - 1
+    bc = np.zeros(n)
+    for s in sources:
+        dist = np.full(n, -1, dtype=np.int32); sigma = np.zeros(n)
+        dist[s] = 0; sigma[s] = 1.0
+        frontier = np.array([s], dtype=np.int32); d = 0; levels = []
+        while frontier.size:
+            par, nb = csr_expand(indptr, indices, frontier)
+            keep = mask[nb]
+            par, nb = par[keep], nb[keep]
+            fresh = np.unique(nb[dist[nb] < 0])
+            dist[fresh] = d + 1
+            e = dist[nb] == d + 1
+            par, nb = par[e], nb[e]
+            sigma += np.bincount(nb, weights=sigma[par], minlength=n)
+            levels.append((par, nb))
+            frontier = fresh; d += 1
+        delta = np.zeros(n)
+        for par, nb in reversed(levels):
+            delta += np.bincount(par, weights=sigma[par] / sigma[nb] * (1.0 + delta[nb]), minlength=n)
+        delta[s] = 0.0
+        bc += delta
+    return bc
+
+
+_WORKER: Tuple = ()
+
+
+def _init_worker(indptr, indices, mask):
+    global _WORKER
+    _WORKER = (indptr, indices, mask)
+
+
+def _work(sources):
+    return _accumulate(*_WORKER, sources)
+
+
+def betweenness(view: GraphView, k: Optional[int] = None, seed: int = 0, workers: int = 0,
+                budget: Optional[float] = None) -> Tuple[np.ndarray, int]:
+    """Normalised betweenness (networkx semantics) and the number of sources used; k pivots
+    if given, exact otherwise. With a budget (seconds) sampling stops once it runs out; the
+    pivots done are still a uniform sample, so the scores are scaled by that count."""
+    g = view.g
+    nodes = view.node_ints()
+    n = nodes.size
+    if n <= 2: return np.zeros(g.n), n
+    if k is not None and k < n:
+        sources = np.random.default_rng(seed).choice(nodes, size=k, replace=False)
+    else:
+        sources, k = nodes, n
+    if workers > 1 and len(sources) > workers:
+        chunks = np.array_split(sources, workers * 4)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(g.indptr, g.indices, view.mask)) as ex:
+            bc = sum(ex.map(_work, chunks))
+    elif budget is not None and k < n:
+        stop = time.perf_counter() + budget; bc = np.zeros(g.n); k = 0
+        for s in range(0, sources.size, 8):
+            bc += _accumulate(g.indptr, g.indices, view.mask, sources[s:s + 8]); k = min(s + 8, sources.size)
+            if time.perf_counter() > stop: break
+    else:
+        bc = _accumulate(g.indptr, g.indices, view.mask, sources)
+    bc *= (n / k) / ((n - 1) * (n - 2))
+    bc[~view.mask] = 0.0
+    return bc, k
+
+
+class CentralityCache(ViewCache):
+    """Per-session LRU of degree/betweenness arrays keyed by view fingerprint + settings."""
+
+    def degree(self, view: GraphView) -> np.ndarray:
+        return self.get((view.fingerprint(), "deg"), view.degrees)
+
+    def betweenness(self, view: GraphView, mode: str = "auto", samples: Optional[int] = None,
+                    eps: float = 0.05, delta: float = 0.1, workers: int = 0, seed: int = 0) -> Tuple[np.ndarray, str]:
+        """Returns (scores, description). mode: auto | exact | approx | parallel."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown betweenness mode {mode!r}; expected one of {', '.join(MODES)}")
+        n = view.number_of_nodes()
+        if mode == "auto":
+            mode = "exact" if n <= EXACT_MAX_NODES else "approx"
+        if mode == "approx":
+            want = samples_for_error(n, eps, delta)
+            k = min(n, samples or want, samples or MAX_PIVOTS)
+            key = (view.fingerprint(), "bet", k, seed)
+            bc, used = self.get(key, lambda: betweenness(view, k=k, seed=seed, budget=None if samples else TIME_BUDGET))
+            desc = f"approx · {used} pivots"
+            if not samples:
+                desc += f" (ε={eps}, δ={delta}" + (f"; bound wants {want}, capped" if used < min(n, want) else "") + ")"
+            return bc, desc
+        w = workers if mode == "parallel" else 0
+        key = (view.fingerprint(), "bet", None, 0)
+        return self.get(key, lambda: betweenness(view, workers=w))[0], "exact" + (f" · {w} workers" if w > 1 else "")
+
+    def carry_from(self, old: "CentralityCache", remap: Remap, moves: Dict[str, ViewMove]):
+        """Re-index scores of clean views; patch the full view's degrees; drop the rest."""
+        def convert(key, val, mv):
+            if mv.clean:
+                return (mv.new.fingerprint(),) + key[1:], ((remap.carry(val[0]), val[1]) if key[1] == "bet" else remap.carry(val))
+            if key[1] == "deg":
+                return (mv.new.fingerprint(), "deg"), remap.patch_degrees(val)
+            return None  # betweenness is global; recomputed on demand
+        self.carry(old, moves, convert)
+
+
+def top_k(view: GraphView, primary: np.ndarray, secondary: np.ndarray, k: int = 5) -> np.ndarray:
+    """Node ints of the view sorted by (primary, secondary) descending, first k."""
+    nodes = view.node_ints()
+    order = np.lexsort((-secondary[nodes], -primary[nodes]))
+    return nodes[order[:k]]
@@ -0,0 +1,423 @@
+# engine.py
+# Headless graph engine: the app's queries without Streamlit.
+#
+# Engine wraps a GraphStore and answers path, neighborhood, overlap, centrality
+# and export queries against the current snapshot, reusing the snapshot's
+# engines and caches (so a warm process answers from cache, and the app and a
+# service in the same process share them). Results are plain JSON-ready dicts;
+# query()/batch() take {"op": ..., ...} dicts, which is what service.py serves.
+# Nodes can be referenced by id ("company::etsy"), by "Label (type)" or by a
+# unique label.
+import inspect
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from exports import gzipped, iter_paths, stream
+from focus import MAX_DEPTH
+from graph_core import CompactGraph, GraphView, ViewCache
+from snapshot import from_payload, open_snapshot
+from store import USV_ID, GraphStore, Snapshot
+
+TYPES = ["founder", "company", "investor", "partner"]
+AVOID_PENALTY = 5.0
+# Argument kinds per query method. Every op but info also takes the view filters.
+# check_args() coerces JSON / query-string values to these and rejects anything else.
+FILTER_ARGS = {"types": list, "query": str, "focus": str, "depth": int}
+ARGS = {
+    "path": {"src": str, "dst": str, "k": int, "weighted": bool, "avoid": list},
+    "neighborhood": {"center": str, "depth": int, "limit": int},
+    "overlap": {"companies": list, "top": int},
+    "centrality": {"top": int, "mode": str, "samples": int},
+    "export": {},
+    "info": None,
+    "export_stream": {"format": str},
+    "paths_stream": {"dst": str, "sources": list, "source_type": str, "format": str},
+}
+NULLABLE = {"focus", "samples"}
+BOUNDS = {"k": (1, None), "top": (1, None), "limit": (0, None), "samples": (1, None), "depth": (1, MAX_DEPTH)}
+BOOLS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+# =================================================
+# DEMO DATA (USV + partners + representative portfolio)
+# =================================================
+DEMO_GRAPH = {
+    "nodes": [
+        {"id":"investor::usv","label":"Union Square Ventures","type":"investor","url":"https://www.usv.com/"},
+        {"id":"partner::fred_wilson","label":"Fred Wilson","type":"partner","url":"https://www.usv.com/team/fred-wilson/"},
+        {"id":"partner::albert_wenger","label":"Albert Wenger","type":"partner","url":"https://www.usv.com/team/albert-wenger/"},
+        {"id":"partner::rebecca_kaden","label":"Rebecca Kaden","type":"partner","url":"https://www.usv.com/team/rebecca-kaden/"},
+        {"id":"partner::nick_grossman","label":"Nick Grossman","type":"partner","url":"https://www.usv.com/team/nick-grossman/"},
+        {"id":"partner::andy_weissman","label":"Andy Weissman","type":"partner","url":"https://www.usv.com/team/andy-weissman/"},
+        # Portfolio + founders
+        {"id":"company::etsy","label":"Etsy","type":"company","url":"https://www.etsy.com/"},
+        {"id":"founder::rob_kalin","label":"Rob Kalin","type":"founder","url":"https://en.wikipedia.org/wiki/Etsy"},
+        {"id":"founder::chris_maguire","label":"Chris Maguire","type":"founder","url":"https://en.wikipedia.org/wiki/Etsy"},
+        {"id":"founder::haim_schoppik","label":"Haim Schoppik","type":"founder","url":"https://en.wikipedia.org/wiki/Etsy"},
+
+        {"id":"company::twitter","label":"Twitter (X)","type":"company","url":"https://x.com/"},
+        {"id":"founder::jack_dorsey","label":"Jack Dorsey","type":"founder","url":"https://en.wikipedia.org/wiki/Jack_Dorsey"},
+        {"id":"founder::biz_stone","label":"Biz Stone","type":"founder","url":"https://en.wikipedia.org/wiki/Biz_Stone"},
+        {"id":"founder::ev_williams","label":"Evan Williams","type":"founder","url":"https://en.wikipedia.org/wiki/Evan_Williams_(Internet_entrepreneur)"},
+        {"id":"founder::noah_glass","label":"Noah Glass","type":"founder","url":"https://en.wikipedia.org/wiki/Noah_Glass"},
+
+        {"id":"company::coinbase","label":"Coinbase","type":"company","url":"https://www.coinbase.com/"},
+        {"id":"founder::brian_armstrong","label":"Brian Armstrong","type":"founder","url":"https://en.wikipedia.org/wiki/Brian_Armstrong"},
+        {"id":"founder::fred_ehrsam","label":"Fred Ehrsam","type":"founder","url":"https://en.wikipedia.org/wiki/Fred_Ehrsam"},
+
+        {"id":"company::duolingo","label":"Duolingo","type":"company","url":"https://www.duolingo.com/"},
+        {"id":"founder::luis_von_ahn","label":"Luis von Ahn","type":"founder","url":"https://en.wikipedia.org/wiki/Luis_von_Ahn"},
+        {"id":"founder::severin_hacker","label":"Severin Hacker","type":"founder","url":"https://en.wikipedia.org/wiki/Severin_Hacker"},
+
+        {"id":"company::kickstarter","label":"Kickstarter","type":"company","url":"https://www.kickstarter.com/"},
+        {"id":"founder::perry_chen","label":"Perry Chen","type":"founder","url":"https://en.wikipedia.org/wiki/Kickstarter"},
+        {"id":"founder::yancey_strickler","label":"Yancey Strickler","type":"founder","url":"https://en.wikipedia.org/wiki/Yancey_Strickler"},
+        {"id":"founder::charles_adler","label":"Charles Adler","type":"founder","url":"https://en.wikipedia.org/wiki/Charles_Adler_(entrepreneur)"},
+
+        {"id":"company::tumblr","label":"Tumblr","type":"company","url":"https://www.tumblr.com/"},
+        {"id":"founder::david_karp","label":"David Karp","type":"founder","url":"https://en.wikipedia.org/wiki/David_Karp"},
+
+        {"id":"company::foursquare","label":"Foursquare","type":"company","url":"https://foursquare.com/"},
+        {"id":"founder::dennis_crowley","label":"Dennis Crowley","type":"founder","url":"https://en.wikipedia.org/wiki/Dennis_Crowley"},
+        {"id":"founder::naveen_selvadurai","label":"Naveen Selvadurai","type":"founder","url":"https://en.wikipedia.org/wiki/Naveen_Selvadurai"},
+
+        {"id":"company::soundcloud","label":"SoundCloud","type":"company","url":"https://soundcloud.com/"},
+        {"id":"founder::alexander_ljung","label":"Alexander Ljung","type":"founder","url":"https://en.wikipedia.org/wiki/SoundCloud"},
+        {"id":"founder::eric_wahlforss","label":"Eric Wahlforss","type":"founder","url":"https://en.wikipedia.org/wiki/SoundCloud"},
+
+        # Extra investors for density
+        {"id":"investor::sequoia","label":"Sequoia Capital","type":"investor","url":"https://www.sequoiacap.com/"},
+        {"id":"investor::a16z","label":"Andreessen Horowitz","type":"investor","url":"https://a16z.com/"},
+        {"id":"investor::iconiq","label":"ICONIQ Capital","type":"investor","url":"https://www.iconiqcapital.com/"},
+    ],
+    "edges": [
+        {"u":"partner::fred_wilson","v":"investor::usv","relation":"Partner"},
+        {"u":"partner::albert_wenger","v":"investor::usv","relation":"Partner"},
+        {"u":"partner::rebecca_kaden","v":"investor::usv","relation":"Partner"},
+        {"u":"partner::nick_grossman","v":"investor::usv","relation":"Partner"},
+        {"u":"partner::andy_weissman","v":"investor::usv","relation":"Partner"},
+
+        {"u":"investor::usv","v":"company::etsy","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::twitter","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::coinbase","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::duolingo","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::kickstarter","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::tumblr","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::foursquare","relation":"Invested in"},
+        {"u":"investor::usv","v":"company::soundcloud","relation":"Invested in"},
+
+        {"u":"company::etsy","v":"founder::rob_kalin","relation":"Founded by"},
+        {"u":"company::etsy","v":"founder::chris_maguire","relation":"Founded by"},
+        {"u":"company::etsy","v":"founder::haim_schoppik","relation":"Founded by"},
+
+        {"u":"company::twitter","v":"founder::jack_dorsey","relation":"Founded by"},
+        {"u":"company::twitter","v":"founder::biz_stone","relation":"Founded by"},
+        {"u":"company::twitter","v":"founder::ev_williams","relation":"Founded by"},
+        {"u":"company::twitter","v":"founder::noah_glass","relation":"Founded by"},
+
+        {"u":"company::coinbase","v":"founder::brian_armstrong","relation":"Founded by"},
+        {"u":"company::coinbase","v":"founder::fred_ehrsam","relation":"Founded by"},
+
+        {"u":"company::duolingo","v":"founder::luis_von_ahn","relation":"Founded by"},
+        {"u":"company::duolingo","v":"founder::severin_hacker","relation":"Founded by"},
+
+        {"u":"company::kickstarter","v":"founder::perry_chen","relation":"Founded by"},
+        {"u":"company::kickstarter","v":"founder::yancey_strickler","relation":"Founded by"},
+        {"u":"company::kickstarter","v":"founder::charles_adler","relation":"Founded by"},
+
+        {"u":"company::tumblr","v":"founder::david_karp","relation":"Founded by"},
+
+        {"u":"company::foursquare","v":"founder::dennis_crowley","relation":"Founded by"},
+        {"u":"company::foursquare","v":"founder::naveen_selvadurai","relation":"Founded by"},
+
+        {"u":"company::soundcloud","v":"founder::alexander_ljung","relation":"Founded by"},
+        {"u":"company::soundcloud","v":"founder::eric_wahlforss","relation":"Founded by"},
+
+        {"u":"investor::sequoia","v":"company::twitter","relation":"Investor"},
+        {"u":"investor::a16z","v":"company::coinbase","relation":"Investor"},
+        {"u":"investor::iconiq","v":"company::duolingo","relation":"Investor"},
+    ],
+    "sources": {
+        "investor::usv": ["https://www.usv.com/team/"],
+        "company::etsy": ["https://www.usv.com/portfolio/etsy/","https://en.wikipedia.org/wiki/Etsy"],
+        "company::twitter": ["https://www.usv.com/portfolio/twitter/","https://en.wikipedia.org/wiki/Twitter"],
+        "company::coinbase": ["https://www.usv.com/portfolio/coinbase/","https://en.wikipedia.org/wiki/Coinbase"],
+        "company::duolingo": ["https://www.usv.com/portfolio/duolingo/","https://en.wikipedia.org/wiki/Duolingo"],
+        "company::kickstarter": ["https://www.usv.com/portfolio/kickstarter/","https://en.wikipedia.org/wiki/Kickstarter"],
+        "company::tumblr": ["https://www.usv.com/portfolio/tumblr/","https://en.wikipedia.org/wiki/Tumblr"],
+        "company::foursquare": ["https://www.usv.com/portfolio/foursquare/","https://en.wikipedia.org/wiki/Foursquare"],
+        "company::soundcloud": ["https://www.usv.com/portfolio/soundcloud/","https://en.wikipedia.org/wiki/SoundCloud"]
+    }
+}
+
+
+def build_demo_graph() -> Tuple[CompactGraph, Dict[str, Dict], Dict[str, Set[str]]]:
+    """(CG, meta, sources) for the demo network, built straight into CSR (no networkx)."""
+    meta = {n["id"]: {"type": n["type"], "label": n["label"], "url": n.get("url","")} for n in DEMO_GRAPH["nodes"]}
+    CG = CompactGraph.build(meta, ((e["u"], e["v"], e.get("relation","")) for e in DEMO_GRAPH["edges"]))
+    sources = {nid: set(urls) for nid, urls in (DEMO_GRAPH.get("sources") or {}).items()}
+    return CG, meta, sources
+
+
+# =================================================
+# View building / per-view helpers (shared with app.py)
+# =================================================
+def subgraph_by_filters(CG, snap: Snapshot, typ_filter, query) -> GraphView:
+    """Type filter, plus a label query through the snapshot's index (built on the first query)."""
+    if not (query or "").strip():
+        return CG.view(CG.type_mask(typ_filter))
+    return CG.view(snap.SEARCH.mask(CG.index, CG.n, typ_filter, query))
+
+
+def shared_signals(snap: Snapshot, view: GraphView, company_ids: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """Investors and founders adjacent to every one of the companies (sorted by label)."""
+    from overlap import shared_columns
+    CG = snap.CG; ints = [CG.index[c] for c in company_ids]
+    key = lambda x: snap.META[x]["label"].lower()
+    inv = sorted((CG.ids[i] for i in shared_columns(snap.OVERLAP.incidence(view, "company", "investor"), ints)), key=key)
+    fnd = sorted((CG.ids[i] for i in shared_columns(snap.OVERLAP.incidence(view, "company", "founder"), ints)), key=key)
+    return inv, fnd
+
+
+def export_payload(view: GraphView, meta, sources) -> Dict:
+    """The "Download graph JSON" schema for a view."""
+    return {
+        "nodes": {n: {"label": meta[n]["label"], "type": meta[n]["type"], "url": meta[n].get("url","")} for n in view.nodes()},
+        "edges": [{"u": u, "v": v, "relation": rel} for u, v, rel in view.edges()],
+        "sources": {n: sorted(list(sources.get(n, []))) for n in view.nodes()},
+    }
+
+
+class QueryError(ValueError):
+    pass
+
+
+def _coerce(kind, v):
+    if kind is bool:
+        if isinstance(v, bool): return v
+        if isinstance(v, str) and v.lower() in BOOLS: return BOOLS[v.lower()]
+        raise ValueError
+    if kind is int:
+        if isinstance(v, bool) or (isinstance(v, float) and not v.is_integer()): raise ValueError
+        return int(v)   # "2" -> 2; int(None) / int([..]) raise TypeError
+    if kind is list:
+        if isinstance(v, str): v = [x for x in v.split(",") if x]   # "company" is one type, not seven letters
+        if not isinstance(v, (list, tuple)) or not all(isinstance(x, str) for x in v): raise ValueError
+        return list(v)
+    if not isinstance(v, str): raise ValueError
+    return v
+
+
+def check_args(op: str, q: Dict[str, Any]) -> Dict[str, Any]:
+    """One op's kwargs, coerced to ARGS kinds; QueryError for unknown keys, wrong types or out-of-range values."""
+    spec = ARGS[op]; spec = {**FILTER_ARGS, **spec} if spec is not None else {}
+    out = {}
+    for k, v in q.items():
+        kind = spec.get(k)
+        if kind is None:
+            raise QueryError(f"{op}: unknown argument {k!r}" + (f"; expected {', '.join(spec)}" if spec else ""))
+        if v is None and k in NULLABLE:
+            out[k] = None; continue
+        try:
+            v = _coerce(kind, v)
+        except (TypeError, ValueError):
+            raise QueryError(f"{op}: {k} must be {'a list of strings' if kind is list else kind.__name__}, got {v!r}") from None
+        lo, hi = BOUNDS.get(k, (None, None))
+        if (lo is not None and v < lo) or (hi is not None and v > hi):
+            raise QueryError(f"{op}: {k} must be " + (f">= {lo}" if hi is None else f"{lo}..{hi}") + f", got {v}")
+        out[k] = v
+    bad = set(out.get("types") or ()) - set(TYPES)
+    if bad:
+        raise QueryError(f"{op}: unknown type(s) {', '.join(sorted(bad))}; expected {', '.join(TYPES)}")
+    from centrality import MODES
+    if out.get("mode", "auto") not in MODES:
+        raise QueryError(f"{op}: unknown mode {out['mode']!r}; expected one of {', '.join(MODES)}")
+    return out
+
+
+# =================================================
+# Engine
+# =================================================
+class Engine:
+    OPS = ("path", "neighborhood", "overlap", "centrality", "export", "info")
+
+    def __init__(self, store: Optional[GraphStore] = None):
+        self.store = store or GraphStore()
+        self.views = ViewCache(64)   # (snapshot version, types, query, focus, depth) -> GraphView
+
+    @classmethod
+    def load(cls, source: str = "demo", store: Optional[GraphStore] = None) -> "Engine":
+        """source: "demo", a .vcg snapshot (memory-mapped) or a graph JSON export."""
+        eng = cls(store)
+        if source == "demo":
+            CG, meta, sources = build_demo_graph()
+            eng.store.publish(CG, meta, sources)
+        elif source.endswith(".json"):
+            import json
+            with open(source, encoding="utf-8") as f:
+                CG, meta, sources = from_payload(json.load(f))
+            eng.store.publish(CG, meta, sources)
+        else:
+            CG, meta, sources = open_snapshot(source)
+            eng.store.publish(CG, meta, sources)
+        return eng
+
+    @property
+    def snap(self) -> Snapshot:
+        snap = self.store.current()
+        if snap is None:
+            raise QueryError("No graph loaded.")
+        return snap
+
+    # ---------------- helpers ----------------
+    def resolve(self, ref: str, snap: Optional[Snapshot] = None) -> str:
+        snap = snap or self.snap
+        if ref in snap.CG.index: return ref
+        if ref in snap.LABEL2ID: return snap.LABEL2ID[ref]
+        hits = sorted(set().union(*(snap.SEARCH.ids(ref, t) for t in TYPES)))
+        if len(hits) == 1: return hits[0]
+        raise QueryError(f"Unknown node {ref!r}" if not hits else f"Ambiguous node {ref!r}: {', '.join(hits)}")
+
+    def view(self, types: Optional[Iterable[str]] = None, query: str = "", focus: Optional[str] = None,
+             depth: int = 2, snap: Optional[Snapshot] = None) -> GraphView:
+        """Filtered (and optionally focused) view; repeated filters reuse the same view object."""
+        snap = snap or self.snap
+        types = tuple(sorted(types or TYPES)); center = self.resolve(focus, snap) if focus else None
+        def build():
+            v = subgraph_by_filters(snap.CG, snap, types, query)
+            return snap.FOCUS.focus(v, center, depth) if center else v
+        return self.views.get((snap.version, types, query or "", center, depth if center else None), build)
+
+    def _node(self, snap: Snapshot, nid: str, **extra) -> Dict:
+        m = snap.META[nid]
+        return {"id": nid, "label": m["label"], "type": m["type"], **extra}
+
+    # ---------------- queries ----------------
+    def path(self, src: str, dst: str = USV_ID, k: int = 1, weighted: bool = True, avoid: Sequence[str] = (),
+             snap: Optional[Snapshot] = None, **filters) -> Dict:
+        """Warm intro routes from src to dst (default USV): shortest path, or k relation-aware routes."""
+        snap = snap or self.snap; view = self.view(snap=snap, **filters)
+        s, t = self.resolve(src, snap), self.resolve(dst, snap)
+        if not weighted:
+            p = snap.PATHS.path(view, s, t)
+            routes = [(float(len(p) - 1), p)] if p else []
+        else:
+            penalties = {self.resolve(a, snap): AVOID_PENALTY for a in avoid}
+            routes = []
+            for cost, p in snap.ROUTER.k_shortest(view, s, t, penalties):
+                routes.append((cost, p))
+                if len(routes) >= k: break
+        return {"src": s, "dst": t, "routes": [{"cost": round(c, 3), "hops": len(p) - 1,
+                                                "path": [self._node(snap, n) for n in p]} for c, p in routes]}
+
+    def neighborhood(self, center: str, depth: int = 1, limit: int = 500, snap: Optional[Snapshot] = None,
+                     **filters) -> Dict:
+        """Nodes within `depth` hops of center (hop distance included), nearest first."""
+        snap = snap or self.snap; view = self.view(snap=snap, **filters)
+        c = self.resolve(center, snap)
+        dist = snap.FOCUS.distances(view, c)
+        if dist is None:
+            raise QueryError(f"{c!r} is not in the filtered view")
+        hit = np.flatnonzero((dist > 0) & (dist <= depth))
+        hit = hit[np.argsort(dist[hit], kind="stable")]
+        return {"center": c, "depth": depth, "count": int(hit.size),
+                "nodes": [self._node(snap, snap.CG.ids[i], hops=int(dist[i])) for i in hit[:limit].tolist()]}
+
+    def overlap(self, companies: Sequence[str] = (), top: int = 8, snap: Optional[Snapshot] = None, **filters) -> Dict:
+        """Shared investors/founders of 2+ companies, or the top overlapping company pairs."""
+        snap = snap or self.snap; view = self.view(snap=snap, **filters)
+        if companies:
+            ids = [self.resolve(c, snap) for c in companies]
+            other = [c for c in ids if snap.META[c]["type"] != "company"]
+            if other:
+                raise QueryError(f"overlap: not companies: {', '.join(other)}")
+            missing = [c for c in ids if c not in view]
+            if missing:
+                raise QueryError(f"Not in the filtered view: {', '.join(missing)}")
+            inv, fnd = shared_signals(snap, view, ids)
+            best = max(inv, key=view.degree, default=None)
+            return {"companies": ids, "investors": [self._node(snap, n, degree=view.degree(n)) for n in inv],
+                    "founders": [self._node(snap, n) for n in fnd], "best_intro": best}
+        from overlap import shared_columns
+        CG = snap.CG; out = {}
+        for col in ("investor", "founder"):
+            inc = snap.OVERLAP.incidence(view, "company", col)
+            out[col] = [{"a": CG.ids[a], "b": CG.ids[b], "shared": n,
+                         "via": [CG.ids[i] for i in shared_columns(inc, [a, b])]}
+                        for a, b, n in snap.OVERLAP.top_pairs(view, "company", col, top)]
+        return {"pairs": out}
+
+    def centrality(self, top: int = 10, mode: str = "auto", samples: Optional[int] = None,
+                   snap: Optional[Snapshot] = None, **filters) -> Dict:
+        """Most connected nodes (degree, then betweenness) in the view."""
+        from centrality import top_k
+        snap = snap or self.snap; view = self.view(snap=snap, **filters)
+        deg = snap.CENTRALITY.degree(view)
+        bet, desc = snap.CENTRALITY.betweenness(view, mode=mode, samples=samples)
+        return {"betweenness": desc, "nodes": [self._node(snap, snap.CG.ids[i], degree=int(deg[i]), betweenness=round(float(bet[i]), 6))
+                                               for i in top_k(view, deg, bet, top).tolist()]}
+
+    def export(self, snap: Optional[Snapshot] = None, **filters) -> Dict:
+        snap = snap or self.snap
+        return export_payload(self.view(snap=snap, **filters), snap.META, snap.SOURCES)
+
+    def export_stream(self, format: str = "json", snap: Optional[Snapshot] = None, **filters) -> Iterator[bytes]:
+        """The view in an exports.stream() format (json, graphml, nodes/edges.ndjson|csv, + .gz), chunk by chunk."""
+        snap = snap or self.snap; view = self.view(snap=snap, **filters)
+        try:
+            return stream(format, view, snap.META, snap.SOURCES)   # only the format check runs before iteration
+        except ValueError as e:
+            raise QueryError(str(e)) from None
+
+    def paths_stream(self, dst: str = USV_ID, sources: Sequence[str] = (), source_type: str = "founder",
+                     format: str = "csv", snap: Optional[Snapshot] = None, **filters) -> Iterator[bytes]:
+        """Warm-intro paths to `dst` from `sources` (default: every `source_type` node in the view),
+        off one BFS tree, as csv or ndjson (+ .gz), chunk by chunk."""
+        snap = snap or self.snap; view = self.view(snap=snap, **filters); g = snap.CG
+        base = format.removesuffix(".gz")
+        if base not in ("csv", "ndjson"):
+            raise QueryError(f"Unknown path format {format!r}; expected csv or ndjson, optionally + .gz")
+        target = self.resolve(dst, snap)
+        if sources:
+            src = [self.resolve(x, snap) for x in sources]
+        elif source_type in g.types:
+            src = (g.ids[i] for i in np.flatnonzero(view.mask & (g.ntype == g.type_code(source_type))).tolist())
+        else:
+            raise QueryError(f"Unknown node type {source_type!r}")
+        out = iter_paths(view, snap.PATHS, src, target, snap.META, base)
+        return gzipped(out) if format.endswith(".gz") else out
+
+    def info(self, snap: Optional[Snapshot] = None) -> Dict:
+        snap = snap or self.snap
+        return {"version": snap.version, "nodes": snap.CG.n, "edges": int(snap.CG.indices.size // 2),
+                "types": {t: int(np.count_nonzero(snap.CG.type_mask([t]))) for t in TYPES}, "fingerprint": snap.CG.fingerprint}
+
+    # ---------------- dispatch ----------------
+    def query(self, q: Dict[str, Any], snap: Optional[Snapshot] = None) -> Dict:
+        """One {"op": name, **kwargs} query -> result (against `snap`, default the current
+        snapshot); raises QueryError on bad input."""
+        if not isinstance(q, dict):
+            raise QueryError(f"A query is an object like {{\"op\": \"path\", ...}}, not {type(q).__name__}")
+        q = dict(q); op = q.pop("op", None)
+        if op not in self.OPS:
+            raise QueryError(f"Unknown op {op!r}; expected one of {', '.join(self.OPS)}")
+        q = check_args(op, q)
+        fn = getattr(self, op)
+        try:
+            inspect.signature(fn).bind(**q)
+        except TypeError as e:   # bad/missing arguments
+            raise QueryError(f"{op}: {e}") from None
+        return fn(**q, snap=snap)
+
+    def batch(self, queries: Iterable[Dict[str, Any]]) -> Dict:
+        """Run many queries against one snapshot; a failing query reports its error in place."""
+        t0 = time.perf_counter(); results = []
+        snap = self.snap   # captured once: a delta published mid-batch doesn't split the batch across versions
+        for q in queries:
+            try:
+                results.append({"ok": True, "result": self.query(q, snap)})
+            except QueryError as e:   # one bad query never sinks the batch; anything else is a bug and raises
+                results.append({"ok": False, "error": str(e)})
+        dt = time.perf_counter() - t0
+        return {"results": results, "seconds": round(dt, 6), "qps": round(len(results) / dt, 1) if dt else None}
@@ -0,0 +1,289 @@
+# enrich.py
+# Async web enrichment: look nodes up through the Custom Search API (the same call
+# serp() makes) and merge the hits into SOURCES and node URLs.
+#
+# - one pooled requests.Session (adapter sized to the concurrency limit; requests is
+#   imported when the first Enricher is made, not at app startup); blocking
+#   calls run on a private thread pool, the event loop only schedules them
+# - an asyncio.Semaphore caps requests in flight, a token bucket caps requests/sec
+# - retry with exponential backoff + jitter on 429/5xx and connection errors
+#   (Retry-After is honoured)
+# - SQLite result cache that survives restarts and is shared by worker processes;
+#   concurrent lookups of the same query share one request (in-flight dedupe)
+# - results are handed back in batches; results_delta() turns a batch into a store
+#   Delta, so each batch is published incrementally (GraphStore.apply)
+# serve_stub() speaks the same JSON locally for tests and benchmarks:
+#   python enrich.py --bench 2000 --concurrency 16 --rate 200
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from store import Delta
+
+SEARCH_URL = os.getenv("SEARCH_URL", "https://www.googleapis.com/customsearch/v1")
+CACHE_PATH = os.getenv("ENRICH_CACHE", "serp_cache.sqlite")
+CACHE_TTL = 86400.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+TYPE_HINT = {"founder": "founder", "partner": "venture capital partner", "company": "startup", "investor": "venture capital firm"}
+
+
+class SearchError(Exception):
+    pass
+
+
+def search_params(q: str, num: int, cx: str, key: str) -> Dict:
+    return {"q": q, "cx": cx, "key": key, "num": max(1, min(num, 10))}
+
+
+def parse_items(data: Dict, num: int) -> List[Dict]:
+    """Raises ValueError for a body that is not a search response object."""
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    items = data.get("items") or []
+    return [{"title": it.get("title",""), "snippet": it.get("snippet",""), "link": it.get("link","")}
+            for it in items[:num] if isinstance(it, dict)]
+
+
+def node_query(meta: Dict[str, Dict], nid: str) -> str:
+    m = meta[nid]
+    return f"\"{m['label']}\" {TYPE_HINT.get(m['type'], '')}".strip()
+
+
+# ---------------- cache ----------------
+class ResultCache:
+    """(query, num) -> items, in SQLite (WAL, so several processes can read while one writes).
+    Errors are never cached."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL"); self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS serp (q TEXT, num INTEGER, fetched REAL, items TEXT, PRIMARY KEY (q, num))")
+
+    def get(self, q: str, num: int) -> Optional[List[Dict]]:
+        with self.lock:
+            row = self.db.execute("SELECT fetched, items FROM serp WHERE q = ? AND num = ?", (q, num)).fetchone()
+        if row is None or time.time() - row[0] > self.ttl: return None
+        return json.loads(row[1])
+
+    def put(self, q: str, num: int, items: List[Dict]):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO serp VALUES (?, ?, ?, ?)", (q, num, time.time(), json.dumps(items)))
+
+
+# ---------------- rate limiting ----------------
+class TokenBucket:
+    """`rate` tokens/sec, bursts up to `burst`; rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate; self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity; self.t = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0: return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.t) * self.rate); self.t = now
+                if self.tokens >= 1:
+                    self.tokens -= 1; return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# ---------------- pipeline ----------------
+@dataclass
+class EnrichStats:
+    queries: int = 0
+    cache_hits: int = 0
+    deduped: int = 0       # served by another task's in-flight request
+    fetched: int = 0
+    retries: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def qps(self) -> float:
+        return self.queries / self.seconds if self.seconds else 0.0
+
+
+Batch = Callable[[Dict[str, List[Dict]]], None]  # node id -> items, for one batch of completions
+
+
+class Enricher:
+    def __init__(self, cx: Optional[str] = None, key: Optional[str] = None, endpoint: str = SEARCH_URL,
+                 concurrency: int = 8, rate: float = 10.0, burst: Optional[int] = None, retries: int = 4,
+                 backoff: float = 0.5, timeout: float = 15.0, cache: Optional[ResultCache] = None):
+        self.cx = cx or os.getenv("GOOGLE_CSE_ID", ""); self.key = key or os.getenv("GOOGLE_API_KEY", "")
+        self.endpoint = endpoint; self.concurrency = concurrency; self.rate = rate; self.burst = burst
+        self.retries = retries; self.backoff = backoff; self.timeout = timeout; self.cache = cache
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        self.stats = EnrichStats()
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, q: str, num: int) -> "requests.Response":
+        return self.session.get(self.endpoint, params=search_params(q, num, self.cx, self.key), timeout=self.timeout)
+
+    async def _fetch(self, q: str, num: int) -> List[Dict]:
+        import requests
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            async with self._sem:
+                await self._bucket.acquire()
+                try:
+                    r = await loop.run_in_executor(self._pool, self._get, q, num); why = ""
+                except requests.RequestException as e:
+                    r = None; why = type(e).__name__
+            if r is not None and r.status_code == 200:
+                try:
+                    items = parse_items(r.json(), num)
+                except ValueError as e:   # 200 with an HTML page or a garbled body: this node fails, the run goes on
+                    raise SearchError(f"Unreadable search response ({e}): {r.text[:160]!r}") from None
+                self.stats.fetched += 1
+                return items
+            if r is not None and r.status_code not in RETRY_STATUS:
+                raise SearchError(f"Search error {r.status_code}: {r.text[:160]}")
+            if attempt == self.retries:
+                raise SearchError(why or f"Search error {r.status_code} after {attempt + 1} attempts")
+            self.stats.retries += 1
+            wait = r.headers.get("Retry-After", "") if r is not None else ""
+            await asyncio.sleep(float(wait) if wait.isdigit() else self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    async def search(self, q: str, num: int = 5) -> List[Dict]:
+        hit = self.cache.get(q, num) if self.cache is not None else None
+        if hit is not None:
+            self.stats.cache_hits += 1; return hit
+        fut = self._inflight.get((q, num))
+        if fut is not None:
+            self.stats.deduped += 1
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future(); self._inflight[(q, num)] = fut
+        try:
+            items = await self._fetch(q, num)
+            if self.cache is not None: self.cache.put(q, num, items)
+            fut.set_result(items)
+            return items
+        except Exception as e:
+            fut.set_exception(e); fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[(q, num)]
+
+    async def run(self, queries: Dict[str, str], num: int = 5, batch: int = 50,
+                  on_batch: Optional[Batch] = None) -> Dict[str, List[Dict]]:
+        """queries: node id -> query text. Returns node id -> items; failed lookups map to []."""
+        # loop-bound primitives are created per run, so one Enricher can serve several asyncio.run() calls
+        self._sem = asyncio.Semaphore(self.concurrency); self._bucket = TokenBucket(self.rate, self.burst)
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        t0 = time.perf_counter(); results: Dict[str, List[Dict]] = {}; pending: Dict[str, List[Dict]] = {}
+
+        async def one(nid: str, q: str):
+            try:
+                return nid, await self.search(q, num)
+            except SearchError:
+                self.stats.errors += 1; return nid, []
+
+        with ThreadPoolExecutor(self.concurrency) as self._pool:
+            for done in asyncio.as_completed([one(n, q) for n, q in queries.items()]):
+                nid, items = await done
+                results[nid] = pending[nid] = items; self.stats.queries += 1
+                if on_batch is not None and len(pending) >= batch:
+                    on_batch(pending); pending = {}
+        if on_batch is not None and pending:
+            on_batch(pending)
+        self.stats.seconds += time.perf_counter() - t0
+        return results
+
+    def enrich(self, queries: Dict[str, str], **kw) -> Dict[str, List[Dict]]:
+        """Blocking wrapper for callers without an event loop (e.g. a Streamlit script thread)."""
+        return asyncio.run(self.run(queries, **kw))
+
+
+def results_delta(meta: Dict[str, Dict], sources: Dict[str, Iterable[str]], results: Dict[str, List[Dict]],
+                  max_links: int = 3) -> Tuple[Delta, int]:
+    """Top links go to SOURCES, the first one fills an empty node URL; only changed nodes
+    enter the Delta. Returns (delta, nodes changed)."""
+    delta = Delta(); changed = 0
+    for nid, items in results.items():
+        links = [it["link"] for it in items if it.get("link")][:max_links]
+        if not links or nid not in meta: continue
+        new = set(links) - set(sources.get(nid, ()))
+        for url in sorted(new):
+            delta.add_source(nid, url)
+        m = meta[nid]; fill = not m.get("url")
+        if fill: delta.add_node(nid, m["label"], m["type"], links[0])
+        changed += fill or bool(new)
+    return delta, changed
+
+
+# ---------------- local stub ----------------
+def serve_stub(port: int = 0, latency: float = 0.02, fail_rate: float = 0.0, seed: int = 0) -> ThreadingHTTPServer:
+    """Stand-in for the search endpoint on 127.0.0.1 (daemon thread). `fail_rate` of requests
+    get a 503; `server.hits` counts requests. Stop with server.shutdown()."""
+    rng = random.Random(seed); lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            qs = parse_qs(urlparse(self.path).query)
+            q = qs.get("q", [""])[0]; num = int(qs.get("num", ["5"])[0])
+            with lock:
+                srv.hits += 1; fail = rng.random() < fail_rate
+            time.sleep(latency)
+            if fail:
+                self.send_response(503); self.send_header("Retry-After", "0"); self.end_headers(); return
+            slug = "".join(c if c.isalnum() else "-" for c in q.lower()).strip("-")
+            body = json.dumps({"items": [{"title": f"{q} ({i})", "snippet": f"Result {i} for {q}",
+                                          "link": f"https://example.test/{slug}/{i}"} for i in range(num)]}).encode()
+            self.send_response(200); self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    srv.daemon_threads = True; srv.hits = 0
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    ap = argparse.ArgumentParser(description="Enrichment throughput against the local stub server.")
+    ap.add_argument("--bench", type=int, default=1000, help="number of node lookups")
+    ap.add_argument("--dup", type=float, default=0.1, help="fraction of lookups repeating another query")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--rate", type=float, default=0, help="requests/sec (0 = unlimited)")
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--fail-rate", type=float, default=0.05)
+    a = ap.parse_args()
+    srv = serve_stub(latency=a.latency, fail_rate=a.fail_rate)
+    endpoint = f"http://127.0.0.1:{srv.server_address[1]}/customsearch/v1"
+    uniq = max(1, int(a.bench * (1 - a.dup)))
+    queries = {f"founder::f{i}": f"\"Founder {i % uniq}\" founder" for i in range(a.bench)}
+    with tempfile.TemporaryDirectory() as d:
+        cache = ResultCache(os.path.join(d, "serp.sqlite"))
+        for run in ("cold", "warm"):
+            en = Enricher("stub", "stub", endpoint, concurrency=a.concurrency, rate=a.rate, backoff=0.05, cache=cache)
+            hits0 = srv.hits; en.enrich(queries, batch=100); s = en.stats; en.close()
+            print(f"{run}: {s.queries} lookups in {s.seconds:.2f}s = {s.qps:,.0f}/s · http {srv.hits - hits0} "
+                  f"· fetched {s.fetched} · cache {s.cache_hits} · deduped {s.deduped} · retries {s.retries} · errors {s.errors}")
+        sequential = a.bench * (a.latency + 0.001)
+        print(f"(sequential serp() at this latency would take ~{sequential:.1f}s)")
+    srv.shutdown()
@@ -0,0 +1,312 @@
+# exports.py
+# Streaming exports of a view: graph JSON, node/edge files as NDJSON or CSV (the
+# bulk-load schema ingest.py reads back), GraphML, Parquet, a .vcg snapshot of
+# the view, and warm-intro paths from many sources to one target.
+#
+# Writers walk the view's node ints and CSR edge slots CHUNK rows at a time and
+# yield encoded bytes, so no payload dict, edge list or whole-document string is
+# built: only one chunk of rows is alive at a time, whatever the size of the view.
+# gzipped() compresses any stream on the fly and Parquet is written one row group
+# per chunk. The app hands export_bytes() to deferred download buttons, so
+# nothing is generated until somebody clicks.
+#
+#   python exports.py graph.vcg nodes.ndjson.gz      # format from the file name (or --format)
+#   python exports.py graph.vcg intros.csv.gz --paths-to investor::usv --from founder
+import contextlib
+import csv
+import io
+import json
+import os
+import zlib
+from json.encoder import encode_basestring_ascii as _q   # what json.dumps(str) calls, minus the per-call setup
+from typing import Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+from graph_core import CompactGraph, GraphView
+from paths import PathEngine
+from snapshot import write_snapshot
+
+CHUNK = 10_000        # rows per chunk
+ROW_GROUP = 100_000   # rows per Parquet row group
+PARTS = {"nodes": ("id", "label", "type", "url", "sources"), "edges": ("u", "v", "relation")}
+PATH_COLUMNS = ("source", "target", "hops", "step", "node_id", "label", "type")
+# key -> (menu label, file name, mime); the key is also the file-name suffix the CLI infers
+FORMATS = {
+    "json": ("Graph JSON", "founder_network.json", "application/json"),
+    "json.gz": ("Graph JSON (gzip)", "founder_network.json.gz", "application/gzip"),
+    "nodes.ndjson.gz": ("Nodes · NDJSON (gzip)", "nodes.ndjson.gz", "application/gzip"),
+    "edges.ndjson.gz": ("Edges · NDJSON (gzip)", "edges.ndjson.gz", "application/gzip"),
+    "nodes.csv.gz": ("Nodes · CSV (gzip)", "nodes.csv.gz", "application/gzip"),
+    "edges.csv.gz": ("Edges · CSV (gzip)", "edges.csv.gz", "application/gzip"),
+    "nodes.parquet": ("Nodes · Parquet", "nodes.parquet", "application/vnd.apache.parquet"),
+    "edges.parquet": ("Edges · Parquet", "edges.parquet", "application/vnd.apache.parquet"),
+    "graphml": ("GraphML", "founder_network.graphml", "application/xml"),
+    "graphml.gz": ("GraphML (gzip)", "founder_network.graphml.gz", "application/gzip"),
+    "vcg": ("Graph snapshot (.vcg)", "founder_network.vcg", "application/octet-stream"),
+}
+
+
+# ---------------- chunked walks ----------------
+def _node_chunks(view: GraphView, chunk: int) -> Iterator[np.ndarray]:
+    ints = view.node_ints()
+    for a in range(0, ints.size, chunk):
+        yield ints[a:a + chunk]
+
+
+def _edge_chunks(view: GraphView, chunk: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """(u ints, v ints, relation codes) per chunk, in view.edges() order."""
+    g = view.g
+    slots = np.flatnonzero(view.mask[g.src] & view.mask[g.indices] & (g.src < g.indices))
+    for a in range(0, slots.size, chunk):
+        k = slots[a:a + chunk]
+        yield g.src[k], g.indices[k], g.erel[k]
+
+
+def _rows(view: GraphView, meta, sources, part: str, chunk: int) -> Iterator[List[Tuple]]:
+    """Row tuples in PARTS[part] column order, one list per chunk."""
+    ids = view.g.ids
+    if part == "nodes":
+        for ints in _node_chunks(view, chunk):
+            rows = []
+            for i in ints.tolist():
+                n = ids[i]; m = meta[n]
+                rows.append((n, m["label"], m["type"], m.get("url", ""), ";".join(sorted(sources.get(n, ())))))
+            yield rows
+    elif part == "edges":
+        rel = view.g.relations
+        for u, v, r in _edge_chunks(view, chunk):
+            yield [(ids[a], ids[b], rel[c]) for a, b, c in zip(u.tolist(), v.tolist(), r.tolist())]
+    else:
+        raise ValueError(f"Unknown part {part!r}; expected one of {', '.join(PARTS)}")
+
+
+def _joined(chunks: Iterable[List[str]], head: str, tail: str) -> Iterator[bytes]:
+    """head, the entries joined by ",\\n", tail; one encoded piece per chunk."""
+    yield head.encode(); first = True
+    for lines in chunks:
+        if lines:
+            yield (("\n" if first else ",\n") + ",\n".join(lines)).encode(); first = False
+    yield (("" if first else "\n") + tail).encode()
+
+
+# ---------------- text formats ----------------
+def iter_json(view: GraphView, meta, sources, chunk: int = CHUNK) -> Iterator[bytes]:
+    """The "Download graph JSON" schema (nodes, edges, sources), one entry per line."""
+    q = _q; ids = view.g.ids
+    relq = [q(r) for r in view.g.relations]
+    def nodes():
+        for ints in _node_chunks(view, chunk):
+            lines = []
+            for i in ints.tolist():
+                n = ids[i]; m = meta[n]
+                lines.append(f'{q(n)}: {{"label": {q(m["label"])}, "type": {q(m["type"])}, "url": {q(m.get("url", ""))}}}')
+            yield lines
+    def edges():
+        for u, v, r in _edge_chunks(view, chunk):
+            yield [f'{{"u": {q(ids[a])}, "v": {q(ids[b])}, "relation": {relq[c]}}}'
+                   for a, b, c in zip(u.tolist(), v.tolist(), r.tolist())]
+    def srcs():
+        for ints in _node_chunks(view, chunk):
+            yield [f"{q(ids[i])}: [{', '.join(map(q, sorted(sources.get(ids[i], ()))))}]" for i in ints.tolist()]
+    yield from _joined(nodes(), '{"nodes": {', "},")
+    yield from _joined(edges(), '\n"edges": [', "],")
+    yield from _joined(srcs(), '\n"sources": {', "}}\n")
+
+
+def iter_ndjson(view: GraphView, meta, sources, part: str, chunk: int = CHUNK) -> Iterator[bytes]:
+    """One JSON object per node or edge, in the bulk-load schema (sources ';'-separated)."""
+    keys = [f'"{c}": ' for c in PARTS.get(part, ())]   # every value is a string
+    for rows in _rows(view, meta, sources, part, chunk):
+        yield "".join("{" + ", ".join(k + _q(v) for k, v in zip(keys, r)) + "}\n" for r in rows).encode()
+
+
+def iter_csv(view: GraphView, meta, sources, part: str, chunk: int = CHUNK) -> Iterator[bytes]:
+    buf = io.StringIO(); w = csv.writer(buf)
+    w.writerow(PARTS.get(part, ()))
+    for rows in _rows(view, meta, sources, part, chunk):
+        w.writerows(rows)
+        yield buf.getvalue().encode(); buf.seek(0); buf.truncate()
+    yield buf.getvalue().encode()   # header only, for an empty view
+
+
+def iter_graphml(view: GraphView, meta, chunk: int = CHUNK) -> Iterator[bytes]:
+    """GraphML with label/type/url node attributes and a relation edge attribute."""
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+           + "".join(f'  <key id="{k}" for="{f}" attr.name="{k}" attr.type="string"/>\n'
+                     for k, f in (("label", "node"), ("type", "node"), ("url", "node"), ("relation", "edge")))
+           + '  <graph id="G" edgedefault="undirected">\n').encode()
+    ids = view.g.ids
+    for ints in _node_chunks(view, chunk):
+        parts = []
+        for i in ints.tolist():
+            n = ids[i]; m = meta[n]
+            parts.append(f'    <node id={quoteattr(n)}><data key="label">{escape(m["label"])}</data>'
+                         f'<data key="type">{escape(m["type"])}</data><data key="url">{escape(m.get("url", ""))}</data></node>\n')
+        yield "".join(parts).encode()
+    rel = [escape(r) for r in view.g.relations]
+    for u, v, r in _edge_chunks(view, chunk):
+        yield "".join(f'    <edge source={quoteattr(ids[a])} target={quoteattr(ids[b])}><data key="relation">{rel[c]}</data></edge>\n'
+                      for a, b, c in zip(u.tolist(), v.tolist(), r.tolist())).encode()
+    yield b"  </graph>\n</graphml>\n"
+
+
+def iter_paths(view: GraphView, paths: PathEngine, sources: Iterable[str], target: str, meta,
+               fmt: str = "csv", chunk: int = CHUNK) -> Iterator[bytes]:
+    """Warm-intro paths from every source to `target` off one BFS tree. csv: one row per step
+    (PATH_COLUMNS); ndjson: one object per source. Unreachable sources get hops = empty/null."""
+    ids = view.g.ids
+    if fmt == "csv":
+        buf = io.StringIO(); w = csv.writer(buf); w.writerow(PATH_COLUMNS); rows = 0
+        for s, p in paths.walk(view, sources, target):
+            if not p:
+                w.writerow((s, target, "", "", "", "", "")); rows += 1
+            for step, i in enumerate(p, start=1):
+                n = ids[i]; m = meta[n]
+                w.writerow((s, target, len(p) - 1, step, n, m["label"], m["type"]))
+            rows += len(p)
+            if rows >= chunk:
+                yield buf.getvalue().encode(); buf.seek(0); buf.truncate(); rows = 0
+        yield buf.getvalue().encode()
+    elif fmt == "ndjson":
+        lines = []
+        for s, p in paths.walk(view, sources, target):
+            lines.append(json.dumps({"source": s, "target": target, "hops": len(p) - 1 if p else None,
+                                     "path": [ids[i] for i in p]}) + "\n")
+            if len(lines) >= chunk:
+                yield "".join(lines).encode(); lines = []
+        yield "".join(lines).encode()
+    else:
+        raise ValueError(f"Unknown path format {fmt!r}; expected csv or ndjson")
+
+
+def gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream chunk by chunk."""
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for c in chunks:
+        out = z.compress(c)
+        if out: yield out
+    yield z.flush()
+
+
+def stream(fmt: str, view: GraphView, meta, sources, chunk: int = CHUNK) -> Iterator[bytes]:
+    """Chunks of a text format: json | graphml | nodes/edges.ndjson | nodes/edges.csv, optionally + ".gz"."""
+    base, gz = (fmt[:-3], True) if fmt.endswith(".gz") else (fmt, False)
+    part, _, kind = base.rpartition(".")
+    if base == "json":
+        out = iter_json(view, meta, sources, chunk)
+    elif base == "graphml":
+        out = iter_graphml(view, meta, chunk)
+    elif kind == "ndjson" and part in PARTS:
+        out = iter_ndjson(view, meta, sources, part, chunk)
+    elif kind == "csv" and part in PARTS:
+        out = iter_csv(view, meta, sources, part, chunk)
+    else:
+        text = [k for k in FORMATS if not k.endswith((".parquet", "vcg"))]
+        raise ValueError(f"Unknown stream format {fmt!r}; expected one of {', '.join(text)} (parquet and vcg go through write())")
+    return gzipped(out) if gz else out
+
+
+# ---------------- binary formats ----------------
+def write_parquet(dest, view: GraphView, meta, sources, part: str, chunk: int = ROW_GROUP) -> int:
+    """One row group per chunk; relation is dictionary-encoded (int8 codes, int16 past 127
+    relations). Returns rows written."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).") from e
+    cols = PARTS.get(part)
+    if cols is None:
+        raise ValueError(f"Unknown part {part!r}; expected one of {', '.join(PARTS)}")
+    code = pa.int8() if len(view.g.relations) <= 127 else pa.int16()   # erel widens the same way
+    rel_type = pa.dictionary(code, pa.string())
+    schema = pa.schema([(c, rel_type if c == "relation" else pa.string()) for c in cols])
+    rels = pa.array(list(view.g.relations), pa.string()); ids = view.g.ids; n = 0
+    with pq.ParquetWriter(dest, schema) as w:
+        if part == "edges":
+            for u, v, r in _edge_chunks(view, chunk):
+                w.write_table(pa.table([pa.array([ids[a] for a in u.tolist()], pa.string()),
+                                        pa.array([ids[b] for b in v.tolist()], pa.string()),
+                                        pa.DictionaryArray.from_arrays(pa.array(r, code), rels)], schema=schema))
+                n += u.size
+        else:
+            for rows in _rows(view, meta, sources, part, chunk):
+                w.write_table(pa.table([pa.array(c, pa.string()) for c in zip(*rows)], schema=schema))
+                n += len(rows)
+    return n
+
+
+def subgraph(view: GraphView) -> CompactGraph:
+    """The view as a standalone CompactGraph (node ints renumbered in order)."""
+    g = view.g; keep = view.node_ints()
+    new = np.full(g.n, -1, dtype=np.int64); new[keep] = np.arange(keep.size)
+    sel = view.mask[g.src] & view.mask[g.indices] & (g.src < g.indices)
+    return CompactGraph.from_arrays([g.ids[i] for i in keep.tolist()], g.ntype[keep], list(g.types),
+                                    new[g.src[sel]], new[g.indices[sel]], g.erel[sel], list(g.relations))
+
+
+def write(dest, fmt: str, view: GraphView, meta, sources, chunk: int = CHUNK) -> int:
+    """Write any FORMATS entry (or a stream() format) to a path or binary file object. Returns bytes written."""
+    if fmt == "vcg":
+        return write_snapshot(dest, subgraph(view), meta, sources)
+    if fmt.endswith(".parquet"):
+        write_parquet(dest, view, meta, sources, fmt[:-len(".parquet")], max(chunk, ROW_GROUP))
+        return os.path.getsize(dest) if isinstance(dest, str) else dest.tell()
+    n = 0
+    with (open(dest, "wb") if isinstance(dest, str) else contextlib.nullcontext(dest)) as f:
+        for c in stream(fmt, view, meta, sources, chunk):
+            f.write(c); n += len(c)
+    return n
+
+
+def export_bytes(fmt: str, view: GraphView, meta, sources) -> bytes:
+    """A whole export in memory, for download buttons (gzip keeps it to the compressed size)."""
+    buf = io.BytesIO(); write(buf, fmt, view, meta, sources)
+    return buf.getvalue()
+
+
+def infer_format(name: str) -> Optional[str]:
+    name = name.lower()
+    return max((k for k in FORMATS if name.endswith(k)), key=len, default=None)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    from snapshot import from_payload, open_snapshot
+    ap = argparse.ArgumentParser(description="Export a graph snapshot or JSON export without building it in memory twice.")
+    ap.add_argument("src", help=".vcg snapshot or graph JSON export")
+    ap.add_argument("dest", help="output file ('-' = stdout)")
+    ap.add_argument("--format", help="one of: " + ", ".join(FORMATS) + " (default: from the file name)")
+    ap.add_argument("--types", help="comma-separated node types to keep")
+    ap.add_argument("--paths-to", help="export warm-intro paths to this node id instead (csv/ndjson, optionally .gz)")
+    ap.add_argument("--from", dest="from_type", default="founder", help="node type of the path sources")
+    a = ap.parse_args()
+    if a.src.endswith(".json"):
+        with open(a.src, encoding="utf-8") as f:
+            CG, meta, sources = from_payload(json.load(f))
+    else:
+        CG, meta, sources = open_snapshot(a.src)
+    view = CG.view(CG.type_mask(a.types.split(",")) if a.types else None)
+    out = sys.stdout.buffer if a.dest == "-" else a.dest
+    t0 = time.perf_counter()
+    if a.paths_to:
+        fmt = a.format or ("ndjson" if ".ndjson" in a.dest else "csv")
+        src_ids = (CG.ids[i] for i in np.flatnonzero(view.mask & (CG.ntype == CG.type_code(a.from_type))).tolist())
+        chunks = iter_paths(view, PathEngine(), src_ids, a.paths_to, meta, fmt.removesuffix(".gz"))
+        chunks = gzipped(chunks) if fmt.endswith(".gz") or a.dest.endswith(".gz") else chunks
+        size = 0
+        with (open(out, "wb") if isinstance(out, str) else contextlib.nullcontext(out)) as f:
+            for c in chunks:
+                f.write(c); size += len(c)
+    else:
+        fmt = a.format or infer_format(a.dest)
+        if fmt is None:
+            ap.error(f"can't tell the format from {a.dest!r}; pass --format")
+        size = write(out, fmt, view, meta, sources)
+    dt = time.perf_counter() - t0
+    print(f"wrote {a.dest}: {size:,} bytes in {dt:.2f}s ({size / 2 ** 20 / max(dt, 1e-9):,.1f} MB/s)", file=sys.stderr)
@@ -0,0 +1,102 @@
+# focus.py
+# Hop-bounded ego focus over compact graph views.
+#
+# One BFS to MAX_DEPTH per (view fingerprint, center) records every node's hop
+# distance (int8, -1 = unreached or farther than MAX_DEPTH). Any depth in
+# 1..MAX_DEPTH is then a threshold mask, so moving the depth slider never
+# traverses again. batch() expands many centers together as sparse
+# frontier x adjacency products; warm_async() runs it on a background thread for
+# the highest-degree partner/investor hubs of a settled view, so switching focus
+# to a big hub is a cache hit. The cache is bounded by bytes (each entry is n int8s).
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from graph_core import GraphView, Remap, ViewCache, ViewMove
+
+MAX_DEPTH = 3
+WARM_HUBS = 32          # hubs warmed per view, highest degree first
+CACHE_BYTES = 64 << 20  # hop-distance arrays kept across views and centers
+
+
+class FocusEngine:
+    def __init__(self, hubs: Iterable[str] = (), max_entries: int = 256, max_bytes: int = CACHE_BYTES,
+                 warm_top: int = WARM_HUBS):
+        self.hubs = set(hubs); self.warm_top = warm_top
+        self.dists = ViewCache(max_entries, max_bytes)  # (view fingerprint, center int) -> int8 hops
+        self._warming: Set[str] = set()                 # fingerprints with a warm thread running
+        self._warmed: "OrderedDict[str, None]" = OrderedDict()   # recently warmed fingerprints
+        self._last: Optional[str] = None                # fingerprint of the previous warm_async() call
+        self._lock = threading.Lock()
+
+    def distances(self, view: GraphView, center: str) -> Optional[np.ndarray]:
+        """Hop distance of every node from `center` inside the view, up to MAX_DEPTH."""
+        if center not in view: return None
+        c = view.g.index[center]
+        return self.dists.get((view.fingerprint(), c),
+                              lambda: view.g.bfs([c], view.mask, max_depth=MAX_DEPTH)[0].astype(np.int8))
+
+    def focus(self, view: GraphView, center: str, depth: int) -> GraphView:
+        dist = self.distances(view, center)
+        if dist is None: return view
+        return GraphView(view.g, (dist >= 0) & (dist <= min(depth, MAX_DEPTH)))
+
+    def batch(self, view: GraphView, centers: Iterable[str], chunk: int = 64) -> int:
+        """Fill the cache for every center at once (chunked); returns how many were computed."""
+        g = view.g; fp = view.fingerprint()
+        todo = sorted({g.index[c] for c in centers if c in view} - {k[1] for k in list(self.dists.entries) if k[0] == fp})
+        if not todo: return 0
+        sel = view.mask[g.src] & view.mask[g.indices]
+        A = csr_matrix((np.ones(int(sel.sum()), dtype=np.int32), (g.src[sel], g.indices[sel])), shape=(g.n, g.n))
+        for s in range(0, len(todo), chunk):
+            cs = np.asarray(todo[s:s + chunk]); k = cs.size; rows = np.arange(k)
+            dist = np.full((k, g.n), -1, dtype=np.int8); dist[rows, cs] = 0
+            front = csr_matrix((np.ones(k, dtype=np.int32), (rows, cs)), shape=(k, g.n))
+            for d in range(1, MAX_DEPTH + 1):
+                reach = (front @ A).tocoo()
+                new = dist[reach.row, reach.col] < 0
+                r, c = reach.row[new], reach.col[new]
+                if not r.size: break
+                dist[r, c] = d
+                front = csr_matrix((np.ones(r.size, dtype=np.int32), (r, c)), shape=(k, g.n))
+            for i, c in enumerate(cs.tolist()):
+                self.dists.put((fp, c), dist[i].copy())
+        return len(todo)
+
+    def top_hubs(self, view: GraphView) -> List[str]:
+        """The warm_top hubs in the view with the highest degree."""
+        g = view.g
+        ints = np.sort(np.fromiter((g.index[h] for h in self.hubs if h in view), dtype=np.int64))
+        deg = view.degrees()[ints]
+        return [g.ids[i] for i in ints[np.argsort(-deg, kind="stable")[:self.warm_top]].tolist()]
+
+    def warm_async(self, view: GraphView, centers: Optional[Iterable[str]] = None) -> Optional[threading.Thread]:
+        """batch() for the top hubs (or `centers`) on a daemon thread. A view is warmed once, only after
+        two calls in a row ask for it (so dragging a filter warms nothing), one thread at a time."""
+        fp = view.fingerprint()
+        with self._lock:
+            settled, self._last = fp == self._last, fp
+            if not settled or self._warming or fp in self._warmed: return None
+            self._warming.add(fp)
+
+        def run():
+            try:
+                self.batch(view, self.top_hubs(view) if centers is None else list(centers))
+            finally:
+                with self._lock:
+                    self._warming.discard(fp); self._warmed[fp] = None
+                    while len(self._warmed) > 64:
+                        self._warmed.popitem(last=False)
+        t = threading.Thread(target=run, name="focus-warm", daemon=True)
+        t.start()
+        return t
+
+    def carry_from(self, old: "FocusEngine", remap: Remap, moves: Dict[str, ViewMove]):
+        """Re-index distances of clean views; anything touched is recomputed (or re-warmed)."""
+        def convert(key, val, mv):
+            c = int(remap.fwd[key[1]])
+            return ((mv.new.fingerprint(), c), remap.carry(val, -1)) if mv.clean and c >= 0 else None
+        self.dists.carry(old.dists, moves, convert)
@@ -0,0 +1,387 @@
+# graph_core.py
+# Compact integer-indexed graph store + zero-copy filtered views.
+#
+# Node ids are interned to ints, adjacency is kept CSR-style (both directions
+# of every undirected edge), node types and edge relations are small int codes.
+# A GraphView is just the store plus a boolean node mask, so filtering, focus
+# and "path only" never copy the adjacency.
+# CompactGraph.apply() builds the next graph from a delta and returns a Remap
+# (old int -> new int, changed edges) that per-view caches use to carry their
+# entries forward instead of recomputing everything.
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+SEEN_VIEWS = 64  # recent view masks kept per graph so a delta can carry their cached results
+
+
+def csr_expand(indptr: np.ndarray, indices: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """All (parent, neighbor) slot pairs for a frontier of node ints."""
+    starts = indptr[frontier]; lens = indptr[frontier + 1] - starts
+    total = int(lens.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+    offs = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(total)
+    return np.repeat(frontier, lens), indices[offs]
+
+
+class CompactGraph:
+    def __init__(self, ids: List[str], ntype: np.ndarray, types: List[str],
+                 indptr: np.ndarray, indices: np.ndarray, erel: np.ndarray, relations: List[str]):
+        self.ids = ids                                   # int -> node id (list, or any sequence of str)
+        self.types = types                               # type code -> name
+        self.ntype = ntype                               # int8 type code per node
+        self.indptr = indptr                             # int64, len n+1
+        self.indices = indices                           # int32 neighbor per slot
+        self.erel = erel                                 # int8 (int16 if >127) relation code per slot
+        self.relations = relations                       # relation code -> name
+        self.seen_views: "OrderedDict[str, np.ndarray]" = OrderedDict()  # view fingerprint -> mask, for apply()
+
+    # index and src are derived lazily so a memory-mapped snapshot opens without an O(n) pass
+    @cached_property
+    def index(self) -> Dict[str, int]:
+        """node id -> int"""
+        return {nid: i for i, nid in enumerate(self.ids)}
+
+    @cached_property
+    def src(self) -> np.ndarray:
+        """Source node int per CSR slot."""
+        return np.repeat(np.arange(self.n, dtype=np.int32), np.diff(self.indptr))
+
+    # ---------------- build ----------------
+    @classmethod
+    def build(cls, meta: Dict[str, Dict], edges: Iterable[Tuple[str, str, str]]) -> "CompactGraph":
+        ids = list(meta.keys())
+        index = {nid: i for i, nid in enumerate(ids)}
+        types: List[str] = []; tcode: Dict[str, int] = {}
+        ntype = np.empty(len(ids), dtype=np.int8)
+        for i, nid in enumerate(ids):
+            t = meta[nid]["type"]
+            if t not in tcode:
+                tcode[t] = len(types); types.append(t)
+            ntype[i] = tcode[t]
+
+        relations: List[str] = [""]; rcode: Dict[str, int] = {"": 0}
+        us: List[int] = []; vs: List[int] = []; rs: List[int] = []
+        for u, v, rel in edges:
+            rel = rel or ""
+            if rel not in rcode:
+                rcode[rel] = len(relations); relations.append(rel)
+            us.append(index[u]); vs.append(index[v]); rs.append(rcode[rel])
+        return cls.from_arrays(ids, ntype, types, np.asarray(us, dtype=np.int32), np.asarray(vs, dtype=np.int32),
+                               np.asarray(rs, dtype=np.int16), relations)
+
+    @classmethod
+    def from_arrays(cls, ids: List[str], ntype: np.ndarray, types: List[str], us: np.ndarray, vs: np.ndarray,
+                    rels: np.ndarray, relations: List[str]) -> "CompactGraph":
+        """CSR from parallel edge arrays; undirected, self-loops dropped, duplicate pairs keep
+        the last relation (like nx.Graph)."""
+        n = len(ids)
+        a = np.minimum(us, vs).astype(np.int64); b = np.maximum(us, vs).astype(np.int64)
+        keep = a != b
+        a, b, rels = a[keep], b[keep], rels[keep]
+        key = (a << 32) | b
+        _, last = np.unique(key[::-1], return_index=True)
+        last = key.size - 1 - last
+        us, vs, rs = a[last].astype(np.int32), b[last].astype(np.int32), rels[last]
+        src = np.concatenate([us, vs]); dst = np.concatenate([vs, us])
+        rel2 = np.concatenate([rs, rs]).astype(np.int8 if len(relations) < 128 else np.int16)
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(ids, ntype, types, indptr, dst[order], rel2[order], relations)
+
+    # ---------------- deltas ----------------
+    def apply(self, add_ids: List[str], add_types: List[str], remove: Iterable[str] = (),
+              add_edges: Iterable[Tuple[str, str, str]] = (), remove_edges: Iterable[Tuple[str, str]] = ()
+              ) -> Tuple["CompactGraph", "Remap"]:
+        """Next graph after removing nodes/edges and adding nodes/edges (re-adding an edge sets its
+        relation). Surviving nodes keep their relative order and new nodes are appended, so the
+        old -> new int map is monotone."""
+        removed = np.zeros(self.n, dtype=bool)
+        removed[[self.index[r] for r in remove if r in self.index]] = True
+        kept = np.flatnonzero(~removed)
+        fwd = np.full(self.n, -1, dtype=np.int64); fwd[kept] = np.arange(kept.size)
+        ids = [self.ids[i] for i in kept.tolist()] + list(add_ids)
+        index = {nid: i for i, nid in enumerate(ids)}
+        types = list(self.types)
+        for t in add_types:
+            if t not in types: types.append(t)
+        ntype = np.concatenate([self.ntype[kept], np.asarray([types.index(t) for t in add_types], dtype=np.int8)])
+        relations = list(self.relations); add_edges = list(add_edges)
+        for _, _, rel in add_edges:
+            if (rel or "") not in relations: relations.append(rel or "")
+
+        sel = (self.src < self.indices) & ~removed[self.src] & ~removed[self.indices]
+        a, b, r = fwd[self.src[sel]], fwd[self.indices[sel]], self.erel[sel].astype(np.int16)
+        old_key = (a << 32) | b
+        gone = [(index[u], index[v]) for u, v in remove_edges if u in index and v in index]
+        if gone:
+            gone = np.asarray(gone, dtype=np.int64)
+            gk = (gone.min(1) << 32) | gone.max(1)
+            keep = ~np.isin(old_key, gk)
+            a, b, r = a[keep], b[keep], r[keep]
+        ea = np.asarray([index[u] for u, _, _ in add_edges], dtype=np.int64)
+        eb = np.asarray([index[v] for _, v, _ in add_edges], dtype=np.int64)
+        er = np.asarray([relations.index(rel or "") for _, _, rel in add_edges], dtype=np.int16)
+        new = CompactGraph.from_arrays(ids, ntype, types, np.concatenate([a, ea]), np.concatenate([b, eb]),
+                                       np.concatenate([r, er]), relations)
+
+        nsel = new.src < new.indices
+        new_key = (new.src[nsel].astype(np.int64) << 32) | new.indices[nsel]
+        new_rel = new.erel[nsel]
+        split = lambda k: np.stack([k >> 32, k & 0xFFFFFFFF], axis=1)
+        both, io, jn = np.intersect1d(old_key, new_key, return_indices=True)
+        relabelled = both[self.erel[sel][io] != new_rel[jn]]  # codes agree: new.relations extends self.relations
+        return new, Remap(self, new, fwd, removed,
+                          added=split(np.setdiff1d(new_key, old_key)), dropped=split(np.setdiff1d(old_key, new_key)),
+                          relabelled=split(relabelled))
+
+    # ---------------- basics ----------------
+    @property
+    def n(self) -> int:
+        return len(self.ids)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Content hash of ids + adjacency; stable across rebuilds of the same graph."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update("\x00".join(self.ids).encode())
+        for a in (self.ntype, self.indptr, self.indices, self.erel):
+            h.update(a.tobytes())
+        return h.hexdigest()
+
+    def type_code(self, t: str) -> int:
+        return self.types.index(t) if t in self.types else -1
+
+    def type_mask(self, types: Iterable[str]) -> np.ndarray:
+        codes = [self.type_code(t) for t in types]
+        return np.isin(self.ntype, [c for c in codes if c >= 0])
+
+    def neighbors(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def edge_slot(self, a: int, b: int) -> int:
+        lo, hi = self.indptr[a], self.indptr[a + 1]
+        k = lo + int(np.searchsorted(self.indices[lo:hi], b))
+        return k if k < hi and self.indices[k] == b else -1
+
+    def relation(self, a: int, b: int) -> str:
+        k = self.edge_slot(a, b)
+        return self.relations[self.erel[k]] if k >= 0 else ""
+
+    def remember(self, fp: str, mask: np.ndarray):
+        self.seen_views[fp] = mask
+        while len(self.seen_views) > SEEN_VIEWS:
+            self.seen_views.popitem(last=False)
+
+    def view(self, mask: Optional[np.ndarray] = None) -> "GraphView":
+        return GraphView(self, np.ones(self.n, dtype=bool) if mask is None else mask)
+
+    # ---------------- traversal ----------------
+    def expand(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return csr_expand(self.indptr, self.indices, frontier)
+
+    def bfs(self, sources: Iterable[int], mask: np.ndarray, max_depth: Optional[int] = None,
+            target: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Level-synchronous BFS restricted to `mask`; returns (dist, parent), -1 = unreached."""
+        dist = np.full(self.n, -1, dtype=np.int32); parent = np.full(self.n, -1, dtype=np.int32)
+        frontier = np.asarray([s for s in sources if mask[s]], dtype=np.int32)
+        dist[frontier] = 0; d = 0
+        while frontier.size and (max_depth is None or d < max_depth):
+            if target is not None and dist[target] >= 0: break
+            par, nb = self.expand(frontier)
+            keep = mask[nb] & (dist[nb] < 0)
+            nb, par = nb[keep], par[keep]
+            nb, first = np.unique(nb, return_index=True)
+            d += 1
+            dist[nb] = d; parent[nb] = par[first]
+            frontier = nb
+        return dist, parent
+
+
+class ViewCache:
+    """Small thread-safe LRU for derived per-view results, keyed by (view fingerprint, ...).
+    compute() runs outside the lock; two racing misses just compute twice. With max_bytes
+    the LRU is also bounded by the arrays it holds (values without .nbytes count as 0)."""
+
+    def __init__(self, max_entries: int = 16, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries; self.max_bytes = max_bytes
+        self.entries: "OrderedDict[tuple, object]" = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        val = compute()
+        self.put(key, val)
+        return val
+
+    def put(self, key: tuple, val):
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= getattr(self.entries.pop(key), "nbytes", 0)
+            self.entries[key] = val; self.bytes += getattr(val, "nbytes", 0)
+            while len(self.entries) > self.max_entries or \
+                    (self.max_bytes is not None and self.bytes > self.max_bytes and len(self.entries) > 1):
+                self.bytes -= getattr(self.entries.popitem(last=False)[1], "nbytes", 0)
+
+    def carry(self, old: "ViewCache", moves: Dict[str, "ViewMove"],
+              convert: Callable[[tuple, object, "ViewMove"], Optional[Tuple[tuple, object]]]):
+        """Seed from the previous graph's cache: convert(key, value, move) returns the
+        (key, value) to keep for the new graph, or None to drop the entry."""
+        with old.lock:
+            items = list(old.entries.items())
+        for key, val in items:
+            mv = moves.get(key[0])
+            out = convert(key, val, mv) if mv is not None else None
+            if out is not None:
+                self.put(*out)
+
+
+class GraphView:
+    """A CompactGraph restricted to the nodes where `mask` is True (no copies)."""
+
+    def __init__(self, g: CompactGraph, mask: np.ndarray):
+        self.g = g; self.mask = mask
+        self._fp: Optional[str] = None
+
+    # nx-like surface used by the app
+    def __contains__(self, nid) -> bool:
+        i = self.g.index.get(nid)
+        return i is not None and bool(self.mask[i])
+
+    def number_of_nodes(self) -> int:
+        return int(self.mask.sum())
+
+    def number_of_edges(self) -> int:
+        return int(self._edge_sel().sum())
+
+    def fingerprint(self) -> str:
+        """Graph fingerprint + node mask; changes whenever filters/focus change the view."""
+        if self._fp is None:
+            h = hashlib.blake2b(self.g.fingerprint.encode(), digest_size=16)
+            h.update(np.packbits(self.mask).tobytes())
+            self._fp = h.hexdigest()
+            self.g.remember(self._fp, self.mask)
+        return self._fp
+
+    def node_ints(self) -> np.ndarray:
+        return np.flatnonzero(self.mask)
+
+    def nodes(self) -> List[str]:
+        ids = self.g.ids
+        return [ids[i] for i in self.node_ints()]
+
+    def _edge_sel(self) -> np.ndarray:
+        g = self.g
+        return self.mask[g.src] & self.mask[g.indices] & (g.src < g.indices)
+
+    def edges(self) -> Iterator[Tuple[str, str, str]]:
+        g = self.g; sel = np.flatnonzero(self._edge_sel())
+        for k in sel:
+            yield g.ids[g.src[k]], g.ids[g.indices[k]], g.relations[g.erel[k]]
+
+    def neighbor_ints(self, i: int) -> np.ndarray:
+        nb = self.g.neighbors(i)
+        return nb[self.mask[nb]]
+
+    def neighbors(self, nid: str) -> List[str]:
+        ids = self.g.ids
+        return [ids[j] for j in self.neighbor_ints(self.g.index[nid])]
+
+    def has_edge(self, u: str, v: str) -> bool:
+        if u not in self or v not in self: return False
+        return self.g.edge_slot(self.g.index[u], self.g.index[v]) >= 0
+
+    def degrees(self) -> np.ndarray:
+        """Degree of every node inside the view, aligned with the compact node index."""
+        g = self.g
+        cs = np.zeros(len(g.indices) + 1, dtype=np.int64)
+        np.cumsum(self.mask[g.indices], out=cs[1:])
+        deg = (cs[g.indptr[1:]] - cs[g.indptr[:-1]]).astype(np.int32)
+        deg[~self.mask] = 0
+        return deg
+
+    def degree(self, nid: str) -> int:
+        return int(self.neighbor_ints(self.g.index[nid]).size)
+
+    # derived views
+    def restrict(self, mask: np.ndarray) -> "GraphView":
+        return GraphView(self.g, self.mask & mask)
+
+    def only(self, nids: Iterable[str]) -> "GraphView":
+        m = np.zeros(self.g.n, dtype=bool)
+        m[[self.g.index[n] for n in nids if n in self.g.index]] = True
+        return self.restrict(m)
+
+    def ego(self, center: str, radius: int) -> "GraphView":
+        if center not in self: return self
+        dist, _ = self.g.bfs([self.g.index[center]], self.mask, max_depth=radius)
+        return GraphView(self.g, dist >= 0)
+
+    def shortest_path(self, src: str, dst: str) -> List[str]:
+        if src not in self or dst not in self: return []
+        s, t = self.g.index[src], self.g.index[dst]
+        dist, parent = self.g.bfs([s], self.mask, target=t)
+        if dist[t] < 0: return []
+        out = [t]
+        while out[-1] != s:
+            out.append(int(parent[out[-1]]))
+        return [self.g.ids[i] for i in reversed(out)]
+
+
+class ViewMove(NamedTuple):
+    old: GraphView
+    new: GraphView
+    clean: bool  # induced subgraph unchanged; cached results only need re-indexing
+
+
+class Remap(NamedTuple):
+    """How CompactGraph.apply() changed the graph."""
+    old: CompactGraph
+    new: CompactGraph
+    fwd: np.ndarray          # old int -> new int, -1 if removed
+    removed: np.ndarray      # bool per old int
+    added: np.ndarray        # (k, 2) new ints of edges that did not exist before
+    dropped: np.ndarray      # (k, 2) new ints of removed edges between surviving nodes
+    relabelled: np.ndarray   # (k, 2) new ints of edges whose relation changed
+
+    def carry(self, values: np.ndarray, fill=0) -> np.ndarray:
+        """Per-node array of the old graph re-indexed to the new one; new nodes get `fill`."""
+        out = np.full(self.new.n, fill, dtype=values.dtype)
+        kept = self.fwd >= 0
+        out[self.fwd[kept]] = values[kept]
+        return out
+
+    def patch_degrees(self, deg: np.ndarray) -> np.ndarray:
+        """Full-graph degree array after the delta, updated in O(changes) instead of O(E)."""
+        out = self.carry(deg)
+        _, nb = csr_expand(self.old.indptr, self.old.indices, np.flatnonzero(self.removed).astype(np.int32))
+        nb = self.fwd[nb]
+        np.subtract.at(out, nb[nb >= 0], 1)
+        np.add.at(out, self.added.ravel(), 1); np.subtract.at(out, self.dropped.ravel(), 1)
+        return out
+
+    def moves(self) -> Dict[str, ViewMove]:
+        """Views seen on the old graph that have a well-defined successor: a clean view (no
+        removed node, no changed edge inside) keeps its node set; the full view becomes the
+        full new view. Anything else is dropped, i.e. recomputed on demand."""
+        inv = self.carry(np.arange(self.old.n), fill=-1)
+        ch = np.concatenate([self.added, self.dropped, self.relabelled])
+        ca, cb = inv[ch[:, 0]], inv[ch[:, 1]]
+        ca, cb = ca[(ca >= 0) & (cb >= 0)], cb[(ca >= 0) & (cb >= 0)]
+        full = self.new.view(); out = {}
+        for fp, mask in list(self.old.seen_views.items()):
+            if mask.all():
+                out[fp] = ViewMove(GraphView(self.old, mask), full, False)
+            elif not mask[self.removed].any() and not (mask[ca] & mask[cb]).any():
+                out[fp] = ViewMove(GraphView(self.old, mask), GraphView(self.new, self.carry(mask, False)), True)
+        return out
@@ -0,0 +1,166 @@
+# ingest.py
+# Streaming bulk loader for real portfolio exports (CSV / JSONL / Parquet, optionally .gz).
+#
+# Node and edge files are read in fixed-size chunks; each chunk is validated and
+# turned into int arrays right away, so only one chunk of row dicts is alive at a
+# time. Edges are deduped with a vectorised pass at the end and the CompactGraph
+# is built straight from the arrays (no networkx graph, no full list of dicts).
+#
+#   nodes: id, label, type, url[, sources]   (sources = ';'-separated URLs)
+#   edges: u, v[, relation]
+#   sources (optional): id, url
+import contextlib
+import csv
+import gzip
+import io
+import json
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+import numpy as np
+
+from graph_core import CompactGraph
+
+ID_RE = re.compile(r"^([a-z][a-z0-9_]*)::([A-Za-z0-9][A-Za-z0-9_.\-]*)$")  # type::slug
+CHUNK_ROWS = 50_000
+
+Progress = Callable[[str, int, float], None]  # (stage, rows so far, rows/sec)
+
+
+@dataclass
+class IngestStats:
+    node_rows: int = 0
+    edge_rows: int = 0
+    source_rows: int = 0
+    invalid_ids: int = 0
+    dangling_edges: int = 0       # endpoint not in the node file
+    duplicate_edges: int = 0
+    seconds: float = 0.0
+    examples: List[str] = field(default_factory=list)  # first few rejected rows
+
+    @property
+    def rows_per_sec(self) -> float:
+        return (self.node_rows + self.edge_rows + self.source_rows) / self.seconds if self.seconds else 0.0
+
+    def reject(self, why: str):
+        if len(self.examples) < 10: self.examples.append(why)
+
+
+# ---------------- chunked readers ----------------
+def _name(src) -> str:
+    return (src if isinstance(src, str) else getattr(src, "name", "")).lower()
+
+
+def _rows(src, name: str) -> Iterator[Dict]:
+    with (open(src, "rb") if isinstance(src, str) else contextlib.nullcontext(src)) as f:
+        raw = gzip.GzipFile(fileobj=f) if _name(src).endswith(".gz") else f
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        if name.endswith((".jsonl", ".ndjson")):
+            yield from (json.loads(line) for line in text if line.strip())
+        else:
+            yield from csv.DictReader(text)
+
+
+def read_chunks(src, chunk_rows: int = CHUNK_ROWS) -> Iterator[List[Dict]]:
+    """Yield lists of row dicts, at most chunk_rows each. `src` is a path or a named file object."""
+    name = _name(src).removesuffix(".gz")
+    if name.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet input needs pyarrow (pip install pyarrow).") from e
+        for batch in pq.ParquetFile(src).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pylist()
+        return
+    if not name.endswith((".csv", ".jsonl", ".ndjson")):
+        raise ValueError(f"Unsupported file type: {name!r} (use .csv, .jsonl or .parquet)")
+    chunk: List[Dict] = []
+    for row in _rows(src, name):
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk; chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------------- loader ----------------
+@dataclass
+class IngestResult:
+    CG: CompactGraph
+    meta: Dict[str, Dict]
+    sources: Dict[str, Set[str]]
+    stats: IngestStats
+
+
+def load_portfolio(nodes_src, edges_src, sources_src=None, chunk_rows: int = CHUNK_ROWS,
+                   progress: Optional[Progress] = None) -> IngestResult:
+    t0 = time.perf_counter(); stats = IngestStats()
+    report = (lambda stage, rows: progress(stage, rows, rows / max(time.perf_counter() - t0, 1e-9))) if progress else (lambda *a: None)
+
+    # nodes: intern ids in file order; a repeated id updates its attributes in place
+    ids: List[str] = []; index: Dict[str, int] = {}
+    meta: Dict[str, Dict] = {}; sources: Dict[str, Set[str]] = defaultdict(set)
+    types: List[str] = []; tcode: Dict[str, int] = {}; ntype_chunks: List[np.ndarray] = []; ntype_fix: Dict[int, int] = {}
+    for chunk in read_chunks(nodes_src, chunk_rows):
+        codes = []
+        for r in chunk:
+            stats.node_rows += 1
+            nid = str(r.get("id") or "").strip()
+            m = ID_RE.match(nid)
+            typ = str(r.get("type") or (m.group(1) if m else "")).strip()
+            if not m or m.group(1) != typ:
+                stats.invalid_ids += 1; stats.reject(f"node {nid!r} (type {typ!r})"); continue
+            if typ not in tcode:
+                tcode[typ] = len(types); types.append(typ)
+            meta[nid] = {"type": typ, "label": str(r.get("label") or m.group(2)), "url": str(r.get("url") or "")}
+            for u in str(r.get("sources") or "").split(";"):
+                if u.strip(): sources[nid].add(u.strip())
+            if nid in index:
+                ntype_fix[index[nid]] = tcode[typ]; continue
+            index[nid] = len(ids); ids.append(nid); codes.append(tcode[typ])
+        ntype_chunks.append(np.asarray(codes, dtype=np.int8))
+        report("nodes", stats.node_rows)
+    ntype = np.concatenate(ntype_chunks) if ntype_chunks else np.empty(0, dtype=np.int8)
+    for i, c in ntype_fix.items():
+        ntype[i] = c
+
+    # edges: one int32/int16 array triple per chunk
+    relations: List[str] = [""]; rcode: Dict[str, int] = {"": 0}
+    us, vs, rs = [], [], []
+    for chunk in read_chunks(edges_src, chunk_rows):
+        cu, cv, cr = [], [], []
+        for r in chunk:
+            stats.edge_rows += 1
+            u, v = str(r.get("u") or "").strip(), str(r.get("v") or "").strip()
+            a, b = index.get(u), index.get(v)
+            if a is None or b is None:
+                if not (ID_RE.match(u) and ID_RE.match(v)):
+                    stats.invalid_ids += 1; stats.reject(f"edge {u!r} -> {v!r}")
+                else:
+                    stats.dangling_edges += 1
+                continue
+            rel = str(r.get("relation") or "")
+            if rel not in rcode:
+                rcode[rel] = len(relations); relations.append(rel)
+            cu.append(a); cv.append(b); cr.append(rcode[rel])
+        us.append(np.asarray(cu, dtype=np.int32)); vs.append(np.asarray(cv, dtype=np.int32)); rs.append(np.asarray(cr, dtype=np.int16))
+        report("edges", stats.edge_rows)
+
+    if sources_src is not None:
+        for chunk in read_chunks(sources_src, chunk_rows):
+            for r in chunk:
+                stats.source_rows += 1
+                nid, url = str(r.get("id") or "").strip(), str(r.get("url") or "").strip()
+                if nid in index and url: sources[nid].add(url)
+            report("sources", stats.source_rows)
+
+    cat = lambda parts, dt: np.concatenate(parts) if parts else np.empty(0, dtype=dt)
+    u_all, v_all, r_all = cat(us, np.int32), cat(vs, np.int32), cat(rs, np.int16)
+    CG = CompactGraph.from_arrays(ids, ntype, types, u_all, v_all, r_all, relations)
+    stats.duplicate_edges = int((u_all != v_all).sum()) - int(CG.indices.size // 2)
+    stats.seconds = time.perf_counter() - t0
+    report("done", stats.node_rows + stats.edge_rows + stats.source_rows)
+    return IngestResult(CG, meta, dict(sources), stats)
@@ -0,0 +1,168 @@
+# overlap.py
+# Sparse incidence/overlap engine for shared investors and co-founders.
+#
+# A view's company x investor (or company x founder) edges become a 0/1 CSR
+# incidence matrix A; all pairwise overlap counts are one sparse product
+# A @ A.T, of which only the strict upper triangle is kept. Top-N pairs are
+# picked from the non-zeros directly, so no dense C x C matrix is ever built.
+# After a graph delta, patch_pair_counts() updates the counts from the changed
+# incidence entries instead of recomputing the whole product.
+# When a hub column makes A·Aᵀ nearly dense (USV backs every company in the
+# default view), top_pairs_blocked() goes through rows in blocks instead and
+# keeps only the running top-N, so the product is never held whole.
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, triu
+
+from graph_core import GraphView, Remap, ViewCache, ViewMove
+
+BLOCK_NNZ = 1_000_000   # fill-in budget per row block; also the cut-off for caching the full product
+
+
+class Incidence(NamedTuple):
+    rows: np.ndarray   # node ints of the row type (e.g. companies), in index order
+    cols: np.ndarray   # node ints of the column type (e.g. investors)
+    A: csr_matrix      # len(rows) x len(cols), 1 where an edge exists in the view
+
+
+def incidence(view: GraphView, row_type: str, col_type: str) -> Incidence:
+    g = view.g
+    rc, cc = g.type_code(row_type), g.type_code(col_type)
+    rows = np.flatnonzero(view.mask & (g.ntype == rc)); cols = np.flatnonzero(view.mask & (g.ntype == cc))
+    rpos = np.full(g.n, -1, dtype=np.int64); rpos[rows] = np.arange(rows.size)
+    cpos = np.full(g.n, -1, dtype=np.int64); cpos[cols] = np.arange(cols.size)
+    sel = (rpos[g.src] >= 0) & (cpos[g.indices] >= 0)
+    r, c = rpos[g.src[sel]], cpos[g.indices[sel]]
+    A = csr_matrix((np.ones(r.size, dtype=np.int32), (r, c)), shape=(rows.size, cols.size))
+    A.sum_duplicates()
+    return Incidence(rows, cols, A)
+
+
+def _drop_hubs(A: csr_matrix, max_col_degree: Optional[int]) -> csr_matrix:
+    if max_col_degree is None: return A
+    return A[:, np.flatnonzero(np.asarray(A.sum(axis=0)).ravel() <= max_col_degree)]
+
+
+def fill_in(inc: Incidence, max_col_degree: Optional[int] = None) -> int:
+    """Upper bound on the non-zeros of A·Aᵀ (sum of squared column degrees)."""
+    deg = np.asarray(_drop_hubs(inc.A, max_col_degree).sum(axis=0)).ravel().astype(np.int64)
+    return int((deg * deg).sum())
+
+
+def pair_counts(inc: Incidence, max_col_degree: Optional[int] = None) -> csr_matrix:
+    """Upper-triangular row x row overlap counts. Columns with more than
+    `max_col_degree` rows (mega-hubs) can be skipped to bound the fill-in."""
+    A = _drop_hubs(inc.A, max_col_degree)
+    return triu(A @ A.T, k=1, format="csr")
+
+
+def top_pairs(inc: Incidence, C: csr_matrix, n: int) -> List[Tuple[int, int, int]]:
+    """Top-n (row node int, row node int, count) by count, from the non-zeros only."""
+    coo = C.tocoo()
+    if coo.nnz == 0: return []
+    k = min(n, coo.nnz)
+    kth = -np.partition(-coo.data, k - 1)[k - 1]   # ties at the cut go by (row, col), as in top_pairs_blocked
+    part = np.flatnonzero(coo.data >= kth)
+    part = part[np.lexsort((coo.col[part], coo.row[part], -coo.data[part]))][:k]
+    return [(int(inc.rows[coo.row[p]]), int(inc.rows[coo.col[p]]), int(coo.data[p])) for p in part]
+
+
+def top_pairs_blocked(inc: Incidence, n: int, max_col_degree: Optional[int] = None,
+                      block_nnz: int = BLOCK_NNZ) -> List[Tuple[int, int, int]]:
+    """top_pairs(inc, pair_counts(inc), n) in row blocks of at most ~block_nnz products.
+    Rows go in descending degree; each pair is taken from whichever row comes first, and
+    candidates are cut to the top n after every block. A pair's count is at most the
+    smaller row degree, so the scan stops once rows cannot reach the current n-th count."""
+    A = _drop_hubs(inc.A, max_col_degree); m = A.shape[0]
+    if m < 2 or n <= 0: return []
+    rowdeg = np.diff(A.indptr); coldeg = np.asarray(A.sum(axis=0)).ravel().astype(np.int64)
+    order = np.argsort(-rowdeg, kind="stable"); rank = np.empty(m, dtype=np.int64); rank[order] = np.arange(m)
+    Ao = A[order]; AT = A.T.tocsr()
+    bound = np.cumsum(Ao @ coldeg)
+    br = bc = bw = np.empty(0, dtype=np.int64); t = 1; s = 0
+    while s < m and rowdeg[order[s]] >= t:
+        e = max(s + 1, int(np.searchsorted(bound, (bound[s - 1] if s else 0) + block_nnz, side="right")))
+        S = (Ao[s:e] @ AT).tocoo()
+        keep = (rank[S.col] > S.row + s) & (S.data >= t)
+        r, c = order[S.row[keep] + s], S.col[keep]
+        br = np.concatenate((br, np.minimum(r, c))); bc = np.concatenate((bc, np.maximum(r, c)))
+        bw = np.concatenate((bw, S.data[keep].astype(np.int64)))
+        if bw.size > n:
+            sel = np.lexsort((bc, br, -bw))[:n]; br, bc, bw = br[sel], bc[sel], bw[sel]
+        if bw.size >= n: t = int(bw.min())
+        s = e
+    sel = np.lexsort((bc, br, -bw))
+    return [(int(inc.rows[a]), int(inc.rows[b]), int(w)) for a, b, w in zip(br[sel], bc[sel], bw[sel])]
+
+
+def shared_columns(inc: Incidence, row_nodes: Sequence[int]) -> np.ndarray:
+    """Column node ints adjacent to every one of `row_nodes` (e.g. investors shared by 2–4 companies)."""
+    row_nodes = np.asarray(row_nodes, dtype=np.int64)
+    pos = np.searchsorted(inc.rows, row_nodes)
+    if not len(row_nodes) or np.any(pos >= inc.rows.size) or np.any(inc.rows[pos] != row_nodes):
+        return np.empty(0, dtype=inc.cols.dtype)
+    hits = np.asarray(inc.A[pos].sum(axis=0)).ravel()
+    return inc.cols[hits == len(row_nodes)]
+
+
+def patch_pair_counts(old: Incidence, C: csr_matrix, new: Incidence, remap: Remap) -> csr_matrix:
+    """pair_counts(new) from the previous counts. With A the new incidence and D = A minus the
+    old incidence re-indexed, A·Aᵀ changes by D·Aᵀ + A·Dᵀ − D·Dᵀ, which only touches rows
+    sharing a column with a changed entry."""
+    fwd, n = remap.fwd, remap.new.n
+    kept = np.flatnonzero(fwd[old.rows] >= 0)
+    P = csr_matrix((np.ones(kept.size, dtype=np.int32), (np.searchsorted(new.rows, fwd[old.rows[kept]]), kept)),
+                   shape=(new.rows.size, old.rows.size))
+    # one column space for both: new node ints, then the removed old columns
+    ocol = fwd[old.cols].copy(); gone = ocol < 0
+    ocol[gone] = n + np.arange(int(gone.sum())); width = n + int(gone.sum())
+    Ao = (P @ old.A).tocoo(); An = new.A.tocoo()
+    Ao = csr_matrix((Ao.data, (Ao.row, ocol[Ao.col])), shape=(new.rows.size, width))
+    An = csr_matrix((An.data, (An.row, new.cols[An.col])), shape=(new.rows.size, width))
+    D = An - Ao; D.eliminate_zeros()
+    m = new.rows.size
+    if kept.size == old.rows.size:  # rows only appended: pad indptr, share data
+        out = csr_matrix((C.data, C.indices, np.concatenate([C.indptr, np.full(m - C.shape[0], C.indptr[-1])])), shape=(m, m))
+    else:
+        out = P @ C @ P.T             # monotone re-index keeps it upper-triangular
+    if D.nnz:
+        DA = D @ An.T
+        out = out + triu(DA + DA.T - D @ D.T, k=1, format="csr")
+        out.eliminate_zeros()
+    return out
+
+
+class OverlapCache(ViewCache):
+    """Incidence matrices and pair counts per (view fingerprint, row type, column type)."""
+
+    def incidence(self, view: GraphView, row_type: str, col_type: str) -> Incidence:
+        return self.get((view.fingerprint(), "inc", row_type, col_type), lambda: incidence(view, row_type, col_type))
+
+    def top_pairs(self, view: GraphView, row_type: str, col_type: str, n: int = 8,
+                  max_col_degree: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """Small products are cached whole (and patched after deltas); near-dense ones are
+        scanned in blocks and only the top-n is kept."""
+        inc = self.incidence(view, row_type, col_type); fp = view.fingerprint()
+        if (fp, "pairs", row_type, col_type, max_col_degree) in self.entries or fill_in(inc, max_col_degree) <= BLOCK_NNZ:
+            C = self.get((fp, "pairs", row_type, col_type, max_col_degree), lambda: pair_counts(inc, max_col_degree))
+            return top_pairs(inc, C, n)
+        return self.get((fp, "top", row_type, col_type, max_col_degree, n),
+                        lambda: top_pairs_blocked(inc, n, max_col_degree))
+
+    def carry_from(self, old: "OverlapCache", remap: Remap, moves: Dict[str, ViewMove]):
+        """Re-index clean views; for the full view rebuild the incidence (one vectorised pass)
+        and patch the unpruned pair counts; drop the rest."""
+        def convert(key, val, mv):
+            fp = mv.new.fingerprint()
+            if mv.clean:
+                if key[1] == "inc":
+                    val = Incidence(remap.fwd[val.rows], remap.fwd[val.cols], val.A)
+                elif key[1] == "top":
+                    val = [(int(remap.fwd[a]), int(remap.fwd[b]), w) for a, b, w in val]
+                return (fp,) + key[1:], val
+            if key[1] != "pairs" or key[4] is not None: return None
+            prev = old.entries.get((key[0], "inc") + key[2:4])
+            if prev is None: return None
+            return (fp,) + key[1:], patch_pair_counts(prev, val, self.incidence(mv.new, *key[2:4]), remap)
+        self.carry(old, moves, convert)
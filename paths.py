@@ -0,0 +1,310 @@
+# paths.py
+# Warm-intro path engine over compact graph views.
+#
+# - bidirectional BFS for one-off src -> dst queries
+# - one cached BFS tree per hub (USV, partners, ...) so src -> hub is a parent walk
+# - batch API: every source -> one target from a single BFS
+# - WeightedRouter: relation-aware k-shortest routes (Yen + A* with an exact per-target heuristic)
+# Cached trees are keyed by the view fingerprint, so any filter/graph change
+# invalidates them automatically; carry_from() moves them across a graph delta.
+import heapq
+import math
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from graph_core import CompactGraph, GraphView, Remap, ViewCache, ViewMove
+
+
+def _walk(parent: np.ndarray, i: int) -> List[int]:
+    out = [i]
+    while parent[out[-1]] >= 0:
+        out.append(int(parent[out[-1]]))
+    return out
+
+
+def _tree_path(parent: np.ndarray, root: int, i: int) -> List[int]:
+    if i != root and parent[i] < 0: return []
+    return _walk(parent, i)  # i -> ... -> root
+
+
+def bidirectional_path(g: CompactGraph, mask: np.ndarray, s: int, t: int) -> List[int]:
+    """Unweighted shortest path s -> t inside `mask`, expanding the smaller frontier each level."""
+    if not (mask[s] and mask[t]): return []
+    if s == t: return [s]
+    dist = [np.full(g.n, -1, dtype=np.int32), np.full(g.n, -1, dtype=np.int32)]
+    parent = [np.full(g.n, -1, dtype=np.int32), np.full(g.n, -1, dtype=np.int32)]
+    front = [np.array([s], dtype=np.int32), np.array([t], dtype=np.int32)]
+    dist[0][s] = 0; dist[1][t] = 0
+    depth = [0, 0]
+    while front[0].size and front[1].size:
+        side = 0 if front[0].size <= front[1].size else 1
+        other = 1 - side
+        par, nb = g.expand(front[side])
+        keep = mask[nb] & (dist[side][nb] < 0)
+        nb, par = nb[keep], par[keep]
+        nb, first = np.unique(nb, return_index=True)
+        depth[side] += 1
+        dist[side][nb] = depth[side]; parent[side][nb] = par[first]
+        meet = nb[dist[other][nb] >= 0]
+        if meet.size:
+            m = int(meet[np.argmin(dist[other][meet])])
+            return _walk(parent[0], m)[::-1] + _walk(parent[1], m)[1:]
+        front[side] = nb
+    return []
+
+
+def _repair(view: GraphView, dist: np.ndarray, parent: np.ndarray, cut: np.ndarray,
+            added: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Repair a carried BFS tree. Subtrees below a cut link (removed parent or tree edge) are
+    reset; then distances are relaxed outwards from the new edges' endpoints and the nodes
+    bordering the reset region until nothing improves."""
+    g, mask = view.g, view.mask
+    border = np.empty(0, dtype=np.int32)
+    if cut.any():
+        orphan = cut
+        for _ in range(g.n):
+            nxt = orphan | ((parent >= 0) & orphan[parent])
+            if (nxt == orphan).all(): break
+            orphan = nxt
+        dist[orphan] = -1; parent[orphan] = -1
+        _, nb = g.expand(np.flatnonzero(orphan).astype(np.int32))
+        border = nb[dist[nb] >= 0]
+    frontier = np.unique(np.concatenate([added.ravel(), border])).astype(np.int32)
+    frontier = frontier[mask[frontier] & (dist[frontier] >= 0)]
+    while frontier.size:
+        par, nb = g.expand(frontier)
+        cand = dist[par] + 1
+        ok = mask[nb] & ((dist[nb] < 0) | (cand < dist[nb]))
+        par, nb, cand = par[ok], nb[ok], cand[ok]
+        order = np.lexsort((cand, nb)); par, nb, cand = par[order], nb[order], cand[order]
+        nb, first = np.unique(nb, return_index=True)
+        dist[nb] = cand[first]; parent[nb] = par[first]
+        frontier = nb.astype(np.int32)
+    return dist, parent
+
+
+class PathEngine:
+    def __init__(self, hubs: Iterable[str] = (), max_trees: int = 32):
+        self.hubs = set(hubs)
+        self.trees = ViewCache(max_trees)  # (view fingerprint, hub int) -> (dist, parent)
+
+    def tree(self, view: GraphView, hub: str) -> Optional[np.ndarray]:
+        """Parent array of a BFS rooted at `hub` (cached per view fingerprint)."""
+        if hub not in view: return None
+        h = view.g.index[hub]
+        return self.trees.get((view.fingerprint(), h), lambda: view.g.bfs([h], view.mask))[1]
+
+    def carry_from(self, old: "PathEngine", remap: Remap, moves: Dict[str, ViewMove]):
+        """Seed from the previous graph's trees: clean views are re-indexed, the full view's
+        trees are repaired in place of a fresh BFS."""
+        def convert(key, val, mv):
+            h = int(remap.fwd[key[1]])
+            if h < 0: return None
+            dist, parent = val
+            parent = np.where(parent >= 0, remap.fwd[parent], -1).astype(np.int32)
+            dist, parent = remap.carry(dist, -1), remap.carry(parent, -1)
+            if not mv.clean:
+                cut = (dist > 0) & (parent < 0)          # parent was removed
+                a, b = remap.dropped[:, 0], remap.dropped[:, 1]
+                cut[b[parent[b] == a]] = True; cut[a[parent[a] == b]] = True
+                dist, parent = _repair(mv.new, dist, parent, cut, remap.added)
+            return (mv.new.fingerprint(), h), (dist, parent)
+        self.trees.carry(old.trees, moves, convert)
+
+    def _cached(self, view: GraphView, i: int) -> bool:
+        return (view.fingerprint(), i) in self.trees.entries
+
+    def warm(self, view: GraphView, hubs: Optional[Iterable[str]] = None):
+        for hub in (self.hubs if hubs is None else hubs):
+            self.tree(view, hub)
+
+    def path(self, view: GraphView, src: str, dst: str) -> List[str]:
+        if src not in view or dst not in view: return []
+        g = view.g; s, t = g.index[src], g.index[dst]
+        if dst in self.hubs or self._cached(view, t):
+            out = _tree_path(self.tree(view, dst), t, s)
+        elif src in self.hubs or self._cached(view, s):
+            out = _tree_path(self.tree(view, src), s, t)[::-1]
+        else:
+            out = bidirectional_path(g, view.mask, s, t)
+        return [g.ids[i] for i in out]
+
+    def walk(self, view: GraphView, sources: Iterable[str], target: str) -> Iterator[Tuple[str, List[int]]]:
+        """(source, node ints source -> target) per source, lazily, from one BFS tree; [] if unreachable."""
+        if target not in view:
+            yield from ((s, []) for s in sources); return
+        g = view.g; t = g.index[target]
+        parent = self.tree(view, target)
+        for s in sources:
+            yield s, (_tree_path(parent, t, g.index[s]) if s in view else [])
+
+    def batch(self, view: GraphView, sources: Iterable[str], target: str) -> Dict[str, List[str]]:
+        """Paths from every source to `target` from one BFS tree; unreachable sources map to []."""
+        ids = view.g.ids
+        return {s: [ids[i] for i in p] for s, p in self.walk(view, sources, target)}
+
+
+# =================================================
+# Weighted, relation-aware k-shortest routing
+# =================================================
+# Lower cost = warmer tie. Unknown relations fall back to DEFAULT_COST.
+RELATION_COST = {"Partner": 1.0, "Founded by": 1.0, "Invested in": 1.5, "Investor": 2.0}
+DEFAULT_COST = 2.0
+
+
+ROUTE_BUDGET = 2.0   # seconds per k_shortest() call; the routes found by then are what it yields
+SEAL_LIMIT = 4096    # nodes explored back from the target before a spur is assumed to have a route
+
+
+class _RouteState(NamedTuple):
+    view: GraphView
+    cost: np.ndarray            # per CSR slot
+
+
+class _Target(NamedTuple):
+    pen: np.ndarray             # per node, added when the node is entered
+    h: np.ndarray               # exact cost to the target on the whole view (inf: unreachable)
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class WeightedRouter:
+    """Yen's k-shortest loopless paths with A*.
+
+    Edge cost = relation cost + penalty of the node being entered. The heuristic
+    is the exact cost to the target on the unrestricted view (one scipy Dijkstra
+    per view, target and penalties), which stays admissible under Yen's node/edge
+    removals, so spur searches only leave the optimal corridor where a removal
+    forces them to. Search state lives in per-node numpy buffers reused across spurs.
+    """
+
+    def __init__(self, relation_cost: Optional[Dict[str, float]] = None):
+        self.relation_cost = dict(RELATION_COST if relation_cost is None else relation_cost)
+        self.states = ViewCache(4)    # view fingerprint -> _RouteState
+        self.targets = ViewCache(16)  # (view fingerprint, target, penalties) -> _Target
+
+    def _prepare(self, view: GraphView) -> "_RouteState":
+        def build():
+            g = view.g
+            return _RouteState(view, np.array([self.relation_cost.get(r, DEFAULT_COST) for r in g.relations])[g.erel])
+        return self.states.get((view.fingerprint(),), build)
+
+    def _target(self, st: "_RouteState", t: int, penalties: Dict[str, float]) -> "_Target":
+        view = st.view; g = view.g
+        def build():
+            from scipy.sparse import csr_matrix
+            from scipy.sparse.csgraph import dijkstra
+            pen = np.zeros(g.n)
+            for nid, p in penalties.items():
+                if nid in g.index: pen[g.index[nid]] = float(p)
+            sel = view.mask[g.src] & view.mask[g.indices]
+            u, v = g.src[sel], g.indices[sel]      # new arrays: a memory-mapped graph's CSR is read-only
+            w = np.maximum(st.cost[sel] + pen[v], 1e-12)
+            W = csr_matrix((w, (v, u)), shape=(g.n, g.n))       # reversed, so Dijkstra from t gives cost u -> t
+            return _Target(pen, dijkstra(W, directed=True, indices=t))
+        return self.targets.get((view.fingerprint(), t, tuple(sorted(penalties.items()))), build)
+
+    @staticmethod
+    def _sealed(st: "_RouteState", s: int, t: int, blocked: np.ndarray, cut: np.ndarray) -> bool:
+        """True if, without the blocked nodes and the edges s -> `cut`, t sits in a small component
+        that does not contain s. A* would only find that out after exhausting s's whole side."""
+        g, mask = st.view.g, st.view.mask
+        cut = set(cut.tolist()); seen = {t}; frontier = [t]
+        while frontier:
+            nxt = []
+            for x in frontier:
+                nb = g.indices[g.indptr[x]:g.indptr[x + 1]]
+                nb = nb[mask[nb] & ~blocked[nb]].tolist()
+                if s in nb and x not in cut: return False
+                for y in nb:
+                    if y != s and y not in seen:
+                        seen.add(y); nxt.append(y)
+                if len(seen) > SEAL_LIMIT: return False
+            frontier = nxt
+        return True
+
+    @staticmethod
+    def _astar(st: "_RouteState", tg: "_Target", s: int, t: int, blocked: np.ndarray, cut: np.ndarray,
+               buf: Tuple[np.ndarray, np.ndarray, np.ndarray], deadline: Optional[float]) -> Tuple[float, List[int]]:
+        """Cheapest s -> t avoiding `blocked` nodes and the edges s -> `cut`. `buf` (dist, parent,
+        closed) is all inf / -1 / False on entry and restored on exit."""
+        g, mask, cost, pen, h = st.view.g, st.view.mask, st.cost, tg.pen, tg.h
+        dist, parent, closed = buf
+        touched = [np.array([s])]; dist[s] = 0.0
+        heap = [(float(h[s]), -0.0, s)]      # ties: deeper first
+        pops = 0
+        try:
+            while heap:
+                _, d, u = heapq.heappop(heap); d = -d
+                if closed[u]: continue
+                if u == t:
+                    out = [t]
+                    while out[-1] != s:
+                        out.append(int(parent[out[-1]]))
+                    return d, out[::-1]
+                closed[u] = True; pops += 1
+                if deadline is not None and not pops & 255 and time.perf_counter() > deadline:
+                    raise _OutOfTime()
+                lo, hi = g.indptr[u], g.indptr[u + 1]
+                nb = g.indices[lo:hi]
+                nd = d + cost[lo:hi] + pen[nb]
+                ok = mask[nb] & ~closed[nb] & ~blocked[nb] & (nd < dist[nb]) & (h[nb] < math.inf)
+                if u == s and cut.size: ok &= ~np.isin(nb, cut)
+                nb, nd = nb[ok], nd[ok]
+                if not nb.size: continue
+                dist[nb] = nd; parent[nb] = u; touched.append(nb)
+                for v, dv, f in zip(nb.tolist(), nd.tolist(), (nd + h[nb]).tolist()):
+                    heapq.heappush(heap, (f, -dv, v))
+            return math.inf, []
+        finally:
+            seen = np.concatenate(touched)
+            dist[seen] = math.inf; parent[seen] = -1; closed[seen] = False
+
+    def k_shortest(self, view: GraphView, src: str, dst: str, penalties: Optional[Dict[str, float]] = None,
+                   budget: Optional[float] = ROUTE_BUDGET) -> Iterator[Tuple[float, List[str]]]:
+        """Yield (cost, path) in increasing cost, lazily; stop consuming to stop searching.
+        With a budget (seconds, from the first next()) the search stops once it runs out,
+        so fewer routes than asked for may come back."""
+        if src not in view or dst not in view: return
+        deadline = None if budget is None else time.perf_counter() + budget
+        st = self._prepare(view)
+        g = view.g; s, t = g.index[src], g.index[dst]
+        tg = self._target(st, t, dict(penalties or {}))
+        buf = (np.full(g.n, math.inf), np.full(g.n, -1, dtype=np.int64), np.zeros(g.n, dtype=bool))
+        blocked = np.zeros(g.n, dtype=bool); none = np.zeros(0, dtype=np.int64)
+        ids = lambda p: [g.ids[i] for i in p]
+        edge_cost = lambda a, b: float(st.cost[g.edge_slot(a, b)] + tg.pen[b])
+
+        try:
+            c, p = self._astar(st, tg, s, t, blocked, none, buf, deadline)
+            if not p: return
+            found = [p]; seen = {tuple(p)}; cand: List[Tuple[float, List[int]]] = []
+            yield c, ids(p)
+            while True:
+                last = found[-1]
+                root_cost = 0.0
+                for i in range(len(last) - 1):
+                    if deadline is not None and time.perf_counter() > deadline: return
+                    root = last[:i + 1]
+                    cut = np.array([q[i + 1] for q in found if len(q) > i + 1 and q[:i + 1] == root], dtype=np.int64)
+                    blocked[root[:-1]] = True
+                    try:
+                        sc, sp = ((math.inf, []) if self._sealed(st, last[i], t, blocked, cut)
+                                  else self._astar(st, tg, last[i], t, blocked, cut, buf, deadline))
+                    finally:
+                        blocked[root[:-1]] = False
+                    if sp:
+                        full = root[:-1] + sp
+                        if tuple(full) not in seen:
+                            seen.add(tuple(full)); heapq.heappush(cand, (root_cost + sc, full))
+                    root_cost += edge_cost(last[i], last[i + 1])
+                if not cand: return
+                c, p = heapq.heappop(cand)
+                found.append(p)
+                yield c, ids(p)
+        except _OutOfTime:
+            return
@@ -0,0 +1,82 @@
+# perf.py
+# Per-rerun timing spans and one-shot profiling for the app script.
+#
+# The script is linear, so spans are opened with mark(name): marking the next
+# stage closes the current one, and note() attaches counts (nodes/edges of a
+# view, HTML bytes, ...) to the open span. finish() returns the run as a plain
+# dict (JSON-ready) for the rolling history kept in session state. Profiler runs
+# cProfile + tracemalloc around a single rerun when asked to.
+import cProfile
+import io
+import marshal
+import pstats
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+HISTORY = 50   # reruns kept per session
+
+
+class Trace:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.spans: List[Dict] = []
+        self._open: Optional[Dict] = None
+        self._start = 0.0
+
+    def mark(self, name: str, **fields):
+        """Close the open span (if any) and start `name`."""
+        self._close()
+        self._open = {"name": name, **fields}
+        self._start = time.perf_counter()
+
+    def note(self, view=None, **fields):
+        """Attach counts to the open span; view= records its node and edge counts."""
+        if self._open is None: return
+        if view is not None:
+            fields.update(nodes=view.number_of_nodes(), edges=view.number_of_edges())
+        self._open.update(fields)
+
+    def _close(self):
+        if self._open is None: return
+        now = time.perf_counter()
+        self._open.update(start_ms=round((self._start - self.t0) * 1000, 3), ms=round((now - self._start) * 1000, 3))
+        self.spans.append(self._open); self._open = None
+
+    def finish(self, **fields) -> Dict:
+        self._close()
+        return {"at": time.time(), "total_ms": round((time.perf_counter() - self.t0) * 1000, 3),
+                "spans": self.spans, **fields}
+
+
+def by_stage(runs: List[Dict]) -> Dict[str, List[float]]:
+    """Stage -> ms per run (repeated marks of one stage in a run are summed; 0 when absent)."""
+    names = list(dict.fromkeys(s["name"] for r in runs for s in r["spans"]))
+    out = {n: [0.0] * len(runs) for n in names}
+    for i, r in enumerate(runs):
+        for s in r["spans"]:
+            out[s["name"]][i] += s["ms"]
+    return out
+
+
+class Profiler:
+    """cProfile + tracemalloc around one rerun; stop() returns text reports and the raw .prof bytes."""
+
+    def __init__(self, top: int = 25):
+        self.top = top
+        self.prof = cProfile.Profile()
+
+    def start(self):
+        tracemalloc.start(10)
+        self.prof.enable()
+
+    def stop(self) -> Dict:
+        self.prof.disable()
+        snap = tracemalloc.take_snapshot(); peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        buf = io.StringIO()
+        pstats.Stats(self.prof, stream=buf).sort_stats("cumulative").print_stats(self.top)
+        self.prof.create_stats()
+        allocs = "\n".join(str(s) for s in snap.statistics("lineno")[:self.top])
+        return {"cprofile": buf.getvalue(), "tracemalloc": f"peak {peak / 2 ** 20:.1f} MB\n{allocs}",
+                "prof": marshal.dumps(self.prof.stats)}
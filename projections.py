@@ -0,0 +1,132 @@
+# projections.py
+# Bipartite projections of the portfolio graph, as graphs the rest of the app can consume.
+#
+# - founder <-> founder: founders whose companies share backers, weighted by the
+#   number of shared backer firms (a partner counts as their firm, so a firm and its
+#   partner are one backer, not two; partners without a firm count on their own)
+# - investor <-> investor: co-investment, weighted by the number of shared companies
+# Reach along the type chain is a product of 0/1 incidence matrices (binarised
+# after each step); the projection is M·Mᵀ computed in row blocks sized from an
+# upper bound on each row's fill-in, with a weight threshold and per-row top-k
+# applied to every block, so the full product is never materialised. Mega-hub
+# columns (e.g. a fund backing every company) can be skipped to keep it sparse.
+# The result is a CompactGraph with the same node ints/ids as the source (only
+# the edges differ), so filters, focus, paths, clusters and render work unchanged.
+import time
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, hstack
+
+from graph_core import CompactGraph, GraphView, ViewCache
+from overlap import incidence
+from paths import WeightedRouter
+
+WEIGHT_CAP = 100           # relation codes are int8: weights above the cap share one bucket
+BLOCK_NNZ = 8_000_000      # fill-in budget per row block
+
+
+class Spec(NamedTuple):
+    row_type: str
+    chain: Tuple[str, ...]   # types walked from the row type
+    count: Tuple[str, ...]   # types that count as shared "via" nodes: chain types, or neighbours of the chain's end
+    relation: str            # edge label, formatted with the weight
+    label: str
+    fold: Tuple[Tuple[str, str], ...] = ()   # (type, into): a counted `type` node counts as its `into` neighbours
+
+
+KINDS = {
+    "founders": Spec("founder", ("company",), ("investor", "partner"), "{} shared backers",
+                     "Founder ↔ founder (shared investors/partners)", (("partner", "investor"),)),
+    "coinvest": Spec("investor", ("company",), ("company",), "Co-invested ×{}", "Investor ↔ investor (co-investment)"),
+}
+
+
+class Projection(NamedTuple):
+    CG: CompactGraph       # same ids/types as the source graph; only projection edges
+    nodes: np.ndarray      # bool per node int: row-type nodes of the source view
+    router: WeightedRouter  # costs 1 + 1/weight, so stronger ties route first
+    kind: str
+    edges: int
+    pruned: int            # candidate pairs dropped by threshold / top-k
+    seconds: float
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Weight per CSR slot (capped at WEIGHT_CAP)."""
+        return self.CG.erel.astype(np.int64) + 1
+
+
+def _binary(R) -> csr_matrix:
+    R = R.tocsr(); R.data[:] = 1
+    return R
+
+
+def reach(view: GraphView, spec: Spec) -> Tuple[np.ndarray, csr_matrix]:
+    """Row node ints and the 0/1 row x via-node reach matrix along spec.chain, with
+    spec.fold applied (columns of a folded type move onto their `into` neighbours)."""
+    inc = incidence(view, spec.row_type, spec.chain[0])
+    R = inc.A; cols = {spec.chain[0]: R}
+    for prev, t in zip(spec.chain, spec.chain[1:]):
+        R = _binary(R @ incidence(view, prev, t).A); cols[t] = R
+    for t in spec.count:
+        if t not in cols:
+            cols[t] = _binary(R @ incidence(view, spec.chain[-1], t).A)
+    for t, into in spec.fold:
+        F = incidence(view, t, into).A                          # rows/cols in the same order as cols[t]/cols[into]
+        homed = np.asarray(F.sum(axis=1)).ravel() > 0
+        cols[into] = _binary(cols[into] + cols[t] @ F)
+        cols[t] = cols[t][:, np.flatnonzero(~homed)]
+    return inc.rows, hstack([cols[t] for t in spec.count], format="csr")
+
+
+def _top_k(r: np.ndarray, c: np.ndarray, w: np.ndarray, k: int) -> np.ndarray:
+    order = np.lexsort((c, -w, r))
+    rs = r[order]
+    start = np.flatnonzero(np.r_[True, rs[1:] != rs[:-1]])
+    rank = np.arange(rs.size) - np.repeat(start, np.diff(np.r_[start, rs.size]))
+    return order[rank < k]
+
+
+def project(view: GraphView, kind: str, min_weight: int = 1, top_k: Optional[int] = None,
+            max_col_degree: Optional[int] = None) -> Projection:
+    t0 = time.perf_counter()
+    g = view.g; spec = KINDS[kind]
+    rows, M = reach(view, spec)
+    coldeg = np.asarray(M.sum(axis=0)).ravel()
+    if max_col_degree is not None:
+        M = M[:, np.flatnonzero(coldeg <= max_col_degree)]; coldeg = coldeg[coldeg <= max_col_degree]
+    MT = M.T.tocsr()
+    bound = np.cumsum(M @ coldeg)   # upper bound on each row's product non-zeros, cumulated
+    us, vs, ws = [], [], []; pruned = 0; s = 0
+    while s < rows.size:
+        e = max(s + 1, int(np.searchsorted(bound, (bound[s - 1] if s else 0) + BLOCK_NNZ, side="right")))
+        S = (M[s:e] @ MT).tocoo()
+        r, c, w = S.row.astype(np.int64) + s, S.col, S.data
+        keep = (r != c) & (w >= min_weight)
+        cand = int((r != c).sum())
+        r, c, w = r[keep], c[keep], w[keep]
+        if top_k is not None and r.size:
+            sel = _top_k(r, c, w, top_k); r, c, w = r[sel], c[sel], w[sel]
+        pruned += cand - r.size
+        us.append(rows[r]); vs.append(rows[c]); ws.append(w)
+        s = e
+    u = np.concatenate(us) if us else np.empty(0, dtype=np.int64)
+    v = np.concatenate(vs) if vs else np.empty(0, dtype=np.int64)
+    w = np.minimum(np.concatenate(ws) if ws else np.empty(0, dtype=np.int64), WEIGHT_CAP)
+    relations = [spec.relation.format(i) for i in range(1, WEIGHT_CAP)] + [spec.relation.format(f"{WEIGHT_CAP}+")]
+    # a pair kept by either endpoint's top-k stays (from_arrays dedupes u-v / v-u)
+    P = CompactGraph.from_arrays(g.ids, g.ntype, g.types, u, v, (w - 1).astype(np.int8), relations)
+    P.__dict__["index"] = g.index   # same ids; don't rebuild the dict
+    nodes = np.zeros(g.n, dtype=bool); nodes[rows] = True
+    router = WeightedRouter({rel: 1.0 + 1.0 / (i + 1) for i, rel in enumerate(relations)})
+    return Projection(P, nodes, router, kind, int(P.indices.size // 2), pruned, time.perf_counter() - t0)
+
+
+class ProjectionCache(ViewCache):
+    """Projections per (source view fingerprint, kind, pruning settings). Rebuilt after a delta."""
+
+    def project(self, view: GraphView, kind: str, min_weight: int = 1, top_k: Optional[int] = None,
+                max_col_degree: Optional[int] = None) -> Projection:
+        return self.get((view.fingerprint(), "proj", kind, min_weight, top_k, max_col_degree),
+                        lambda: project(view, kind, min_weight, top_k, max_col_degree))
@@ -0,0 +1,291 @@
+# render.py
+# pyvis rendering with a node budget (level of detail) and a cached server-side layout.
+#
+# Above the budget, degree-1 leaves that hang off the same node and share a type
+# are folded into one aggregate node ("12 founders"), repeatedly, so whole subtrees
+# collapse until the budget is met. Views folding cannot shrink enough (dense cores,
+# fans of one) are then cut to the budget, lowest-degree nodes and smallest
+# aggregates first. Path/highlighted nodes are never folded or cut.
+# Positions come from a numpy spring layout computed once per
+# (view fingerprint, budget) and are shipped with physics off, so the browser
+# only draws. Finished HTML is memoised in an HtmlCache keyed on everything that
+# affects the output, so reruns triggered by unrelated widgets skip pyvis entirely.
+# pyvis (which pulls in IPython, ~0.5 s) is imported on the first render, not at import.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from graph_core import GraphView, Remap, ViewCache, ViewMove
+
+NODE_BUDGET = 1500
+BASE = {"company":"#16a34a","founder":"#2563eb","investor":"#f97316","partner":"#7c3aed"}
+GREY = "#CBD5E1"   # dimmed nodes/edges
+CLUSTER_COLORS = ["#2563eb", "#f97316", "#16a34a", "#dc2626", "#7c3aed", "#0891b2", "#ca8a04", "#db2777",
+                  "#4d7c0f", "#9333ea", "#0d9488", "#b45309", "#1d4ed8", "#be123c", "#15803d", "#6d28d9"]
+PATH_EDGE = "#ef4444"
+SCALE = 1000.0     # layout units -> vis.js canvas pixels
+
+
+class Reduced(NamedTuple):
+    nodes: List[Tuple[str, str, str, int]]   # (id, label, type, members); members > 1 for aggregates
+    edges: List[Tuple[str, str, str]]        # (u, v, relation)
+    folded: Dict[str, str]                   # folded node id -> aggregate id
+    dropped: int = 0                         # nodes + aggregates cut to hold the budget
+
+
+def level_of_detail(view: GraphView, meta: Dict[str, Dict], budget: int = NODE_BUDGET,
+                    keep: Iterable[str] = ()) -> Reduced:
+    g, mask = view.g, view.mask
+    keep_mask = np.zeros(g.n, dtype=bool)
+    keep_mask[[g.index[k] for k in keep if k in g.index]] = True
+    remaining = mask.copy()
+    # (parent int, type code) -> {"members": [node ints], "rel": code, "total": nodes represented, "into": key|None}
+    groups: Dict[Tuple[int, int], Dict] = {}
+    attached: Dict[int, List[Tuple[int, int]]] = {}  # node int -> keys of groups hanging off it
+
+    # Fold rounds: leaves sharing (parent, type) collapse; a node whose children were all
+    # folded becomes a leaf in the next round, so deep trees shrink until under budget.
+    # Biggest fans go first and a round stops as soon as the budget is met, so small
+    # views keep their detail.
+    while True:
+        excess = int(remaining.sum()) + sum(1 for x in groups.values() if x["into"] is None) - budget
+        if excess <= 0: break
+        deg = GraphView(g, remaining).degrees()
+        leaf = remaining & (deg == 1) & ~keep_mask
+        sel = leaf[g.src] & remaining[g.indices]
+        sel[sel] &= ~leaf[g.indices[sel]]  # two leaves joined to each other are a pair, not a fan
+        lf, par, rel = g.src[sel], g.indices[sel], g.erel[sel]
+        key = par.astype(np.int64) * len(g.types) + g.ntype[lf]
+        uniq, inv, counts = np.unique(key, return_inverse=True, return_counts=True)
+        fold = np.flatnonzero(counts > 1)
+        if not fold.size: break
+        order = np.argsort(inv, kind="stable"); starts = np.concatenate(([0], np.cumsum(counts)))
+        for k in fold[np.argsort(-counts[fold], kind="stable")]:
+            if excess <= 0: break
+            at = order[starts[k]:starts[k + 1]]; members = lf[at]
+            gk = (int(uniq[k] // len(g.types)), int(uniq[k] % len(g.types)))
+            grp = groups.setdefault(gk, {"members": [], "rel": int(rel[at[0]]), "total": 0, "into": None})
+            if not grp["members"]: attached.setdefault(gk[0], []).append(gk)
+            excess -= members.size - (not grp["members"])
+            grp["members"].extend(members.tolist()); grp["total"] += int(members.size)
+            for m in members.tolist():
+                for sub in attached.pop(m, []):
+                    groups[sub]["into"] = gk; grp["total"] += groups[sub]["total"]; excess -= 1
+            remaining[members] = False
+
+    # Hard cap: whatever folding left over budget is cut, lowest view degree (for nodes)
+    # or fewest members (for aggregates) first; aggregates of a cut node go with it.
+    tops = [k for k, x in groups.items() if x["into"] is None]
+    gone = set(); ints = np.flatnonzero(remaining); dropped = 0
+    over = ints.size + len(tops) - budget
+    if over > 0:
+        score = np.concatenate((view.degrees()[ints], [groups[k]["total"] for k in tops])).astype(float)
+        score[:ints.size][keep_mask[ints]] = np.inf
+        cut = np.argsort(score, kind="stable")[:over]
+        cut = cut[np.isfinite(score[cut])]
+        remaining[ints[cut[cut < ints.size]]] = False
+        gone = {tops[c - ints.size] for c in cut[cut >= ints.size].tolist()}
+        gone |= {k for k in tops if not remaining[k[0]]}
+        dropped = int(ints.size - remaining.sum()) + len(gone)
+
+    def root(k):
+        while groups[k]["into"] is not None:
+            k = groups[k]["into"]
+        return k
+    agg_id = lambda k: f"agg::{g.ids[k[0]]}::{g.types[k[1]]}"
+
+    nodes = [(g.ids[i], meta[g.ids[i]]["label"], g.types[g.ntype[i]], 1) for i in np.flatnonzero(remaining)]
+    sel = remaining[g.src] & remaining[g.indices] & (g.src < g.indices)
+    edges = [(g.ids[a], g.ids[b], g.relations[r]) for a, b, r in zip(g.src[sel], g.indices[sel], g.erel[sel])]
+    fmap: Dict[str, str] = {}
+    for k, grp in groups.items():
+        if root(k) in gone: continue
+        top = agg_id(root(k))
+        fmap.update({g.ids[m]: top for m in grp["members"]})
+        if grp["into"] is not None: continue
+        typ = g.types[k[1]]; direct = len(grp["members"]); nested = grp["total"] - direct
+        nodes.append((top, f"{direct} {typ}s" + (f" (+{nested})" if nested else ""), typ, grp["total"]))
+        edges.append((top, g.ids[k[0]], g.relations[grp["rel"]]))
+    return Reduced(nodes, edges, fmap, dropped)
+
+
+def spring_positions(red: Reduced, seed: int = 7, iterations: int = 50) -> Dict[str, Tuple[float, float]]:
+    """Fruchterman-Reingold, vectorised with numpy; repulsion is computed in row blocks so
+    memory stays O(block x n) instead of O(n^2)."""
+    ids = [n[0] for n in red.nodes]
+    n = len(ids)
+    if n == 0: return {}
+    ix = {nid: i for i, nid in enumerate(ids)}
+    ei = np.fromiter((ix[u] for u, _, _ in red.edges), dtype=np.int64, count=len(red.edges))
+    ej = np.fromiter((ix[v] for _, v, _ in red.edges), dtype=np.int64, count=len(red.edges))
+    pos = np.random.default_rng(seed).random((n, 2))
+    k = 1.0 / np.sqrt(n); t = 0.1; dt = t / (iterations + 1); block = 512
+    for _ in range(iterations):
+        disp = np.zeros((n, 2))
+        for s in range(0, n, block):
+            dx = pos[s:s + block, 0, None] - pos[None, :, 0]
+            dy = pos[s:s + block, 1, None] - pos[None, :, 1]
+            w = k * k / np.maximum(dx * dx + dy * dy, 1e-4)
+            disp[s:s + block, 0] += (dx * w).sum(1); disp[s:s + block, 1] += (dy * w).sum(1)
+        d = pos[ei] - pos[ej]
+        f = d * (np.sqrt((d * d).sum(-1)) / k)[:, None]
+        np.add.at(disp, ei, -f); np.add.at(disp, ej, f)
+        length = np.maximum(np.sqrt((disp * disp).sum(-1)), 1e-9)
+        pos += disp * (np.minimum(length, t) / length)[:, None]
+        t -= dt
+    pos -= pos.mean(axis=0)
+    pos /= max(np.abs(pos).max(), 1e-9)
+    return {nid: (float(x), float(y)) for nid, (x, y) in zip(ids, pos)}
+
+
+class LayoutCache(ViewCache):
+    """Positions per (view fingerprint, budget), computed without path nodes expanded so
+    changing the highlighted path reuses the same coordinates."""
+
+    def positions(self, view: GraphView, meta: Dict[str, Dict], budget: int) -> Tuple[Dict, Dict]:
+        def compute():
+            red = level_of_detail(view, meta, budget)
+            return spring_positions(red), red.folded
+        return self.get((view.fingerprint(), "layout", budget), compute)
+
+    def carry_from(self, old: "LayoutCache", remap: Remap, moves: Dict[str, ViewMove]):
+        """Positions are keyed by node id, so clean views keep theirs as is."""
+        self.carry(old, moves, lambda key, val, mv: ((mv.new.fingerprint(),) + key[1:], val) if mv.clean else None)
+
+
+class HtmlCache:
+    """LRU of rendered HTML bounded by total bytes (and entry count)."""
+
+    def __init__(self, max_bytes: int = 64 << 20, max_entries: int = 64):
+        self.max_bytes = max_bytes; self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[str, Dict]]" = OrderedDict()
+        self.bytes = 0; self.hits = 0; self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(view: GraphView, *parts) -> str:
+        h = hashlib.blake2b(view.fingerprint().encode(), digest_size=16)
+        h.update(repr(parts).encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict]]:
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit is None:
+                self.misses += 1; return None
+            self.hits += 1; self.entries.move_to_end(key)
+            return hit
+
+    def put(self, key: str, html: str, stats: Dict):
+        size = stats["html_bytes"]
+        if size > self.max_bytes: return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]["html_bytes"]
+            self.entries[key] = (html, stats); self.bytes += size
+            while self.bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                _, (_, old) = self.entries.popitem(last=False)
+                self.bytes -= old["html_bytes"]
+
+
+def render_pyvis(
+    G: GraphView,
+    meta,
+    height="700px",
+    highlight_nodes=None,
+    highlight_edges=None,
+    path_start=None,
+    path_end=None,
+    path_nodes=None,
+    budget: int = NODE_BUDGET,
+    layouts: Optional[LayoutCache] = None,
+    cache: Optional[HtmlCache] = None,
+    types=(),
+    clusters: Optional[np.ndarray] = None,
+) -> Tuple[str, Dict]:
+    """Returns (html, stats) with stats = nodes/edges drawn, aggregates, html bytes, timings.
+    `clusters` (community label per node int) switches node colours from type to cluster."""
+    t0 = time.perf_counter()
+    if cache is not None:
+        ckey = None if clusters is None else hashlib.blake2b(np.ascontiguousarray(clusters).tobytes(), digest_size=8).hexdigest()
+        key = HtmlCache.key(G, height, budget, sorted(types), list(path_nodes or []), path_start, path_end,
+                            sorted(highlight_nodes or []), sorted(highlight_edges or []), ckey)
+        hit = cache.get(key)
+        if hit is not None:
+            html, stats = hit
+            return html, dict(stats, cached=True, render_ms=(time.perf_counter() - t0) * 1000)
+    hn = set(highlight_nodes or [])
+    he = set(highlight_edges or [])
+    pnodes = list(path_nodes or [])
+    pset = set(pnodes)
+
+    red = level_of_detail(G, meta, budget, keep=hn | pset)
+    layouts = layouts if layouts is not None else LayoutCache(max_entries=1)
+    pos, base_folded = layouts.positions(G, meta, budget)
+    t_layout = time.perf_counter()
+
+    from pyvis.network import Network
+    net = Network(height=height, width="100%", bgcolor="#ffffff", font_color="#222")
+    net.toggle_physics(False)
+
+    rng = np.random.default_rng(0)
+    legend = "Legend: 🟩 Start · 🟥 Target · 🟧 Path · ◻︎ Dimmed"
+    cluster_of: Dict[str, int] = {}
+    if clusters is not None:  # aggregates take the cluster of their first member
+        index = G.g.index
+        for member, agg in red.folded.items():
+            cluster_of.setdefault(agg, int(clusters[index[member]]))
+    for nid, label, typ, members in red.nodes:
+        url = meta[nid].get("url","") if members == 1 else ""
+        base_color = BASE.get(typ, "#64748b")
+        if clusters is not None:
+            c = cluster_of.get(nid, -1) if members > 1 else int(clusters[G.g.index[nid]])
+            base_color = CLUSTER_COLORS[c % len(CLUSTER_COLORS)] if c >= 0 else GREY
+
+        if nid == path_start:
+            color, border, size = "#22c55e", 4, 34  # start: green
+            role = "START"
+        elif nid == path_end:
+            color, border, size = "#ef4444", 4, 34  # end: red
+            role = "TARGET"
+        elif nid in pset:
+            color, border, size = "#f59e0b", 3, 26  # on-path: amber
+            role = "ON PATH"
+        else:
+            color, border, size = (GREY if pnodes else base_color), (1 if not pnodes else 0), (12 if pnodes else 18)
+            role = typ.upper() if members == 1 else f"{members} × {typ.upper()} (aggregated)"
+            if clusters is not None and c >= 0: role += f" · cluster #{c + 1}"
+        if members > 1:
+            size = min(60, size + 4 * np.log2(members))
+
+        x, y = pos.get(nid) or pos.get(base_folded.get(nid, ""), (0.0, 0.0))
+        if nid not in pos:  # expanded out of an aggregate: place next to it
+            x, y = x + rng.normal(0, 0.02), y + rng.normal(0, 0.02)
+        title = f"{role}: {label}<br><em>{legend}</em>" + (f"<br><a href='{url}' target='_blank'>{url}</a>" if url else "")
+        net.add_node(nid, label=label, color=color, title=title, borderWidth=border, size=size,
+                     x=x * SCALE, y=y * SCALE, physics=False)
+
+    for u, v, rel in red.edges:
+        on_path = ((u, v) in he) or ((v, u) in he)
+        if pnodes:
+            width = 4 if on_path else 1
+            color = PATH_EDGE if on_path else GREY
+        else:
+            width = 1
+            color = None
+        net.add_edge(u, v, title=rel, width=width, color=color)
+
+    # pyvis >= 0.3 renders the template in memory here; nothing is written to disk
+    html = net.generate_html("graph.html")
+    t_end = time.perf_counter()
+    stats = {"nodes": len(red.nodes), "edges": len(red.edges),
+             "aggregates": sum(1 for n in red.nodes if n[3] > 1), "folded": len(red.folded), "dropped": red.dropped,
+             "html_bytes": len(html.encode()), "layout_ms": (t_layout - t0) * 1000,
+             "render_ms": (t_end - t0) * 1000, "cached": False}
+    if cache is not None:
+        cache.put(key, html, stats)
+    return html, stats
@@ -0,0 +1,125 @@
+# search_index.py
+# Label/type search index for the sidebar filter and Overlap Scout lookups.
+#
+# - per-type posting lists (type -> node ids)
+# - trigram postings over lowercased labels, so a "contains" query intersects a few
+#   postings instead of scanning META; queries shorter than GRAM are label-prefix
+#   matches, answered by bisecting a sorted label list (built on the first one)
+# - (label, type) -> ids dictionary for exact lookups; duplicate labels are reported
+# Postings hold node id strings, so the index survives compact-graph rebuilds
+# and can be patched in place with update() when nodes change.
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+GRAM = 3
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class SearchIndex:
+    def __init__(self, meta: Optional[Dict[str, Dict]] = None):
+        self.by_type: Dict[str, Set[str]] = defaultdict(set)
+        self.grams: Dict[str, Set[str]] = defaultdict(set)
+        self.key2id: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self.entries: Dict[str, Tuple[str, str]] = {}  # id -> (label, type) as indexed
+        self._sorted: Optional[List[Tuple[str, str]]] = None  # (lowercased label, id), for prefix queries
+        if meta:
+            self.update(meta)
+
+    # ---------------- maintenance ----------------
+    def add(self, nid: str, label: str, typ: str):
+        if nid in self.entries:
+            if self.entries[nid] == (label, typ): return
+            self.remove(nid)
+        self.entries[nid] = (label, typ)
+        self.by_type[typ].add(nid)
+        self.key2id[(label, typ)].add(nid)
+        for g in _grams(label.lower()):
+            self.grams[g].add(nid)
+        if self._sorted is not None:
+            insort(self._sorted, (label.lower(), nid))
+
+    def remove(self, nid: str):
+        label, typ = self.entries.pop(nid, (None, None))
+        if label is None: return
+        self.by_type[typ].discard(nid)
+        ids = self.key2id.get((label, typ))
+        if ids is not None:
+            ids.discard(nid)
+            if not ids: del self.key2id[(label, typ)]
+        if self._sorted is not None:
+            del self._sorted[bisect_left(self._sorted, (label.lower(), nid))]
+        for g in _grams(label.lower()):
+            post = self.grams.get(g)
+            if post is not None:
+                post.discard(nid)
+                if not post: del self.grams[g]
+
+    def copy(self) -> "SearchIndex":
+        """Independent copy (posting sets copied, labels not re-tokenised)."""
+        out = SearchIndex()
+        out.by_type = defaultdict(set, {t: set(p) for t, p in self.by_type.items()})
+        out.grams = defaultdict(set, {g: set(p) for g, p in self.grams.items()})
+        out.key2id = defaultdict(set, {k: set(p) for k, p in self.key2id.items()}); out.entries = dict(self.entries)
+        out._sorted = None if self._sorted is None else list(self._sorted)
+        return out
+
+    def update(self, meta: Dict[str, Dict]):
+        """Sync with `meta`, touching only added, removed or relabelled nodes."""
+        for nid in [n for n in self.entries if n not in meta]:
+            self.remove(nid)
+        for nid, a in meta.items():
+            self.add(nid, a["label"], a["type"])
+        return self
+
+    # ---------------- queries ----------------
+    def ids(self, label: str, typ: str) -> Set[str]:
+        """Every node with exactly this label and type."""
+        return set(self.key2id.get((label, typ), ()))
+
+    def lookup(self, label: str, typ: str) -> Optional[str]:
+        """The node with this label and type; None if there is none, ValueError if several share it."""
+        ids = self.key2id.get((label, typ), ())
+        if len(ids) > 1:
+            raise ValueError(f"{len(ids)} {typ} nodes are labelled {label!r}: {', '.join(sorted(ids)[:5])}")
+        return next(iter(ids), None)
+
+    def prefix(self, q: str) -> Set[str]:
+        """Node ids whose lowercased label starts with `q` (already lowercased)."""
+        if self._sorted is None:
+            self._sorted = sorted((label.lower(), nid) for nid, (label, _) in self.entries.items())
+        out = set()
+        for i in range(bisect_left(self._sorted, (q, "")), len(self._sorted)):
+            low, nid = self._sorted[i]
+            if not low.startswith(q): break
+            out.add(nid)
+        return out
+
+    def contains(self, query: str) -> Set[str]:
+        """Node ids whose lowercased label contains `query` (lowercased, stripped); a query
+        shorter than GRAM matches label prefixes instead (a 1-2 letter substring hits most labels)."""
+        q = (query or "").lower().strip()
+        if not q: return set(self.entries)
+        if len(q) < GRAM: return self.prefix(q)
+        if len(q) == GRAM: return set(self.grams.get(q, ()))
+        posts = sorted((self.grams.get(q[i:i + GRAM], set()) for i in range(len(q) - GRAM + 1)), key=len)
+        hits = set(posts[0]).intersection(*posts[1:])
+        return {n for n in hits if q in self.entries[n][0].lower()}
+
+    def search(self, types: Iterable[str], query: str = "") -> Set[str]:
+        types = set(types)
+        if not (query or "").strip():
+            return set().union(*(self.by_type.get(t, ()) for t in types))
+        return {nid for nid in self.contains(query) if self.entries[nid][1] in types}
+
+    def mask(self, index: Dict[str, int], n: int, types: Iterable[str], query: str = "") -> np.ndarray:
+        """Boolean node mask over a compact graph's id -> int index."""
+        m = np.zeros(n, dtype=bool)
+        hits = [index[nid] for nid in self.search(types, query) if nid in index]
+        m[hits] = True
+        return m
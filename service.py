@@ -0,0 +1,281 @@
+# service.py
+# Local HTTP/JSON service and CLI on top of engine.Engine (no Streamlit).
+#
+#   python service.py serve --graph graph.vcg --port 8765      # or --graph demo / export.json / --synth 100k
+#   python service.py query path "Rob Kalin" --dst Coinbase -k 3
+#   python service.py query neighborhood Etsy --depth 2 --types company,investor
+#   python service.py batch queries.jsonl                      # one {"op": ...} object per line ("-" = stdin)
+#   python service.py bench --synth 10k --clients 8 --seconds 10 --batch 50
+#
+# Endpoints (GET takes query-string arguments, lists comma-separated):
+#   /info · /stats · /path?src=&dst=&k=&weighted=&avoid= · /neighborhood?center=&depth=&limit=
+#   /overlap?companies=a,b&top= · /centrality?top=&mode=&samples= · /export
+#   POST /query  {"op": "path", ...}        POST /batch  {"queries": [...]} (or a bare list)
+#   /export?format=nodes.ndjson.gz · /paths?dst=&sources=a,b&source_type=founder&format=csv.gz
+#     are streamed as they are generated (exports.py formats; no Content-Length)
+# Every query also takes the view filters types=, query=, focus=, depth=.
+# The graph stays warm in memory, so each query only pays for its own traversal
+# (or a cache hit); /stats reports queries served and queries/sec.
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from engine import Engine, QueryError, check_args
+
+INT_ARGS = {"k", "depth", "top", "limit", "samples"}
+LIST_ARGS = {"types", "avoid", "companies", "sources"}
+BOOL_ARGS = {"weighted"}
+
+
+def parse_args(qs: Dict[str, List[str]]) -> Dict:
+    """Query-string values -> engine kwargs."""
+    out = {}
+    for k, vals in qs.items():
+        v = vals[-1]
+        if k in LIST_ARGS:
+            out[k] = [x for val in vals for x in val.split(",") if x]
+        elif k in INT_ARGS:
+            out[k] = int(v)
+        elif k in BOOL_ARGS:
+            out[k] = v.lower() not in ("0", "false", "no", "")
+        else:
+            out[k] = v
+    return out
+
+
+class QueryStats:
+    """Queries served, overall and over the last `window` seconds."""
+
+    def __init__(self, window: float = 10.0):
+        self.window = window; self.started = time.time(); self.total = 0; self.errors = 0
+        self.recent: deque = deque()   # (timestamp, count)
+        self.lock = threading.Lock()
+
+    def add(self, n: int, errors: int = 0):
+        now = time.time()
+        with self.lock:
+            self.total += n; self.errors += errors; self.recent.append((now, n))
+            while self.recent and self.recent[0][0] < now - self.window:
+                self.recent.popleft()
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            now = time.time(); up = now - self.started
+            recent = sum(n for t, n in self.recent if t >= now - self.window)
+            return {"queries": self.total, "errors": self.errors, "uptime_s": round(up, 1),
+                    "qps": round(self.total / up, 1) if up else 0.0, "qps_recent": round(recent / self.window, 1)}
+
+
+def serve(engine: Engine, port: int = 8765, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the JSON service on a daemon thread; srv.stats is the QueryStats. Stop with srv.shutdown()."""
+    stats = QueryStats()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: Dict):
+            data = json.dumps(body).encode()
+            self.send_response(code); self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data))); self.end_headers(); self.wfile.write(data)
+
+        def _stream(self, op: str, fmt: str, **args):
+            try:
+                args = check_args(op, dict(args, format=fmt))
+                chunks = getattr(engine, op)(**args)
+                first = next(chunks, b"")   # bad node references surface here, before the headers go out
+            except QueryError as e:
+                stats.add(1, 1); return self._send(400, {"error": str(e)})
+            except Exception as e:   # our bug, not the client's: answer rather than drop the connection
+                stats.add(1, 1); return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            mime = "application/gzip" if fmt.endswith(".gz") else "application/x-ndjson" if "ndjson" in fmt else \
+                   "text/csv" if "csv" in fmt else "application/xml" if "graphml" in fmt else "application/json"
+            self.send_response(200); self.send_header("Content-Type", mime); self.end_headers()
+            self.wfile.write(first)
+            for c in chunks:
+                self.wfile.write(c)
+            stats.add(1)
+
+        def _run(self, q: Dict):
+            try:
+                res = engine.query(q)
+            except QueryError as e:
+                stats.add(1, 1); return self._send(400, {"error": str(e)})
+            except Exception as e:
+                stats.add(1, 1); return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            stats.add(1); self._send(200, res)
+
+        def do_GET(self):
+            url = urlparse(self.path); op = url.path.strip("/")
+            if op == "stats":
+                return self._send(200, stats.snapshot())
+            if op not in Engine.OPS and op != "paths":
+                return self._send(404, {"error": f"unknown endpoint /{op}", "endpoints": list(Engine.OPS) + ["paths", "stats", "query", "batch"]})
+            try:
+                args = parse_args(parse_qs(url.query))
+            except ValueError as e:
+                stats.add(1, 1); return self._send(400, {"error": str(e)})
+            if op == "paths" or (op == "export" and "format" in args):
+                return self._stream("export_stream" if op == "export" else "paths_stream", args.pop("format", "csv"), **args)
+            self._run({"op": op, **args})
+
+        def do_POST(self):
+            op = urlparse(self.path).path.strip("/")
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"null")
+            except ValueError:
+                return self._send(400, {"error": "body is not JSON"})
+            if op == "query":
+                return self._run(body)   # a non-object body is a QueryError, so 400
+            if op == "batch":
+                queries = body.get("queries") if isinstance(body, dict) else body
+                if not isinstance(queries, list):
+                    return self._send(400, {"error": "expected {\"queries\": [...]} or a list"})
+                try:
+                    res = engine.batch(queries)
+                except QueryError as e:   # no graph loaded
+                    stats.add(len(queries), len(queries)); return self._send(400, {"error": str(e)})
+                stats.add(len(queries), sum(not r["ok"] for r in res["results"]))
+                return self._send(200, res)
+            self._send(404, {"error": f"POST /query or /batch, not /{op}"})
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    srv.daemon_threads = True; srv.stats = stats
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+# ---------------- load test ----------------
+def sample_queries(engine: Engine, n: int, seed: int = 0) -> List[Dict]:
+    """A mix of path / neighborhood / overlap / centrality queries over random nodes."""
+    import random
+    rng = random.Random(seed); snap = engine.snap
+    of = lambda t: sorted(snap.CG.ids[i] for i in np.flatnonzero(snap.CG.type_mask([t])).tolist())
+    founders, companies = of("founder"), of("company")
+    out = []
+    for i in range(n):
+        r = rng.random()
+        if r < 0.5:
+            out.append({"op": "path", "src": rng.choice(founders), "dst": rng.choice(founders + companies),
+                        "k": 3 if i % 10 == 0 else 1})   # k > 1 runs Yen's, ~10x a single route
+        elif r < 0.8:
+            out.append({"op": "neighborhood", "center": rng.choice(companies), "depth": 1 + (i % 2), "limit": 50})
+        elif r < 0.95:
+            out.append({"op": "overlap", "companies": rng.sample(companies, 2)})
+        else:
+            out.append({"op": "centrality", "top": 10})
+    return out
+
+
+def load_test(engine: Engine, clients: int = 8, seconds: float = 5.0, batch: int = 1, seed: int = 0) -> Dict:
+    """Hammer a local service from `clients` threads; returns queries/sec and latency percentiles."""
+    import requests
+    srv = serve(engine, port=0); base = f"http://127.0.0.1:{srv.server_address[1]}"
+    pool = sample_queries(engine, 2000, seed)
+    lat: List[float] = []; lock = threading.Lock(); done = [0]; stop = time.perf_counter() + seconds
+
+    def client(cid: int):
+        s = requests.Session(); i = cid * 97; mine = []; n = 0
+        while time.perf_counter() < stop:
+            qs = [pool[(i + j) % len(pool)] for j in range(batch)]; i += batch
+            t0 = time.perf_counter()
+            if batch == 1:
+                s.post(f"{base}/query", json=qs[0]).raise_for_status()
+            else:
+                s.post(f"{base}/batch", json={"queries": qs}).raise_for_status()
+            mine.append(time.perf_counter() - t0); n += batch
+        with lock:
+            lat.extend(mine); done[0] += n
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0; srv.shutdown()
+    lat.sort()
+    pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 2) if lat else None
+    return {"clients": clients, "batch": batch, "queries": done[0], "seconds": round(wall, 2),
+            "qps": round(done[0] / wall, 1), "requests": len(lat), "p50_ms": pct(0.5), "p95_ms": pct(0.95)}
+
+
+# ---------------- CLI ----------------
+def _engine(a) -> Engine:
+    if a.synth:
+        from synth import generate, parse_size
+        eng = Engine(); CG, meta, sources = generate(parse_size(a.synth))
+        eng.store.publish(CG, meta, sources)
+        return eng
+    return Engine.load(a.graph)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Founder network queries without the UI.")
+    ap.add_argument("--graph", default="demo", help="demo | snapshot.vcg | graph export .json")
+    ap.add_argument("--synth", help="use a synthetic graph of this size instead (e.g. 100k)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve"); p.add_argument("--port", type=int, default=8765); p.add_argument("--host", default="127.0.0.1")
+    q = sub.add_parser("query", help="run one query and print JSON")
+    q.add_argument("op", choices=Engine.OPS); q.add_argument("node", nargs="?", help="src / center")
+    q.add_argument("--dst"); q.add_argument("-k", type=int); q.add_argument("--depth", type=int)
+    q.add_argument("--top", type=int); q.add_argument("--companies"); q.add_argument("--types"); q.add_argument("--query")
+    q.add_argument("--focus"); q.add_argument("--unweighted", action="store_true")
+    b = sub.add_parser("batch", help="run JSONL queries and print the batch result")
+    b.add_argument("file", help="JSONL file of query objects, or - for stdin")
+    l = sub.add_parser("bench", help="queries/sec against a local service under load")
+    l.add_argument("--clients", type=int, default=8); l.add_argument("--seconds", type=float, default=5.0)
+    l.add_argument("--batch", type=int, default=1, help="queries per request (1 = POST /query)")
+    a = ap.parse_args(argv)
+    eng = _engine(a)
+
+    if a.cmd == "serve":
+        srv = serve(eng, a.port, a.host)
+        info = eng.info()
+        print(f"serving {info['nodes']:,} nodes / {info['edges']:,} edges on http://{a.host}:{srv.server_address[1]}")
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            srv.shutdown()
+        return 0
+    if a.cmd == "query":
+        args = {"path": {"src": a.node, "dst": a.dst, "k": a.k, "weighted": False if a.unweighted else None},
+                "neighborhood": {"center": a.node, "depth": a.depth}, "centrality": {"top": a.top},
+                "overlap": {"companies": a.companies.split(",") if a.companies else None, "top": a.top},
+                }.get(a.op, {})
+        args.update(types=a.types.split(",") if a.types else None, query=a.query, focus=a.focus)
+        if a.op == "info": args = {}
+        try:
+            res = eng.query({"op": a.op, **{k: v for k, v in args.items() if v is not None}})
+        except QueryError as e:
+            print(json.dumps({"error": str(e)}), file=sys.stderr); return 2
+        print(json.dumps(res, indent=2)); return 0
+    if a.cmd == "batch":
+        f = sys.stdin if a.file == "-" else open(a.file, encoding="utf-8")
+        with f:
+            queries = [json.loads(line) for line in f if line.strip()]
+        print(json.dumps(eng.batch(queries), indent=2)); return 0
+    if a.cmd == "bench":
+        info = eng.info()
+        print(f"graph: {info['nodes']:,} nodes / {info['edges']:,} edges")
+        t0 = time.perf_counter(); eng.centrality(top=10)   # one-off per snapshot, cached afterwards
+        print(f"warm-up (centrality): {time.perf_counter() - t0:.2f}s")
+        direct = eng.batch(sample_queries(eng, 200, seed=1))   # in-process baseline, no HTTP
+        print(f"in-process: {len(direct['results'])} queries in {direct['seconds']:.2f}s = {direct['qps']:,.0f}/s")
+        for batch in sorted({1, a.batch}):
+            r = load_test(eng, a.clients, a.seconds, batch)
+            print(f"http batch={batch:<4} clients={r['clients']}: {r['queries']:,} queries in {r['seconds']}s = "
+                  f"{r['qps']:,.0f} queries/s · {r['requests']:,} requests · p50 {r['p50_ms']} ms · p95 {r['p95_ms']} ms")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
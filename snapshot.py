@@ -0,0 +1,194 @@
+# snapshot.py
+# Versioned binary graph snapshot, opened with numpy.memmap for near-instant startup.
+#
+# One file = fixed preamble + JSON header + flat, 64-byte aligned arrays:
+#
+#   magic "VCGSNAP\0" | u32 format version | u32 header bytes | header (JSON)
+#   ids_off/ids_blob        node id string table (int64 offsets + utf-8 bytes)
+#   label_off/label_blob    labels, same layout
+#   url_off/url_blob        urls, same layout
+#   ntype                   int8 type code per node
+#   indptr/indices/erel     CSR offsets, targets and relation codes (both directions)
+#   src_node, src_off/src_blob   sources table: (node int, url) rows sorted by node
+#
+# Type/relation names, dtypes, offsets and the graph fingerprint live in the header.
+# Opening maps the file read-only, so several worker processes share the same pages,
+# and strings are only decoded when looked up. to_payload/from_payload convert
+# to and from the "Download graph JSON" schema (nodes, edges, sources).
+import json
+import os
+import struct
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+
+from graph_core import CompactGraph
+
+MAGIC = b"VCGSNAP\x00"
+FORMAT_VERSION = 1
+ALIGN = 64
+_PRE = struct.Struct("<8sII")
+
+
+def _pad(nbytes: int) -> int:
+    return -(-nbytes // ALIGN) * ALIGN
+
+
+class StringTable(Sequence):
+    """Read-only list of str over (offsets, utf-8 blob); decodes on access."""
+
+    def __init__(self, off: np.ndarray, blob: np.ndarray):
+        self.off = off; self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.off) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0: i += n
+        if not 0 <= i < n:
+            raise IndexError("StringTable index out of range")
+        return self.blob[self.off[i]:self.off[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        off, buf = self.off.tolist(), self.blob.tobytes()
+        for a, b in zip(off, off[1:]):
+            yield buf[a:b].decode("utf-8")
+
+    @staticmethod
+    def encode(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        parts = [s.encode("utf-8") for s in strings]
+        off = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=off[1:])
+        return off, np.frombuffer(b"".join(parts), dtype=np.uint8)
+
+
+class MetaTable(Mapping):
+    """META-compatible mapping (id -> {"type", "label", "url"}) backed by the snapshot arrays."""
+
+    def __init__(self, CG: CompactGraph, labels: StringTable, urls: StringTable):
+        self.CG = CG; self.labels = labels; self.urls = urls
+
+    def __getitem__(self, nid: str) -> Dict[str, str]:
+        i = self.CG.index[nid]
+        return {"type": self.CG.types[self.CG.ntype[i]], "label": self.labels[i], "url": self.urls[i]}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.CG.ids)
+
+    def __len__(self) -> int:
+        return self.CG.n
+
+    def __contains__(self, nid) -> bool:
+        return nid in self.CG.index
+
+
+# ---------------- write ----------------
+def _source_rows(CG: CompactGraph, sources: Dict[str, Iterable[str]]) -> Tuple[np.ndarray, List[str]]:
+    rows = sorted((CG.index[n], u) for n, urls in sources.items() if n in CG.index for u in urls)
+    return np.asarray([r[0] for r in rows], dtype=np.int32), [r[1] for r in rows]
+
+
+def write_snapshot(dest, CG: CompactGraph, meta: Dict[str, Dict], sources: Dict[str, Iterable[str]]) -> int:
+    """Write to a path (atomically: tmp file + rename, so live maps of the old file stay
+    valid) or to a binary file object. Returns bytes written."""
+    src_node, src_urls = _source_rows(CG, sources)
+    arrays = {}
+    arrays["ids_off"], arrays["ids_blob"] = StringTable.encode(CG.ids)
+    arrays["label_off"], arrays["label_blob"] = StringTable.encode(meta[n]["label"] for n in CG.ids)
+    arrays["url_off"], arrays["url_blob"] = StringTable.encode(meta[n].get("url", "") for n in CG.ids)
+    arrays.update(ntype=CG.ntype, indptr=CG.indptr, indices=CG.indices, erel=CG.erel, src_node=src_node)
+    arrays["src_off"], arrays["src_blob"] = StringTable.encode(src_urls)
+    arrays = {k: np.ascontiguousarray(a) for k, a in arrays.items()}
+
+    header = {"n": CG.n, "types": list(CG.types), "relations": list(CG.relations),
+              "fingerprint": CG.fingerprint, "arrays": {}}
+    pos = 0
+    for name, a in arrays.items():
+        header["arrays"][name] = [pos, a.dtype.str, a.size]
+        pos += _pad(a.nbytes)
+    hdr = json.dumps(header).encode()
+    base = _pad(_PRE.size + len(hdr))
+
+    if isinstance(dest, (str, os.PathLike)):
+        tmp = f"{os.fspath(dest)}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            size = write_snapshot(f, CG, meta, sources)
+        os.replace(tmp, dest)
+        return size
+    dest.write(_PRE.pack(MAGIC, FORMAT_VERSION, len(hdr))); dest.write(hdr)
+    dest.write(b"\x00" * (base - _PRE.size - len(hdr)))
+    for a in arrays.values():
+        dest.write(a.tobytes()); dest.write(b"\x00" * (_pad(a.nbytes) - a.nbytes))
+    return base + pos
+
+
+# ---------------- open ----------------
+def _parse(buf: np.ndarray) -> Dict[str, np.ndarray]:
+    magic, version, hlen = _PRE.unpack(buf[:_PRE.size].tobytes())
+    if magic != MAGIC:
+        raise ValueError("Not a graph snapshot (bad magic).")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format v{version} (this build reads v{FORMAT_VERSION}).")
+    header = json.loads(buf[_PRE.size:_PRE.size + hlen].tobytes())
+    base = _pad(_PRE.size + hlen)
+    out = {"header": header}
+    for name, (off, dt, size) in header["arrays"].items():
+        dt = np.dtype(dt)
+        out[name] = buf[base + off: base + off + size * dt.itemsize].view(dt)
+    return out
+
+
+def open_snapshot(src) -> Tuple[CompactGraph, MetaTable, Dict[str, Set[str]]]:
+    """Open a snapshot from a path (memory-mapped) or bytes / a file object (read into memory).
+    Returns (CG, meta, sources) ready for GraphStore.publish(CG, meta, sources)."""
+    if isinstance(src, (str, os.PathLike)):
+        buf = np.memmap(src, dtype=np.uint8, mode="r")
+    else:
+        buf = np.frombuffer(src if isinstance(src, (bytes, bytearray, memoryview)) else src.read(), dtype=np.uint8)
+    a = _parse(buf); h = a["header"]
+    CG = CompactGraph(StringTable(a["ids_off"], a["ids_blob"]), a["ntype"], h["types"],
+                      a["indptr"], a["indices"], a["erel"], h["relations"])
+    CG.__dict__["fingerprint"] = h["fingerprint"]  # trusted from the header; skips hashing every page
+    meta = MetaTable(CG, StringTable(a["label_off"], a["label_blob"]), StringTable(a["url_off"], a["url_blob"]))
+    sources: Dict[str, Set[str]] = {}
+    urls = StringTable(a["src_off"], a["src_blob"])
+    for i, u in zip(a["src_node"].tolist(), urls):
+        sources.setdefault(CG.ids[i], set()).add(u)
+    return CG, meta, sources
+
+
+# ---------------- JSON payload ----------------
+def to_payload(CG: CompactGraph, meta: Dict[str, Dict], sources: Dict[str, Iterable[str]]) -> Dict:
+    """Same schema as the app's "Download graph JSON" export."""
+    view = CG.view()
+    return {
+        "nodes": {n: {"label": meta[n]["label"], "type": meta[n]["type"], "url": meta[n].get("url", "")} for n in CG.ids},
+        "edges": [{"u": u, "v": v, "relation": rel} for u, v, rel in view.edges()],
+        "sources": {n: sorted(sources.get(n, [])) for n in CG.ids},
+    }
+
+
+def from_payload(payload: Dict) -> Tuple[CompactGraph, Dict[str, Dict], Dict[str, Set[str]]]:
+    meta = {n: {"label": d.get("label", n), "type": d["type"], "url": d.get("url", "")} for n, d in payload["nodes"].items()}
+    edges = ((e["u"], e["v"], e.get("relation", "")) for e in payload.get("edges", [])
+             if e["u"] in meta and e["v"] in meta)
+    sources = {n: set(u) for n, u in (payload.get("sources") or {}).items() if n in meta and u}
+    return CompactGraph.build(meta, edges), meta, sources
+
+
+if __name__ == "__main__":
+    # python snapshot.py founder_network.json graph.vcg   (JSON export -> snapshot, or back)
+    import sys
+    src, dst = sys.argv[1], sys.argv[2]
+    if src.endswith(".json"):
+        with open(src, encoding="utf-8") as f:
+            size = write_snapshot(dst, *from_payload(json.load(f)))
+        print(f"wrote {dst} ({size:,} bytes)")
+    else:
+        with open(dst, "w", encoding="utf-8") as f:
+            json.dump(to_payload(*open_snapshot(src)), f, indent=2)
+        print(f"wrote {dst}")
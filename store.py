@@ -0,0 +1,234 @@
+# store.py
+# Process-wide, read-mostly graph store with immutable versioned snapshots.
+#
+# One GraphStore lives per server process (the app gets it via st.cache_resource).
+# A Snapshot bundles the graph, its derived indexes and the per-view engines/caches;
+# it is never mutated after publish(), except for the engines' internal thread-safe
+# caches. Writers (publish() and apply()) are serialised by an edit lock; the swap of
+# the current reference takes a second, brief lock, so readers never block. Sessions
+# keep just a version number.
+# apply(Delta) publishes an edited graph incrementally: the label index, per-type sets
+# and LABEL2ID are patched, and the engines carry forward what they can (see Remap).
+# SEARCH and LABEL2ID are built on first use (the n-gram index is ~3 s at 100k), so
+# publishing a freshly opened snapshot costs no more than opening it. The analysis
+# engines are imported when the first snapshot is built, and COMMUNITIES (which pulls
+# in scipy.sparse.csgraph) only when clusters are first asked for, so none of them
+# sit on the app's startup path.
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from focus import FocusEngine
+from graph_core import CompactGraph
+from paths import PathEngine, WeightedRouter
+from render import HtmlCache, LayoutCache
+from search_index import SearchIndex
+
+if TYPE_CHECKING:
+    from centrality import CentralityCache
+    from communities import CommunityCache
+    from overlap import OverlapCache
+    from projections import ProjectionCache
+
+USV_ID = "investor::usv"
+ENGINES = ("PATHS", "ROUTER", "FOCUS", "CENTRALITY", "OVERLAP", "PROJECTIONS", "LAYOUTS", "HTML_CACHE")
+
+
+def label_key(m: Dict) -> str:
+    return f"{m['label']} ({m['type']})"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    CG: CompactGraph
+    META: Dict[str, Dict]
+    SOURCES: Dict[str, Set[str]]
+    built_at: float = field(default_factory=time.time)
+    # per-view engines/caches shared by every session on this snapshot
+    PATHS: PathEngine = None
+    ROUTER: WeightedRouter = None
+    FOCUS: FocusEngine = None
+    CENTRALITY: "CentralityCache" = None
+    OVERLAP: "OverlapCache" = None
+    PROJECTIONS: "ProjectionCache" = None
+    LAYOUTS: LayoutCache = None
+    HTML_CACHE: HtmlCache = None
+    # patched copies handed over by apply(); None = build from META on first use
+    _search: Optional[SearchIndex] = None
+    _label2id: Optional[Dict[str, str]] = None
+    _communities: Optional["CommunityCache"] = None
+
+    @cached_property
+    def SEARCH(self) -> SearchIndex:
+        return self._search if self._search is not None else SearchIndex(self.META)
+
+    @cached_property
+    def LABEL2ID(self) -> Dict[str, str]:
+        if self._label2id is not None: return self._label2id
+        return {label_key(self.META[n]): n for n in self.CG.ids}
+
+    @cached_property
+    def COMMUNITIES(self) -> "CommunityCache":
+        if self._communities is not None: return self._communities
+        from communities import CommunityCache
+        return CommunityCache(max_entries=16)  # partitions per (view, method, resolution)
+
+
+@dataclass
+class Delta:
+    """A batch of graph edits, applied atomically by GraphStore.apply()."""
+    nodes: Dict[str, Dict] = field(default_factory=dict)       # id -> {"label", "type", "url"}; new or updated
+    removed_nodes: Set[str] = field(default_factory=set)
+    edges: List[Tuple[str, str, str]] = field(default_factory=list)  # (u, v, relation); re-adding sets the relation
+    removed_edges: List[Tuple[str, str]] = field(default_factory=list)
+    sources: Dict[str, Set[str]] = field(default_factory=dict)
+    removed_sources: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return any((self.nodes, self.removed_nodes, self.edges, self.removed_edges, self.sources, self.removed_sources))
+
+    def add_node(self, nid: str, label: str, type: str, url: str = "") -> "Delta":
+        self.nodes[nid] = {"type": type, "label": label, "url": url}; return self
+
+    def remove_node(self, nid: str) -> "Delta":
+        self.removed_nodes.add(nid); return self
+
+    def add_edge(self, u: str, v: str, relation: str = "") -> "Delta":
+        self.edges.append((u, v, relation)); return self
+
+    def remove_edge(self, u: str, v: str) -> "Delta":
+        self.removed_edges.append((u, v)); return self
+
+    def add_source(self, nid: str, url: str) -> "Delta":
+        self.sources.setdefault(nid, set()).add(url); return self
+
+    def remove_source(self, nid: str, url: str) -> "Delta":
+        self.removed_sources.setdefault(nid, set()).add(url); return self
+
+
+class GraphStore:
+    def __init__(self, keep_versions: int = 3):
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()        # serialises writers only
+        self._edit_lock = threading.Lock()   # publish()/apply() read-then-write the current snapshot
+        self._versions: Dict[int, Snapshot] = {}
+        self._current: Optional[Snapshot] = None
+
+    def current(self) -> Optional[Snapshot]:
+        return self._current                 # single reference read, no lock
+
+    def get(self, version: Optional[int]) -> Optional[Snapshot]:
+        return self._versions.get(version) if version is not None else None
+
+    def publish(self, CG: CompactGraph, meta: Dict[str, Dict], sources) -> Snapshot:
+        """Build derived state for (CG, meta, sources) and make it the current snapshot.
+        Republishing an identical graph returns the current snapshot unchanged. Holds the edit
+        lock like apply(), so a delta can't read a snapshot this publish is about to replace."""
+        sources = {n: frozenset(u) for n, u in sources.items()}
+        with self._edit_lock:
+            prev = self._current
+            if prev is not None and prev.CG.fingerprint == CG.fingerprint and prev.META == meta and prev.SOURCES == sources:
+                return prev
+            return self._install(dict(CG=CG, META=meta, SOURCES=sources, **self._engines(CG)))
+
+    @staticmethod
+    def _engines(CG: CompactGraph) -> Dict:
+        from centrality import CentralityCache
+        from overlap import OverlapCache
+        from projections import ProjectionCache
+        ids = lambda *types: sorted(CG.ids[i] for i in np.flatnonzero(CG.type_mask(types)).tolist())
+        return dict(
+            # BFS trees are cached per hub (USV + partners) and per view fingerprint
+            PATHS=PathEngine(hubs=[USV_ID] + ids("partner")),
+            ROUTER=WeightedRouter(),
+            # hop distances per (view, center); the top partner/investor hubs are precomputed in the background
+            FOCUS=FocusEngine(hubs=ids("partner", "investor")),
+            CENTRALITY=CentralityCache(),
+            OVERLAP=OverlapCache(),
+            PROJECTIONS=ProjectionCache(max_entries=6),  # founder/investor projection graphs
+            LAYOUTS=LayoutCache(max_entries=8),   # server-side positions per view fingerprint
+            HTML_CACHE=HtmlCache(),               # fresh per snapshot, so META edits never serve stale HTML
+        )
+
+    def apply(self, delta: Delta) -> Snapshot:
+        """Publish the current graph with `delta` applied, patching derived state instead of
+        rebuilding it. Raises ValueError for edges to unknown nodes or node type changes."""
+        with self._edit_lock:
+            return self._apply(delta)
+
+    def _apply(self, delta: Delta) -> Snapshot:
+        prev = self._current
+        if prev is None:
+            raise ValueError("No graph to apply a delta to; publish one first.")
+        old_meta = prev.META
+        for nid, a in delta.nodes.items():
+            if nid in prev.CG.index and old_meta[nid]["type"] != a["type"]:
+                raise ValueError(f"Cannot change the type of {nid!r}; remove it and add a new node.")
+        alive = lambda n: (n in prev.CG.index or n in delta.nodes) and n not in delta.removed_nodes
+        bad = [(u, v) for u, v, _ in delta.edges if not (alive(u) and alive(v))]
+        if bad:
+            raise ValueError(f"Edges to unknown or removed nodes: {bad[:5]}")
+
+        new_ids = [n for n in delta.nodes if n not in prev.CG.index and n not in delta.removed_nodes]
+        structural = bool(new_ids or delta.removed_nodes or delta.edges or delta.removed_edges)
+        if structural:
+            CG, remap = prev.CG.apply(new_ids, [delta.nodes[n]["type"] for n in new_ids], delta.removed_nodes,
+                                      delta.edges, delta.removed_edges)
+
+        # META / SOURCES / index / LABEL2ID: copy-on-write, touching only edited nodes;
+        # an index or label map the previous snapshot never built stays unbuilt
+        meta = dict(old_meta); sources = dict(prev.SOURCES)
+        search = prev.SEARCH.copy() if "SEARCH" in prev.__dict__ else None
+        label2id = dict(prev.LABEL2ID) if "LABEL2ID" in prev.__dict__ else None
+        if label2id is not None:
+            for nid in delta.removed_nodes | set(delta.nodes):
+                if nid in old_meta and label2id.get(label_key(old_meta[nid])) == nid:
+                    del label2id[label_key(old_meta[nid])]
+        for nid in delta.removed_nodes:
+            meta.pop(nid, None); sources.pop(nid, None)
+            if search is not None: search.remove(nid)
+        for nid, a in delta.nodes.items():
+            if nid in delta.removed_nodes: continue
+            meta[nid] = {**meta.get(nid, {}), **a}
+            if search is not None: search.add(nid, meta[nid]["label"], meta[nid]["type"])
+            if label2id is not None: label2id[label_key(meta[nid])] = nid
+        for nid, urls in delta.sources.items():
+            if nid in meta: sources[nid] = frozenset(sources.get(nid, frozenset()) | set(urls))
+        for nid, urls in delta.removed_sources.items():
+            if nid in sources: sources[nid] = frozenset(sources[nid] - set(urls))
+
+        if not structural:
+            # labels/URLs/sources only (e.g. enrichment): same graph, so every per-view engine
+            # is shared as is; only rendered HTML shows META and starts afresh
+            engines = {name: getattr(prev, name) for name in ENGINES}
+            engines["HTML_CACHE"] = HtmlCache()
+            return self._install(dict(CG=prev.CG, META=meta, SOURCES=sources, _search=search, _label2id=label2id,
+                                      _communities=prev.__dict__.get("COMMUNITIES"), **engines))
+        engines = self._engines(CG)
+        moves = remap.moves()
+        for name in ("PATHS", "FOCUS", "CENTRALITY", "OVERLAP", "LAYOUTS"):
+            engines[name].carry_from(getattr(prev, name), remap, moves)
+        communities = None
+        if "COMMUNITIES" in prev.__dict__:   # never asked for: stays unbuilt
+            from communities import CommunityCache
+            communities = CommunityCache(max_entries=16)
+            communities.carry_from(prev.COMMUNITIES, remap, moves)
+        # ROUTER: slot costs and per-target heuristics are global, rebuilt on demand; so are PROJECTIONS
+        return self._install(dict(CG=CG, META=meta, SOURCES=sources, _search=search, _label2id=label2id,
+                                  _communities=communities, **engines))
+
+    def _install(self, snap_fields: Dict) -> Snapshot:
+        with self._lock:
+            version = max(self._versions, default=0) + 1
+            snap = Snapshot(version=version, **snap_fields)
+            versions = dict(self._versions); versions[version] = snap
+            for old in sorted(versions)[:-self.keep_versions]:
+                del versions[old]
+            self._versions = versions         # swap whole dicts so readers see a consistent map
+            self._current = snap
+        return snap
@@ -0,0 +1,75 @@
+# synth.py
+# Synthetic VC-shaped portfolio graphs for benchmarks and load testing.
+#
+# Shape: ~n/4 companies with 1-4 founders each; investors (~1 per 8 companies)
+# with power-law (Pareto) fan-out, so a few funds back a large share of the
+# portfolio; 1-5 partners per firm. investor::usv is the biggest fund, so the
+# app's USV-centric defaults work unchanged. Everything is vectorised and the
+# meta mapping is the snapshot's lazy MetaTable, so 1M nodes builds in seconds.
+from typing import Dict, Set, Tuple
+
+import numpy as np
+
+from graph_core import CompactGraph
+from snapshot import MetaTable, StringTable
+
+TYPES = ["founder", "company", "investor", "partner"]
+RELATIONS = ["Founded by", "Invested in", "Partner"]
+_SYL = ["ka", "lo", "mi", "ra", "ten", "vo", "zu", "be", "ne", "shi", "do", "gra", "pel", "qui", "sa", "tor"]
+_FIRST = ["Ava", "Ben", "Chen", "Dara", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena", "Milo", "Nia", "Omar", "Pia"]
+_LAST = ["Adler", "Brook", "Cruz", "Dorsey", "Ehrsam", "Frost", "Gold", "Hart", "Ito", "Jensen", "Karp", "Lund", "Moss", "Ng", "Ortiz", "Park"]
+
+
+def _names(kind: str, count: int, rng: np.random.Generator):
+    a, b, c = rng.integers(16, size=(3, count))
+    if kind in ("founder", "partner"):
+        return (f"{_FIRST[x]} {_LAST[y]} {i}" for i, (x, y) in enumerate(zip(a.tolist(), b.tolist())))
+    suffix = " Capital" if kind == "investor" else ""
+    return (f"{_SYL[x].title()}{_SYL[y]}{_SYL[z]}{suffix} {i}" for i, (x, y, z) in enumerate(zip(a.tolist(), b.tolist(), c.tolist())))
+
+
+def generate(n_nodes: int, seed: int = 0, investors_per_company: float = 3.0, fanout_alpha: float = 1.2
+             ) -> Tuple[CompactGraph, MetaTable, Dict[str, Set[str]]]:
+    """(CG, meta, sources) with about n_nodes nodes. fanout_alpha is the Pareto shape of
+    investor fan-out (smaller = heavier tail)."""
+    rng = np.random.default_rng(seed)
+    C = max(4, n_nodes // 4)
+    I = max(2, C // 8)
+    per_co = rng.integers(1, 5, size=C)                    # founders per company
+    per_firm = rng.integers(1, 6, size=I)                  # partners per firm
+    F, P = int(per_co.sum()), int(per_firm.sum())
+    fo, co, io, po = 0, F, F + C, F + C + I
+    n = po + P
+
+    weight = rng.pareto(fanout_alpha, size=I) + 1.0
+    weight[0] = weight.max() * 2                           # investor::usv
+    k = 1 + rng.poisson(max(investors_per_company - 1, 0), size=C)
+    inv = rng.choice(I, size=int(k.sum()), p=weight / weight.sum())
+    us = np.concatenate([co + np.repeat(np.arange(C), per_co), io + inv, po + np.arange(P)])
+    vs = np.concatenate([fo + np.arange(F), co + np.repeat(np.arange(C), k), io + np.repeat(np.arange(I), per_firm)])
+    rels = np.concatenate([np.zeros(F), np.ones(k.sum()), np.full(P, 2)]).astype(np.int8)
+
+    ids = ([f"founder::f{i}" for i in range(F)] + [f"company::c{i}" for i in range(C)]
+           + ["investor::usv"] + [f"investor::i{i}" for i in range(1, I)] + [f"partner::p{i}" for i in range(P)])
+    ntype = np.repeat(np.arange(4, dtype=np.int8), [F, C, I, P])
+    CG = CompactGraph.from_arrays(ids, ntype, list(TYPES), us, vs, rels, list(RELATIONS))
+    labels = [s for t, cnt in zip(TYPES, (F, C, I, P)) for s in _names(t, cnt, rng)]
+    labels[io] = "Union Square Ventures"
+    meta = MetaTable(CG, StringTable(*StringTable.encode(labels)), StringTable(*StringTable.encode([""] * n)))
+    return CG, meta, {}
+
+
+def parse_size(s: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000."""
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s.rstrip("km")) * mult)
+
+
+if __name__ == "__main__":
+    # python synth.py 100k graph.vcg   (write a synthetic graph as a snapshot for the app: GRAPH_SNAPSHOT=graph.vcg)
+    import sys
+    from snapshot import write_snapshot
+    CG, meta, sources = generate(parse_size(sys.argv[1]), seed=int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    size = write_snapshot(sys.argv[2], CG, meta, sources)
+    print(f"wrote {sys.argv[2]}: {CG.n:,} nodes / {CG.indices.size // 2:,} edges ({size:,} bytes)")
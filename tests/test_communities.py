@@ -0,0 +1,83 @@
+# test_communities.py
+# Louvain / label propagation: modularity against networkx, planted structure, and the Communities contract.
+import networkx as nx
+import numpy as np
+import pytest
+
+from communities import _view_csr, detect, modularity
+from graph_core import CompactGraph
+from synth import TYPES, generate
+
+
+def to_nx(view) -> nx.Graph:
+    G = nx.Graph()
+    G.add_nodes_from(view.nodes())
+    G.add_edges_from((u, v) for u, v, _ in view.edges())
+    return G
+
+
+def partition(view, labels):
+    g = view.g; parts = {}
+    for i in view.node_ints().tolist():
+        parts.setdefault(int(labels[i]), set()).add(g.ids[i])
+    return list(parts.values())
+
+
+@pytest.fixture(scope="module")
+def view():
+    CG, _, _ = generate(2500, seed=3)
+    return CG.view(CG.type_mask(TYPES))
+
+
+@pytest.mark.parametrize("resolution", [1.0, 1.7])
+def test_modularity_matches_networkx(view, resolution):
+    res = detect(view, "louvain", resolution)
+    _, W = _view_csr(view)
+    want = nx.community.modularity(to_nx(view), partition(view, res.labels), resolution=resolution)
+    assert res.modularity == pytest.approx(want, abs=1e-9)
+    assert modularity(W, res.labels[view.node_ints()], resolution) == pytest.approx(want, abs=1e-9)
+
+
+@pytest.mark.parametrize("method, slack", [("louvain", 0.01), ("lpa", 0.15)])
+def test_quality_close_to_networkx_louvain(view, method, slack):
+    G = to_nx(view)
+    ref = nx.community.modularity(G, nx.community.louvain_communities(G, seed=0))
+    assert detect(view, method).modularity >= ref - slack
+
+
+def two_cliques(k=6):
+    meta = {f"founder::{s}{i}": {"type": "founder", "label": f"{s}{i}", "url": ""} for s in "ab" for i in range(k)}
+    edges = [(f"founder::{s}{i}", f"founder::{s}{j}", "") for s in "ab" for i in range(k) for j in range(i + 1, k)]
+    edges.append(("founder::a0", "founder::b0", ""))
+    return CompactGraph.build(meta, edges).view()
+
+
+@pytest.mark.parametrize("method", ["louvain", "lpa"])
+def test_planted_cliques_are_found(method):
+    v = two_cliques()
+    res = detect(v, method)
+    assert sorted(map(sorted, partition(v, res.labels))) == sorted(
+        [sorted(f"founder::{s}{i}" for i in range(6)) for s in "ab"])
+
+
+def test_result_contract(view):
+    g = view.g
+    res = detect(view, "louvain", seed=4)
+    again = detect(view, "louvain", seed=4)
+    assert np.array_equal(res.labels, again.labels)                     # seeded: reproducible
+    inside = view.node_ints()
+    assert (res.labels[~view.mask] == -1).all() and (res.labels[inside] >= 0).all()
+    assert res.sizes.sum() == inside.size and (np.diff(res.sizes) <= 0).all()
+    assert np.array_equal(np.bincount(res.labels[inside]), res.sizes)
+    deg = view.degrees()
+    for c, h in enumerate(res.hubs.tolist()):
+        members = inside[res.labels[inside] == c]
+        assert res.labels[h] == c and deg[h] == deg[members].max()
+    empty = detect(g.view(np.zeros(g.n, dtype=bool)))
+    assert empty.count == 0 and empty.modularity == 0.0
+
+
+def test_parallel_runs_keep_the_best(view):
+    res = detect(view, "louvain", workers=2)
+    assert res.method == "louvain ×2"
+    assert res.modularity >= max(detect(view, "louvain", seed=s).modularity for s in (0, 1)) - 1e-12
@@ -0,0 +1,200 @@
+# test_crosscheck.py
+# The CSR engines against networkx on synthetic graphs, and GraphStore.apply(Delta)
+# against a fresh publish of the same edited graph.
+import networkx as nx
+import numpy as np
+import pytest
+
+from centrality import CentralityCache, betweenness
+from graph_core import CompactGraph
+from overlap import OverlapCache
+from paths import PathEngine, bidirectional_path
+from store import USV_ID, Delta, GraphStore
+from synth import TYPES, generate
+
+
+def to_nx(view) -> nx.Graph:
+    G = nx.Graph()
+    G.add_nodes_from(view.nodes())
+    G.add_edges_from((u, v) for u, v, _ in view.edges())
+    return G
+
+
+@pytest.fixture(scope="module")
+def graph():
+    CG, meta, sources = generate(1500, seed=7)
+    return CG, {n: dict(meta[n]) for n in CG.ids}, sources
+
+
+VIEWS = {"all": TYPES, "no partners": ["founder", "company", "investor"], "founders+companies": ["founder", "company"]}
+
+
+@pytest.mark.parametrize("types", VIEWS.values(), ids=VIEWS.keys())
+def test_paths_match_networkx(graph, types):
+    CG = graph[0]
+    view = CG.view(CG.type_mask(types)); G = to_nx(view)
+    rng = np.random.default_rng(0)
+    nodes = view.nodes(); paths = PathEngine(hubs=[USV_ID])
+    for _ in range(150):
+        src, dst = (nodes[i] for i in rng.integers(len(nodes), size=2))
+        want = nx.shortest_path_length(G, src, dst) if nx.has_path(G, src, dst) else None
+        s, t = CG.index[src], CG.index[dst]
+        for p in (paths.path(view, src, dst), view.shortest_path(src, dst),
+                  [CG.ids[i] for i in bidirectional_path(CG, view.mask, s, t)]):
+            if want is None:
+                assert p == []
+                continue
+            assert len(p) - 1 == want and p[0] == src and p[-1] == dst
+            assert all(view.has_edge(a, b) for a, b in zip(p, p[1:]))
+
+
+def test_bfs_distances_match_networkx(graph):
+    CG = graph[0]
+    view = CG.view(); G = to_nx(view)
+    dist, _ = CG.bfs([CG.index[USV_ID]], view.mask)
+    want = nx.single_source_shortest_path_length(G, USV_ID)
+    assert {CG.ids[i]: int(d) for i, d in enumerate(dist.tolist()) if d >= 0} == want
+
+
+@pytest.mark.parametrize("types", VIEWS.values(), ids=VIEWS.keys())
+def test_exact_betweenness_matches_networkx(graph, types):
+    CG = graph[0]
+    view = CG.view(CG.type_mask(types)).ego(USV_ID, 2) if "investor" in types else CG.view(CG.type_mask(types))
+    want = nx.betweenness_centrality(to_nx(view))
+    bc, used = betweenness(view)
+    assert used == view.number_of_nodes()
+    assert np.allclose([bc[CG.index[n]] for n in want], list(want.values()), atol=1e-12)
+    assert not bc[~view.mask].any()
+    cached, desc = CentralityCache().betweenness(view, mode="exact")
+    assert desc == "exact" and np.array_equal(cached, bc)
+
+
+def test_sampled_betweenness(graph):
+    CG = graph[0]
+    view = CG.view().ego(USV_ID, 2); n = view.number_of_nodes()
+    exact, _ = betweenness(view)
+    bc, used = betweenness(view, k=n)                     # every node a pivot: exact
+    assert used == n and np.allclose(bc, exact)
+    ref, _ = betweenness(view, k=n // 2, seed=3)
+    bc, used = betweenness(view, k=n // 2, seed=3, budget=60.0)   # a budget that never runs out
+    assert used == n // 2 and np.allclose(bc, ref)
+
+
+# ---------------- deltas vs fresh rebuilds ----------------
+def edited(CG, meta, sources):
+    """A delta touching every kind of edit, plus the graph it should produce (meta, edges, sources)."""
+    full = CG.view()
+    company = next(n for n in CG.ids if n.startswith("company::") and full.degree(n) >= 3)
+    founder = next(n for n in full.neighbors(company) if n.startswith("founder::"))
+    investors = [n for n in CG.ids if n.startswith("investor::")]
+    unlinked = next(i for i in investors if not full.has_edge(i, company))
+    cut = next((u, v) for u, v, _ in full.edges() if USV_ID in (u, v) and company not in (u, v))
+    relabel = investors[3]
+
+    d = (Delta().remove_node(founder)
+         .add_node("founder::new", "Ada Newfounder", "founder").add_edge("founder::new", company, "Founded by")
+         .add_node("investor::new", "Newco Capital", "investor").add_edge("investor::new", company, "Invested in")
+         .add_edge(unlinked, company, "Invested in").add_edge("investor::new", USV_ID, "Co-invest")
+         .remove_edge(*cut).add_node(relabel, "Renamed Capital", "investor", "https://example.com")
+         .add_source(company, "https://example.com/a"))
+
+    meta2 = {n: dict(m) for n, m in meta.items() if n != founder}
+    for nid, a in d.nodes.items():
+        meta2[nid] = {**meta2.get(nid, {}), **a}
+    gone = {frozenset(cut)}
+    edges = [(u, v, r) for u, v, r in full.edges() if founder not in (u, v) and frozenset((u, v)) not in gone]
+    edges += d.edges
+    sources2 = {**{n: set(u) for n, u in sources.items()}, company: {"https://example.com/a"}}
+    return d, meta2, edges, sources2
+
+
+def edge_set(view):
+    return {(frozenset((u, v)), r) for u, v, r in view.edges()}
+
+
+def pair_map(snap, view):
+    inc = snap.OVERLAP.incidence(view, "investor", "company")
+    snap.OVERLAP.top_pairs(view, "investor", "company")
+    C = snap.OVERLAP.entries[(view.fingerprint(), "pairs", "investor", "company", None)].tocoo()
+    ids = snap.CG.ids
+    return {frozenset((ids[inc.rows[i]], ids[inc.rows[j]])): int(w) for i, j, w in zip(C.row, C.col, C.data)}
+
+
+def by_id(CG, values):
+    return {CG.ids[i]: v for i, v in enumerate(values.tolist())}
+
+
+@pytest.mark.parametrize("index_built", [False, True], ids=["lazy index", "built index"])
+def test_delta_matches_fresh_rebuild(graph, index_built):
+    CG, meta, sources = graph
+    store = GraphStore()
+    prev = store.publish(CompactGraph.from_arrays(list(CG.ids), CG.ntype, list(CG.types), CG.src, CG.indices,
+                                                  CG.erel, list(CG.relations)), meta, sources)
+    full = prev.CG.view()
+    # warm the engines that carry state across the delta
+    prev.PATHS.tree(full, USV_ID); prev.FOCUS.distances(full, USV_ID)
+    prev.CENTRALITY.degree(full); pair_map(prev, full)
+    if index_built:
+        prev.SEARCH, prev.LABEL2ID
+
+    d, meta2, edges2, sources2 = edited(CG, meta, sources)
+    snap = store.apply(d)
+    fresh = GraphStore().publish(CompactGraph.build(meta2, edges2), meta2, sources2)
+    new, ref = snap.CG.view(), fresh.CG.view()
+
+    assert sorted(snap.CG.ids) == sorted(fresh.CG.ids)
+    assert edge_set(new) == edge_set(ref)
+    assert dict(snap.META) == meta2 and snap.SOURCES == fresh.SOURCES
+    assert snap.LABEL2ID == fresh.LABEL2ID
+    for q in ("", "capital", "renamed", "ada new"):
+        assert snap.SEARCH.search(TYPES, q) == fresh.SEARCH.search(TYPES, q)
+
+    h = snap.CG.index[USV_ID]
+    assert (new.fingerprint(), h) in snap.PATHS.trees.entries           # repaired, not recomputed
+    snap_dist = by_id(snap.CG, snap.PATHS.trees.entries[(new.fingerprint(), h)][0])
+    assert snap_dist == by_id(fresh.CG, fresh.CG.bfs([fresh.CG.index[USV_ID]], ref.mask)[0])
+    assert by_id(snap.CG, snap.FOCUS.distances(new, USV_ID)) == by_id(fresh.CG, fresh.FOCUS.distances(ref, USV_ID))
+    assert by_id(snap.CG, snap.CENTRALITY.degree(new)) == by_id(fresh.CG, fresh.CENTRALITY.degree(ref))
+    assert pair_map(snap, new) == pair_map(fresh, ref)
+    for a in (USV_ID, "investor::new", "founder::new"):
+        assert len(snap.PATHS.path(new, a, CG.ids[0])) == len(fresh.PATHS.path(ref, a, CG.ids[0]))
+
+
+def test_overlap_counts_match_networkx(graph):
+    CG = graph[0]
+    view = CG.view(); G = to_nx(view)
+    cache = OverlapCache()
+    for a, b, w in cache.top_pairs(view, "investor", "company", n=20):
+        x, y = CG.ids[a], CG.ids[b]
+        assert w == len(set(G[x]) & set(G[y]) & {n for n in G if n.startswith("company::")})
+
+
+def test_communities_cache_is_built_on_demand_and_carried(graph):
+    CG, meta, sources = graph
+    store = GraphStore(); prev = store.publish(CG, meta, sources)
+    founder, company = next((u, v) for u, v, _ in CG.view().edges() if u.startswith("founder::") and v.startswith("company::"))
+    snap = store.apply(Delta().remove_edge(founder, company))
+    assert "COMMUNITIES" not in prev.__dict__ and snap._communities is None   # never asked for, never built
+
+    backers = snap.CG.view(snap.CG.type_mask(["investor", "partner"]))
+    want = snap.COMMUNITIES.communities(backers)
+    snap = store.apply(Delta().add_edge(founder, company, "Founded by"))     # leaves the backer view untouched
+    moved = snap.CG.view(snap.CG.type_mask(["investor", "partner"]))
+    assert (moved.fingerprint(), "comm", "auto", 1.0, 0, 0) in snap._communities.entries
+    got = snap.COMMUNITIES.communities(moved)
+    assert got.modularity == want.modularity and got.count == want.count
+    relabeled = store.apply(Delta().add_node(founder, "Renamed", "founder"))
+    assert relabeled.COMMUNITIES is snap.COMMUNITIES                          # labels only: shared as is
+
+
+def test_publish_waits_for_an_edit_in_progress(graph):
+    import threading
+    CG, meta, sources = graph
+    store = GraphStore(); store.publish(CG, meta, sources)
+    other = CompactGraph.build({USV_ID: meta[USV_ID]}, [])
+    with store._edit_lock:                                # an apply() mid-way
+        t = threading.Thread(target=store.publish, args=(other, {USV_ID: meta[USV_ID]}, {}))
+        t.start(); t.join(0.2)
+        assert t.is_alive() and store.current().CG is CG
+    t.join(5)
+    assert not t.is_alive() and store.current().CG is other
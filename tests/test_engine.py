@@ -0,0 +1,118 @@
+# test_engine.py
+# Engine argument checking and batches, and the HTTP status codes service.py maps them to.
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from engine import Engine, QueryError, check_args
+from graph_core import CompactGraph
+from service import serve
+from store import Delta
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return Engine.load("demo")
+
+
+BAD = [
+    ({"op": "path", "src": "Rob Kalin", "bogus": 1}, "unknown argument 'bogus'"),
+    ({"op": "path", "src": None}, "src must be str"),
+    ({"op": "path", "src": "Rob Kalin", "k": 2.5}, "k must be int"),
+    ({"op": "path", "src": "Rob Kalin", "k": 0}, "k must be >= 1"),
+    ({"op": "path", "src": "Nobody Atall"}, "Unknown node"),
+    ({"op": "neighborhood", "center": "Etsy", "depth": 7}, "depth must be 1.."),
+    ({"op": "neighborhood", "center": "Etsy", "types": ["company", "robot"]}, "unknown type"),
+    ({"op": "centrality", "mode": "fast"}, "unknown mode"),
+    ({"op": "overlap", "companies": ["Etsy", 3]}, "companies must be a list of strings"),
+    ({"op": "overlap", "companies": ["Etsy", "Rob Kalin"]}, "not companies"),
+    ({"op": "info", "types": ["company"]}, "info: unknown argument"),
+    ({"op": "teleport"}, "Unknown op"),
+    (["op", "path"], "A query is an object"),
+]
+
+
+@pytest.mark.parametrize("q, msg", BAD, ids=[str(i) for i in range(len(BAD))])
+def test_bad_queries_raise_query_error(engine, q, msg):
+    with pytest.raises(QueryError, match=msg):
+        engine.query(q)
+
+
+def test_string_arguments_are_coerced():
+    assert check_args("path", {"k": "2", "weighted": "no", "avoid": "a,b"}) == {"k": 2, "weighted": False, "avoid": ["a", "b"]}
+    assert check_args("centrality", {"samples": None}) == {"samples": None}
+
+
+def test_export_stream_rejects_unknown_format(engine):
+    with pytest.raises(QueryError, match="Unknown stream format"):
+        engine.export_stream("zip")
+
+
+def test_ambiguous_label():
+    meta = {"company::a": {"type": "company", "label": "Acme", "url": ""},
+            "investor::a": {"type": "investor", "label": "Acme", "url": ""}}
+    eng = Engine(); eng.store.publish(CompactGraph.build(meta, [("investor::a", "company::a", "Invested in")]), meta, {})
+    with pytest.raises(QueryError, match="Ambiguous node 'Acme'"):
+        eng.resolve("Acme")
+    assert eng.resolve("Acme (investor)") == "investor::a"
+
+
+def test_batch_reports_errors_in_place_against_one_snapshot():
+    eng = Engine.load("demo")
+
+    def queries():
+        yield {"op": "info"}
+        eng.store.apply(Delta().add_node("founder::new", "Ada New", "founder"))   # lands mid-batch
+        yield {"op": "path", "src": "Rob Kalin", "k": 0}
+        yield {"op": "info"}
+
+    res = eng.batch(queries())["results"]
+    assert [r["ok"] for r in res] == [True, False, True]
+    assert "k must be >= 1" in res[1]["error"]
+    assert res[0]["result"] == res[2]["result"]
+    assert eng.info()["nodes"] == res[0]["result"]["nodes"] + 1
+
+
+@pytest.fixture(scope="module")
+def base(engine):
+    srv = serve(engine, port=0)
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+
+
+def call(url, body=None, raw=None):
+    data = raw if raw is not None else (json.dumps(body).encode() if body is not None else None)
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as r:
+            return r.status, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+@pytest.mark.parametrize("path, body, raw, code", [
+    ("/query", {"op": "path", "src": "Rob Kalin", "k": "2"}, None, 200),
+    ("/query", [{"op": "info"}], None, 400),
+    ("/query", "info", None, 400),
+    ("/query", None, b"{not json", 400),
+    ("/query", {"op": "path", "src": "Rob Kalin", "bogus": 1}, None, 400),
+    ("/batch", {"queries": "info"}, None, 400),
+    ("/nope", {"op": "info"}, None, 404),
+    ("/path?src=Rob%20Kalin&k=x", None, None, 400),
+    ("/path?src=Nobody", None, None, 400),
+    ("/export?format=zip", None, None, 400),
+    ("/paths?format=csv&bogus=1", None, None, 400),
+    ("/nope", None, None, 404),
+])
+def test_service_status_codes(base, path, body, raw, code):
+    status, out = call(base + path, body, raw)
+    assert status == code
+    if code != 200:
+        assert "error" in json.loads(out)
+
+
+def test_service_batch(base):
+    status, out = call(base + "/batch", {"queries": [{"op": "info"}, {"op": "path", "src": "Rob Kalin", "k": 0}, 7]})
+    assert status == 200
+    assert [r["ok"] for r in json.loads(out)["results"]] == [True, False, False]
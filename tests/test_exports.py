@@ -0,0 +1,132 @@
+# test_exports.py
+# Every export format parses back (with the standard readers) to the view it was written from.
+import csv
+import gzip
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import networkx as nx
+import pytest
+
+from engine import export_payload
+from exports import FORMATS, export_bytes, infer_format, iter_paths, stream, write
+from graph_core import CompactGraph
+from paths import PathEngine
+from snapshot import open_snapshot
+
+NS = "{http://graphml.graphdrawing.org/xmlns}"
+
+
+@pytest.fixture(scope="module")
+def graph():
+    meta = {"founder::a": {"type": "founder", "label": 'Ann "A" <O\'Neil> & co', "url": "https://x.com/?a=1&b=2"},
+            "founder::b": {"type": "founder", "label": "Björn, Jr.\nsecond line", "url": ""},
+            "company::c": {"type": "company", "label": "C;orp", "url": ""},
+            "investor::usv": {"type": "investor", "label": "USV", "url": "https://usv.com"},
+            "partner::p": {"type": "partner", "label": "P", "url": ""}}
+    edges = [("founder::a", "company::c", "Founded by"), ("founder::b", "company::c", 'Co-"founded" <by>'),
+             ("investor::usv", "company::c", "Invested in"), ("partner::p", "investor::usv", "Partner")]
+    sources = {"company::c": {"https://s1", "https://s2"}, "partner::p": {"https://s3"}}
+    CG = CompactGraph.build(meta, edges)
+    view = CG.view(CG.type_mask(["founder", "company", "investor"]))   # partner filtered out
+    return view, meta, sources
+
+
+def want_nodes(view, meta, sources):
+    return {n: {"label": meta[n]["label"], "type": meta[n]["type"], "url": meta[n]["url"],
+                "sources": ";".join(sorted(sources.get(n, ())))} for n in view.nodes()}
+
+
+def want_edges(view):
+    return {(frozenset((u, v)), r) for u, v, r in view.edges()}
+
+
+def unzip(data: bytes, fmt: str) -> bytes:
+    return gzip.decompress(data) if fmt.endswith(".gz") else data
+
+
+@pytest.mark.parametrize("fmt", ["json", "json.gz"])
+def test_json(graph, fmt):
+    view, meta, sources = graph
+    got = json.loads(unzip(export_bytes(fmt, view, meta, sources), fmt))
+    want = export_payload(view, meta, sources)
+    assert got["nodes"] == want["nodes"] and got["sources"] == want["sources"]
+    assert {(frozenset((e["u"], e["v"])), e["relation"]) for e in got["edges"]} == want_edges(view)
+
+
+@pytest.mark.parametrize("part", ["nodes", "edges"])
+@pytest.mark.parametrize("kind", ["ndjson", "csv"])
+def test_tables(graph, part, kind):
+    view, meta, sources = graph
+    fmt = f"{part}.{kind}.gz"
+    text = unzip(export_bytes(fmt, view, meta, sources), fmt).decode("utf-8")
+    rows = ([json.loads(line) for line in text.splitlines()] if kind == "ndjson"
+            else list(csv.DictReader(io.StringIO(text, newline=""))))
+    if part == "nodes":
+        assert {r["id"]: {k: r[k] for k in ("label", "type", "url", "sources")} for r in rows} == want_nodes(view, meta, sources)
+    else:
+        assert {(frozenset((r["u"], r["v"])), r["relation"]) for r in rows} == want_edges(view)
+
+
+@pytest.mark.parametrize("fmt", ["graphml", "graphml.gz"])
+def test_graphml(graph, fmt):
+    view, meta, sources = graph
+    data = unzip(export_bytes(fmt, view, meta, sources), fmt)
+    root = ET.fromstring(data)
+    data_of = lambda el: {d.get("key"): d.text or "" for d in el.findall(f"{NS}data")}
+    nodes = {el.get("id"): data_of(el) for el in root.iter(f"{NS}node")}
+    assert nodes == {n: {k: v for k, v in m.items() if k != "sources"} for n, m in want_nodes(view, meta, sources).items()}
+    G = nx.read_graphml(io.BytesIO(data))
+    assert {(frozenset((u, v)), d["relation"]) for u, v, d in G.edges(data=True)} == want_edges(view)
+
+
+@pytest.mark.parametrize("part", ["nodes", "edges"])
+def test_parquet(graph, tmp_path, part):
+    pq = pytest.importorskip("pyarrow.parquet")
+    view, meta, sources = graph
+    path = str(tmp_path / f"{part}.parquet")
+    write(path, f"{part}.parquet", view, meta, sources)
+    rows = pq.read_table(path).to_pylist()
+    if part == "nodes":
+        assert {r.pop("id"): r for r in rows} == want_nodes(view, meta, sources)
+    else:
+        assert {(frozenset((r["u"], r["v"])), r["relation"]) for r in rows} == want_edges(view)
+
+
+def test_vcg(graph):
+    view, meta, sources = graph
+    CG, meta2, sources2 = open_snapshot(export_bytes("vcg", view, meta, sources))
+    assert sorted(CG.ids) == sorted(view.nodes()) and want_edges(CG.view()) == want_edges(view)
+    assert {n: dict(meta2[n]) for n in CG.ids} == {n: meta[n] for n in view.nodes()}
+    assert sources2 == {n: u for n, u in sources.items() if n in view}
+
+
+@pytest.mark.parametrize("fmt", ["json", "nodes.ndjson", "edges.csv", "graphml"])
+def test_chunking_does_not_change_the_output(graph, fmt):
+    view, meta, sources = graph
+    assert b"".join(stream(fmt, view, meta, sources, chunk=1)) == b"".join(stream(fmt, view, meta, sources))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_paths(graph, fmt):
+    view, meta, _ = graph
+    srcs = ["founder::a", "founder::b", "partner::p"]        # the partner is outside the view
+    text = b"".join(iter_paths(view, PathEngine(), srcs, "investor::usv", meta, fmt, chunk=1)).decode()
+    if fmt == "ndjson":
+        got = {r["source"]: (r["hops"], r["path"]) for r in map(json.loads, text.splitlines())}
+    else:
+        got = {}
+        for r in csv.DictReader(io.StringIO(text, newline="")):
+            hops, path = got.get(r["source"], (None, []))
+            got[r["source"]] = (int(r["hops"]), path + [r["node_id"]]) if r["hops"] else (None, [])
+    assert got == {"founder::a": (2, ["founder::a", "company::c", "investor::usv"]),
+                   "founder::b": (2, ["founder::b", "company::c", "investor::usv"]),
+                   "partner::p": (None, [])}
+
+
+def test_infer_format():
+    assert infer_format("out/Edges.CSV.gz") == "edges.csv.gz"
+    assert infer_format("graph.graphml") == "graphml" and infer_format("x.vcg") == "vcg"
+    assert infer_format("notes.txt") is None
+    assert all(infer_format(name) == k for k, (_, name, _) in FORMATS.items())
@@ -0,0 +1,65 @@
+# test_ingest.py
+# load_portfolio: what is kept, what is rejected and counted, and that chunking and format don't matter.
+import csv
+import gzip
+import json
+
+import pytest
+
+from ingest import load_portfolio
+
+NODES = [
+    {"id": "company::etsy", "label": "Etsy", "type": "company", "url": "https://etsy.com", "sources": "https://a;https://b"},
+    {"id": "founder::rob", "label": "Rob Kalin", "type": "founder", "url": "", "sources": ""},
+    {"id": "investor::usv", "label": "USV", "type": "investor", "url": "", "sources": ""},
+    {"id": "company::etsy", "label": "Etsy Inc", "type": "company", "url": "https://etsy.com", "sources": "https://c"},
+    {"id": "Company::Bad", "label": "x", "type": "company", "url": "", "sources": ""},     # bad id
+    {"id": "founder::jo", "label": "Jo", "type": "company", "url": "", "sources": ""},     # type mismatch
+    {"id": "", "label": "nobody", "type": "founder", "url": "", "sources": ""},
+]
+EDGES = [
+    {"u": "founder::rob", "v": "company::etsy", "relation": "Founded by"},
+    {"u": "company::etsy", "v": "founder::rob", "relation": "Founded by"},        # same edge, reversed
+    {"u": "investor::usv", "v": "company::etsy", "relation": "Invested in"},
+    {"u": "investor::usv", "v": "company::etsy", "relation": "Invested in"},     # repeated
+    {"u": "investor::usv", "v": "company::ghost", "relation": "Invested in"},    # dangling
+    {"u": "investor::usv", "v": "not an id", "relation": ""},                    # invalid
+]
+SOURCES = [{"id": "investor::usv", "url": "https://usv.com"}, {"id": "company::ghost", "url": "https://x"}]
+
+
+def write(path, rows, fmt):
+    if fmt.startswith("csv"):
+        opener = gzip.open if fmt.endswith(".gz") else open
+        with opener(path, "wt", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=list(rows[0])); w.writeheader(); w.writerows(rows)
+    elif fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in rows)
+    else:
+        pq = pytest.importorskip("pyarrow.parquet"); pa = pytest.importorskip("pyarrow")
+        pq.write_table(pa.Table.from_pylist(rows), path)
+    return str(path)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "csv.gz", "jsonl", "parquet"])
+@pytest.mark.parametrize("chunk_rows", [1, 2, 50_000])
+def test_load_portfolio(tmp_path, fmt, chunk_rows):
+    res = load_portfolio(write(tmp_path / f"nodes.{fmt}", NODES, fmt), write(tmp_path / f"edges.{fmt}", EDGES, fmt),
+                         write(tmp_path / f"sources.{fmt}", SOURCES, fmt), chunk_rows=chunk_rows)
+    CG, st = res.CG, res.stats
+    assert list(CG.ids) == ["company::etsy", "founder::rob", "investor::usv"]
+    assert res.meta["company::etsy"]["label"] == "Etsy Inc"                  # a repeated id updates in place
+    assert res.sources == {"company::etsy": {"https://a", "https://b", "https://c"}, "investor::usv": {"https://usv.com"}}
+    assert {(frozenset((u, v)), r) for u, v, r in CG.view().edges()} == {
+        (frozenset(("founder::rob", "company::etsy")), "Founded by"),
+        (frozenset(("investor::usv", "company::etsy")), "Invested in")}
+    assert (st.node_rows, st.edge_rows, st.source_rows) == (7, 6, 2)
+    assert (st.invalid_ids, st.dangling_edges, st.duplicate_edges) == (4, 1, 2)
+    assert len(st.examples) == 4
+
+
+def test_unsupported_file_type(tmp_path):
+    path = tmp_path / "nodes.xlsx"; path.write_text("")
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        load_portfolio(str(path), str(path))
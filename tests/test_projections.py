@@ -0,0 +1,86 @@
+# test_projections.py
+# Projection weights against a brute-force count of shared backers / companies.
+import re
+from collections import Counter, defaultdict
+from itertools import combinations
+
+import pytest
+
+from graph_core import CompactGraph
+from projections import project
+from synth import generate
+
+
+def weights(proj):
+    return {frozenset((u, v)): int(re.search(r"\d+", r).group()) for u, v, r in proj.CG.view().edges()}
+
+
+def brute(view, rows, backers):
+    by_backer = defaultdict(set)
+    for r in rows:
+        for x in backers(r):
+            by_backer[x].add(r)
+    return dict(Counter(frozenset(p) for rs in by_backer.values() for p in combinations(sorted(rs), 2)))
+
+
+def of_type(view, n, t):
+    return {x for x in view.neighbors(n) if x.startswith(t + "::")}
+
+
+def founder_backers(view):
+    def backers(f):
+        out = set()
+        for c in of_type(view, f, "company"):
+            out |= of_type(view, c, "investor")
+            for p in of_type(view, c, "partner"):
+                out |= of_type(view, p, "investor") or {p}      # a partner counts as their firm
+        return out
+    return backers
+
+
+@pytest.fixture
+def small():
+    meta = {n: {"type": n.split("::")[0], "label": n, "url": ""} for n in
+            ["founder::a", "founder::b", "founder::c", "founder::d", "company::x", "company::y", "company::z",
+             "company::w", "investor::f", "investor::g", "partner::p", "partner::q", "partner::solo"]}
+    edges = [("founder::a", "company::x", ""), ("founder::b", "company::y", ""), ("founder::c", "company::z", ""),
+             ("founder::d", "company::w", ""),
+             ("investor::f", "partner::p", ""), ("investor::g", "partner::q", ""),
+             ("investor::f", "company::x", ""), ("investor::f", "company::y", ""),   # a, b share firm f
+             ("partner::p", "company::y", ""),                                        # ... and f's partner p
+             ("partner::p", "company::z", ""),                                        # c reaches f through p
+             ("investor::g", "company::z", ""), ("investor::g", "company::w", ""),    # c, d share g
+             ("partner::solo", "company::z", ""), ("partner::solo", "company::w", "")]  # and a firmless partner
+    return CompactGraph.build(meta, edges).view()
+
+
+def test_firm_and_its_partner_count_once(small):
+    w = weights(project(small, "founders"))
+    assert w == {frozenset(("founder::a", "founder::b")): 1, frozenset(("founder::a", "founder::c")): 1,
+                 frozenset(("founder::b", "founder::c")): 1, frozenset(("founder::c", "founder::d")): 2}
+
+
+def test_founders_match_brute_force():
+    CG, _, _ = generate(1200, seed=4)
+    view = CG.view()
+    rows = [n for n in CG.ids if n.startswith("founder::")]
+    assert weights(project(view, "founders")) == brute(view, rows, founder_backers(view))
+
+
+def test_coinvest_matches_brute_force():
+    CG, _, _ = generate(1200, seed=4)
+    view = CG.view()
+    rows = [n for n in CG.ids if n.startswith("investor::")]
+    assert weights(project(view, "coinvest")) == brute(view, rows, lambda i: of_type(view, i, "company"))
+
+
+def test_pruning():
+    CG, _, _ = generate(1200, seed=4)
+    view = CG.view(); full = weights(project(view, "coinvest"))
+    strong = project(view, "coinvest", min_weight=2)
+    assert weights(strong) == {k: w for k, w in full.items() if w >= 2}
+    assert strong.pruned == sum(w < 2 for w in full.values()) * 2   # each pair is a candidate from both ends
+    top = project(view, "coinvest", top_k=1)
+    deg = top.CG.view().degree
+    assert all(deg(n) >= 1 for n in {n for k in full for n in k})
+    assert set(weights(top)) <= set(full)
@@ -0,0 +1,55 @@
+# test_render.py
+# level_of_detail: the node budget holds, and every view node is drawn, folded or counted as dropped.
+import pytest
+
+from render import level_of_detail
+from store import USV_ID
+from synth import generate
+
+
+@pytest.fixture(scope="module")
+def graph():
+    CG, meta, _ = generate(3000, seed=9)
+    return CG, meta
+
+
+def check(view, red, keep=()):
+    drawn = {n for n, _, _, m in red.nodes if m == 1 and not n.startswith("agg::")}
+    aggs = {n: m for n, _, _, m in red.nodes if n.startswith("agg::")}
+    nodes = set(view.nodes())
+    assert drawn <= nodes and set(red.folded) <= nodes and not drawn & set(red.folded)
+    assert set(red.folded.values()) == set(aggs)
+    for a, m in aggs.items():                                   # an aggregate's count is what it stands for
+        assert m == sum(1 for x in red.folded.values() if x == a) >= 2
+    ids = drawn | set(aggs)
+    assert all(u in ids and v in ids for u, v, _ in red.edges)
+    assert set(keep) & nodes <= drawn
+    if not red.dropped:
+        assert drawn | set(red.folded) == nodes
+
+
+def test_under_budget_draws_everything(graph):
+    CG, meta = graph
+    view = CG.view().ego(USV_ID, 1)
+    red = level_of_detail(view, meta, budget=view.number_of_nodes())
+    assert {n for n, *_ in red.nodes} == set(view.nodes()) and not red.folded and red.dropped == 0
+    assert len(red.edges) == view.number_of_edges()
+
+
+@pytest.mark.parametrize("budget", [1500, 400, 60, 5])
+def test_budget_holds(graph, budget):
+    CG, meta = graph
+    view = CG.view()
+    keep = [USV_ID, next(n for n in CG.ids if n.startswith("founder::"))]
+    red = level_of_detail(view, meta, budget=budget, keep=keep)
+    assert len(red.nodes) <= budget
+    assert red.folded                                           # folding runs before anything is cut
+    check(view, red, keep)
+
+
+def test_folding_alone_meets_a_moderate_budget(graph):
+    CG, meta = graph
+    view = CG.view()
+    red = level_of_detail(view, meta, budget=view.number_of_nodes() * 2 // 3)
+    assert red.dropped == 0 and len(red.nodes) <= view.number_of_nodes() * 2 // 3
+    check(view, red)
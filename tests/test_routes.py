@@ -0,0 +1,76 @@
+# test_routes.py
+# WeightedRouter.k_shortest against networkx's Yen (shortest_simple_paths) on relation costs.
+from itertools import islice
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from paths import DEFAULT_COST, RELATION_COST, WeightedRouter
+from store import USV_ID
+from synth import TYPES, generate
+
+
+@pytest.fixture(scope="module")
+def view():
+    CG, _, _ = generate(2000, seed=5)
+    return CG.view(CG.type_mask(TYPES))
+
+
+def weighted(view, penalties) -> nx.DiGraph:
+    G = nx.DiGraph()
+    for u, v, r in view.edges():
+        c = RELATION_COST.get(r, DEFAULT_COST)
+        G.add_edge(u, v, w=c + penalties.get(v, 0.0)); G.add_edge(v, u, w=c + penalties.get(u, 0.0))
+    return G
+
+
+def cost(G, p):
+    return sum(G[a][b]["w"] for a, b in zip(p, p[1:]))
+
+
+@pytest.mark.parametrize("avoid", [0, 25], ids=["plain", "penalties"])
+def test_k_shortest_matches_networkx(view, avoid):
+    rng = np.random.default_rng(avoid); nodes = view.nodes(); router = WeightedRouter()
+    for _ in range(15):
+        src, dst = (nodes[i] for i in rng.integers(len(nodes), size=2))
+        penalties = {nodes[i]: 3.0 for i in rng.integers(len(nodes), size=avoid)}
+        G = weighted(view, penalties)
+        got = list(islice(router.k_shortest(view, src, dst, penalties, budget=None), 6))
+        if src == dst or not nx.has_path(G, src, dst):
+            assert len(got) <= 1
+            continue
+        want = [cost(G, p) for p in islice(nx.shortest_simple_paths(G, src, dst, weight="w"), 6)]
+        assert np.allclose([c for c, _ in got], want)
+        assert all(abs(cost(G, p) - c) < 1e-9 and len(set(p)) == len(p) for c, p in got)
+        assert len({tuple(p) for _, p in got}) == len(got)
+
+
+def test_penalty_steers_around_node(view):
+    router = WeightedRouter()
+    src = next(n for n in view.nodes() if n.startswith("founder::"))
+    (c, best), = islice(router.k_shortest(view, src, USV_ID), 1)
+    mid = best[-2]
+    (c2, other), = islice(router.k_shortest(view, src, USV_ID, {mid: 100.0}), 1)
+    assert (mid not in other and c2 < c + 100.0) or c2 == pytest.approx(c + 100.0)   # avoided, or unavoidable
+
+
+def test_spent_budget_stops_after_first_route(view):
+    src = next(n for n in view.nodes() if n.startswith("founder::"))
+    assert len(list(islice(WeightedRouter().k_shortest(view, src, USV_ID, budget=0.0), 5))) <= 1
+    assert len(list(islice(WeightedRouter().k_shortest(view, src, USV_ID), 5))) == 5
+
+
+def test_unknown_endpoints_yield_nothing(view):
+    assert list(WeightedRouter().k_shortest(view, "founder::nobody", USV_ID)) == []
+
+
+def test_routes_on_memory_mapped_snapshot(view, tmp_path):
+    from snapshot import open_snapshot, write_snapshot
+    CG = view.g
+    write_snapshot(str(tmp_path / "g.vcg"), CG, {n: {"label": n, "type": n.split("::")[0]} for n in CG.ids}, {})
+    mapped = open_snapshot(str(tmp_path / "g.vcg"))[0]      # read-only CSR arrays
+    src = next(n for n in view.nodes() if n.startswith("founder::"))
+    want = [c for c, _ in islice(WeightedRouter().k_shortest(view, src, USV_ID, budget=None), 3)]
+    got = [c for c, _ in islice(WeightedRouter().k_shortest(mapped.view(), src, USV_ID, budget=None), 3)]
+    assert got == want
@@ -0,0 +1,64 @@
+# test_search_index.py
+# SearchIndex queries against a brute-force scan of META, through edits and copies.
+import pytest
+
+from search_index import SearchIndex
+from synth import TYPES, generate
+
+
+@pytest.fixture(scope="module")
+def meta():
+    CG, meta, _ = generate(800, seed=2)
+    return {n: dict(meta[n]) for n in CG.ids}
+
+
+def scan(meta, types, q):
+    q = q.lower().strip()
+    hit = (lambda low: low.startswith(q)) if len(q) < 3 else (lambda low: q in low)
+    return {n for n, m in meta.items() if m["type"] in types and (not q or hit(m["label"].lower()))}
+
+
+QUERIES = ["", "a", "Ka", "ben", "capital", "  Lena ", "union square", "zzz", "o 1", "x"]
+
+
+@pytest.mark.parametrize("q", QUERIES)
+def test_search_matches_scan(meta, q):
+    idx = SearchIndex(meta)
+    for types in (TYPES, ["founder"], ["investor", "partner"]):
+        assert idx.search(types, q) == scan(meta, types, q)
+
+
+def test_edits_and_copies_stay_in_sync(meta):
+    idx = SearchIndex(meta); idx.contains("ka")          # build the prefix list before editing
+    meta2 = dict(meta)
+    some = sorted(meta)[:40]
+    for n in some[:20]:
+        del meta2[n]
+    for n in some[20:]:
+        meta2[n] = {**meta[n], "label": "Kappa " + meta[n]["label"]}
+    meta2["founder::zz"] = {"type": "founder", "label": "Ka Zed", "url": ""}
+    before = idx.copy()
+    idx.update(meta2)
+    for q in QUERIES + ["kappa", "ka z"]:
+        assert idx.search(TYPES, q) == scan(meta2, TYPES, q)
+        assert before.search(TYPES, q) == scan(meta, TYPES, q)   # the copy is independent
+    assert SearchIndex(meta2).grams == idx.grams
+
+
+def test_lookup_and_duplicates():
+    idx = SearchIndex({"a": {"label": "Acme", "type": "company"}, "b": {"label": "Acme", "type": "company"},
+                       "c": {"label": "Acme", "type": "investor"}})
+    assert idx.lookup("Acme", "investor") == "c"
+    assert idx.lookup("Nope", "company") is None
+    assert idx.ids("Acme", "company") == {"a", "b"}
+    with pytest.raises(ValueError, match="2 company nodes"):
+        idx.lookup("Acme", "company")
+    idx.remove("a")
+    assert idx.lookup("Acme", "company") == "b"
+    idx.remove("b")
+    assert idx.lookup("Acme", "company") is None and ("Acme", "company") not in idx.key2id
+
+
+def test_only_trigrams_are_indexed(meta):
+    idx = SearchIndex(meta)
+    assert {len(g) for g in idx.grams} == {3}
@@ -0,0 +1,70 @@
+# test_snapshot.py
+# write_snapshot/open_snapshot and the JSON payload round-trip the graph unchanged.
+import io
+
+import pytest
+
+from graph_core import CompactGraph
+from snapshot import StringTable, from_payload, open_snapshot, to_payload, write_snapshot
+
+
+@pytest.fixture(scope="module")
+def graph():
+    meta = {"founder::ana": {"type": "founder", "label": "Ána Ölmez", "url": "https://example.com/ana"},
+            "company::acme": {"type": "company", "label": "Acme", "url": ""},
+            "investor::usv": {"type": "investor", "label": "Union Square Ventures", "url": "https://usv.com"},
+            "partner::fred": {"type": "partner", "label": "Fred", "url": ""},
+            "company::lone": {"type": "company", "label": "", "url": ""}}
+    edges = [("founder::ana", "company::acme", "Founded by"), ("investor::usv", "company::acme", "Invested in"),
+             ("partner::fred", "investor::usv", "Partner at")]
+    sources = {"company::acme": {"https://a.example", "https://b.example"}, "founder::ana": {"https://c.example"}}
+    return CompactGraph.build(meta, edges), meta, sources
+
+
+def edge_set(CG):
+    return {(frozenset((u, v)), r) for u, v, r in CG.view().edges()}
+
+
+def same(got, want):
+    (CG, meta, sources), (CG0, meta0, sources0) = got, want
+    assert list(CG.ids) == list(CG0.ids) and CG.fingerprint == CG0.fingerprint
+    assert [CG.types[t] for t in CG.ntype.tolist()] == [CG0.types[t] for t in CG0.ntype.tolist()]
+    assert edge_set(CG) == edge_set(CG0)
+    assert {n: dict(meta[n]) for n in CG.ids} == meta0
+    assert sources == sources0
+
+
+def test_file_round_trip(graph, tmp_path):
+    path = tmp_path / "g.vcg"
+    size = write_snapshot(str(path), *graph)
+    assert size == path.stat().st_size
+    same(open_snapshot(str(path)), graph)
+
+
+def test_buffer_round_trip(graph):
+    buf = io.BytesIO()
+    write_snapshot(buf, *graph)
+    same(open_snapshot(buf.getvalue()), graph)
+    same(open_snapshot(io.BytesIO(buf.getvalue())), graph)
+
+
+def test_payload_round_trip(graph, tmp_path):
+    path = tmp_path / "g.vcg"
+    write_snapshot(str(path), *graph)
+    CG, meta, sources = from_payload(to_payload(*open_snapshot(str(path))))
+    assert sorted(CG.ids) == sorted(graph[0].ids) and edge_set(CG) == edge_set(graph[0])
+    assert meta == graph[1] and sources == graph[2]
+
+
+def test_bad_magic_is_rejected():
+    with pytest.raises(ValueError, match="bad magic"):
+        open_snapshot(b"NOTASNAP" + bytes(64))
+
+
+def test_string_table_indexing():
+    table = StringTable(*StringTable.encode(["a", "", "héllo"]))
+    assert len(table) == 3 and list(table) == ["a", "", "héllo"]
+    assert table[-1] == "héllo" and table[-3] == "a" and table[1:] == ["", "héllo"]
+    for i in (3, -4):
+        with pytest.raises(IndexError):
+            table[i]